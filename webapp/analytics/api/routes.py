@@ -1,10 +1,13 @@
 """REST API routes for video analytics."""
 
 from typing import Optional, Dict, Any, List
+from concurrent.futures import ThreadPoolExecutor
 from fastapi import APIRouter, HTTPException, Query
 from fastapi.responses import StreamingResponse
+import asyncio
 import json
 import time
+import uuid
 import numpy as np
 
 from processors.video_processor import VideoProcessor, MultiVideoProcessor
@@ -14,12 +17,19 @@ from processors.gate_counter import BiDirectionalGateCounter, VirtualGate
 from processors.flow_detector import FlowAnalyzer
 from processors.dwell_analyzer import DwellTimeAnalyzer, DwellZone
 from processors.anomaly_detector import AnomalyDetector
-from config import VIDEO_FILES
+from processors.batch_analyzer import BatchAnalyzer
+from api.sessions import session_manager
+from models.registry import model_registry
+from models.detector import DetectionBatch
+from models.inference_server import get_inference_status
+from config import VIDEO_FILES, PROCESS_FPS, BATCH_ANALYSIS_SIZE, BATCH_OUTPUT_DIR, BATCH_JOBS_KEPT
 
 
 def convert_numpy_types(obj):
-    """Recursively convert numpy types to Python native types."""
-    if isinstance(obj, dict):
+    """Recursively convert numpy types and detection batches to Python native types."""
+    if isinstance(obj, DetectionBatch):
+        return obj.to_dicts()
+    elif isinstance(obj, dict):
         return {k: convert_numpy_types(v) for k, v in obj.items()}
     elif isinstance(obj, list):
         return [convert_numpy_types(item) for item in obj]
@@ -32,31 +42,46 @@ def convert_numpy_types(obj):
     return obj
 
 
+async def run_blocking(func, *args):
+    """Run blocking decode/inference work on a worker thread, off the event loop."""
+    return await asyncio.get_running_loop().run_in_executor(None, func, *args)
+
+
+def analyze_single_frame(video_id: str, frame_number: Optional[int] = None) -> Dict[str, Any]:
+    """Cold path: build a processor and analyze one frame (blocking)."""
+    return VideoProcessor(video_id).get_single_frame_analysis(frame_number)
+
+
+def sample_velocity(video_id: str, frames: int = 10) -> List[float]:
+    """Cold path: estimate velocity over a few frames sampled at PROCESS_FPS (blocking)."""
+    processor = VideoProcessor(video_id)
+    processor.open()
+    try:
+        velocities = []
+        for _ in range(frames):
+            frame = processor.read_frame()
+            if frame is None:
+                break
+            vel, _ = processor.velocity_estimator.estimate(frame, fps=PROCESS_FPS)
+            velocities.append(vel)
+        return velocities
+    finally:
+        processor.close()
+
+
 router = APIRouter(prefix="/api/analytics", tags=["analytics"])
 
 # Global processor manager
 processor_manager = MultiVideoProcessor()
 
-# Active streaming processors
-active_streams: Dict[str, VideoProcessor] = {}
-
 # Queue analyzers per video
 queue_analyzers: Dict[str, QueueAnalyzer] = {}
 
 # Global alert manager
 alert_manager = AlertManager()
 
-# Gate counters per video
-gate_counters: Dict[str, BiDirectionalGateCounter] = {}
-
-# Flow analyzers per video
-flow_analyzers: Dict[str, FlowAnalyzer] = {}
-
-# Dwell time analyzers per video
-dwell_analyzers: Dict[str, DwellTimeAnalyzer] = {}
-
-# Anomaly detectors per video
-anomaly_detectors: Dict[str, AnomalyDetector] = {}
+# Gate counters, flow analyzers, dwell analyzers and anomaly detectors live
+# in the per-camera sessions (api.sessions), shared with SSE and WebSocket
 
 
 @router.get("/status")
@@ -70,7 +95,9 @@ async def get_status() -> Dict[str, Any]:
         "status": "healthy",
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
         "available_videos": list(VIDEO_FILES.keys()),
-        "active_streams": list(active_streams.keys()),
+        "active_streams": session_manager.active_ids(),
+        "loaded_models": model_registry.get_status(),
+        "inference_servers": get_inference_status(),
         "version": "1.0.0"
     }
 
@@ -109,8 +136,7 @@ async def analyze_frame(
         )
 
     try:
-        processor = VideoProcessor(video_id)
-        result = processor.get_single_frame_analysis(frame_number)
+        result = await run_blocking(analyze_single_frame, video_id, frame_number)
         return convert_numpy_types(result)
     except FileNotFoundError as e:
         raise HTTPException(status_code=404, detail=str(e))
@@ -135,16 +161,18 @@ async def stream_analysis(video_id: str):
         )
 
     async def event_generator():
-        processor = VideoProcessor(video_id)
-        active_streams[video_id] = processor
+        # Every SSE client shares the camera's one pipeline session
+        session = session_manager.get(video_id)
+        subscription = session.subscribe()
 
         try:
-            for result in processor.process_stream():
-                data = json.dumps(result)
+            while True:
+                data = await subscription.get()
+                if data is None:
+                    break  # Session stopped
                 yield f"data: {data}\n\n"
         finally:
-            if video_id in active_streams:
-                del active_streams[video_id]
+            session.unsubscribe(subscription)
 
     return StreamingResponse(
         event_generator(),
@@ -167,9 +195,8 @@ async def stop_stream(video_id: str) -> Dict[str, str]:
     Returns:
         Confirmation message
     """
-    if video_id in active_streams:
-        active_streams[video_id].is_processing = False
-        del active_streams[video_id]
+    if video_id in session_manager.active_ids():
+        session_manager.get(video_id).stop()
         return {"status": "stopped", "video_id": video_id}
 
     raise HTTPException(
@@ -192,8 +219,8 @@ async def get_velocity(video_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
     # If there's an active stream, get current velocity
-    if video_id in active_streams:
-        processor = active_streams[video_id]
+    processor = session_manager.active_processor(video_id)
+    if processor is not None:
         return {
             "video_id": video_id,
             "velocity": round(processor.velocity_estimator.velocity_history[-1] if processor.velocity_estimator.velocity_history else 0, 2),
@@ -203,18 +230,7 @@ async def get_velocity(video_id: str) -> Dict[str, Any]:
 
     # Otherwise, process a few frames to get an estimate
     try:
-        processor = VideoProcessor(video_id)
-        processor.open()
-
-        velocities = []
-        for _ in range(10):  # Process 10 frames
-            ret, frame = processor.cap.read()
-            if not ret:
-                break
-            vel, _ = processor.velocity_estimator.estimate(frame)
-            velocities.append(vel)
-
-        processor.close()
+        velocities = await run_blocking(sample_velocity, video_id)  # Process 10 frames
 
         avg_velocity = sum(velocities) / len(velocities) if velocities else 0
 
@@ -230,11 +246,15 @@ async def get_velocity(video_id: str) -> Dict[str, Any]:
 
 
 @router.get("/flow-rate/{video_id}")
-async def get_flow_rate(video_id: str) -> Dict[str, Any]:
+async def get_flow_rate(
+    video_id: str,
+    window_seconds: float = Query(60.0, description="Time window in seconds")
+) -> Dict[str, Any]:
     """Get flow rate for a video.
 
     Args:
         video_id: ID of the video
+        window_seconds: Time window for rate calculation
 
     Returns:
         Flow rate metrics
@@ -242,12 +262,14 @@ async def get_flow_rate(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    if video_id in active_streams:
-        processor = active_streams[video_id]
+    processor = session_manager.active_processor(video_id)
+    if processor is not None:
         return {
             "video_id": video_id,
-            "flowRate": processor.tracker.get_flow_rate(),
+            "flowRate": round(processor.tracker.get_flow_rate(window_seconds), 1),
             "unit": "people/minute",
+            "windowSeconds": window_seconds,
+            "totalCrossed": processor.tracker.total_crossed,
             "activeTracked": processor.tracker.active_track_count,
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
         }
@@ -279,12 +301,11 @@ async def get_density(
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
     # Get current count from stream or analyze frame
-    if video_id in active_streams:
-        processor = active_streams[video_id]
+    processor = session_manager.active_processor(video_id)
+    if processor is not None:
         count = len(processor.last_detections)
     else:
-        processor = VideoProcessor(video_id)
-        result = processor.get_single_frame_analysis()
+        result = await run_blocking(analyze_single_frame, video_id)
         count = result["metrics"]["peopleCount"]
 
     density = count / zone_area_sqm if zone_area_sqm > 0 else 0
@@ -329,8 +350,8 @@ async def get_trends(
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    if video_id in active_streams:
-        processor = active_streams[video_id]
+    processor = session_manager.active_processor(video_id)
+    if processor is not None:
         trend_data = processor.metrics_aggregator.get_trend_data(metric, points)
     else:
         # Return empty trend if no active stream
@@ -373,13 +394,12 @@ async def get_queue_analysis(
     analyzer.set_service_rate(service_rate)
 
     # Get detections from active stream or analyze frame
-    if video_id in active_streams:
-        processor = active_streams[video_id]
-        detections = [d.to_dict() for d in processor.last_detections]
+    processor = session_manager.active_processor(video_id)
+    if processor is not None:
+        detections = processor.last_detections
         velocity = processor.last_metrics.get("velocity", 0.8)
     else:
-        processor = VideoProcessor(video_id)
-        result = processor.get_single_frame_analysis()
+        result = await run_blocking(analyze_single_frame, video_id)
         detections = result["detections"]
         velocity = result["metrics"].get("velocity", 0.8)
 
@@ -473,11 +493,11 @@ async def check_alerts(video_id: str) -> Dict[str, Any]:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
     # Get current metrics
-    if video_id in active_streams:
-        metrics = active_streams[video_id].last_metrics
+    processor = session_manager.active_processor(video_id)
+    if processor is not None:
+        metrics = processor.last_metrics
     else:
-        processor = VideoProcessor(video_id)
-        result = processor.get_single_frame_analysis()
+        result = await run_blocking(analyze_single_frame, video_id)
         metrics = result["metrics"]
 
     # Check for queue metrics too
@@ -500,11 +520,16 @@ async def check_alerts(video_id: str) -> Dict[str, Any]:
 # GATE COUNTING ENDPOINTS (Tier 3)
 # ============================================================================
 
+def _last_analysis(video_id: str, name: str) -> Optional[Dict]:
+    """Latest per-frame analyzer result of a running session, or None."""
+    if session_manager.active_processor(video_id) is None:
+        return None
+    return session_manager.get(video_id).last_analysis.get(name)
+
+
 def _get_gate_counter(video_id: str) -> BiDirectionalGateCounter:
-    """Get or create gate counter for a video."""
-    if video_id not in gate_counters:
-        gate_counters[video_id] = BiDirectionalGateCounter()
-    return gate_counters[video_id]
+    """Get the gate counter of a video's camera session."""
+    return session_manager.get(video_id).gate_counter
 
 
 @router.get("/gates/{video_id}")
@@ -520,20 +545,16 @@ async def get_gate_stats(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    counter = _get_gate_counter(video_id)
-
-    # Update with current detections if stream is active
-    if video_id in active_streams:
-        processor = active_streams[video_id]
-        detections = [d.to_dict() for d in processor.last_detections]
-        counter.update(detections)
+    with session_manager.get(video_id).lock:
+        # Kept up to date by the camera session while its stream is active
+        counter = _get_gate_counter(video_id)
 
-    return {
-        "video_id": video_id,
-        "gates": counter.get_gate_stats(),
-        "recent_crossings": counter.get_recent_crossings(10),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            "gates": counter.get_gate_stats(),
+            "recent_crossings": counter.get_recent_crossings(10),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.get("/gates/{video_id}/flow-rate")
@@ -555,12 +576,13 @@ async def get_gate_flow_rate(
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    counter = _get_gate_counter(video_id)
-    return {
-        "video_id": video_id,
-        **counter.get_flow_rate(gate_id, window_seconds),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+    with session_manager.get(video_id).lock:
+        counter = _get_gate_counter(video_id)
+        return {
+            "video_id": video_id,
+            **counter.get_flow_rate(gate_id, window_seconds),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.post("/gates/{video_id}/reset")
@@ -580,10 +602,11 @@ async def reset_gate_counters(
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    counter = _get_gate_counter(video_id)
-    counter.reset(gate_id)
+    with session_manager.get(video_id).lock:
+        counter = _get_gate_counter(video_id)
+        counter.reset(gate_id)
 
-    return {"status": "reset", "video_id": video_id, "gate_id": gate_id or "all"}
+        return {"status": "reset", "video_id": video_id, "gate_id": gate_id or "all"}
 
 
 # ============================================================================
@@ -591,10 +614,8 @@ async def reset_gate_counters(
 # ============================================================================
 
 def _get_flow_analyzer(video_id: str) -> FlowAnalyzer:
-    """Get or create flow analyzer for a video."""
-    if video_id not in flow_analyzers:
-        flow_analyzers[video_id] = FlowAnalyzer()
-    return flow_analyzers[video_id]
+    """Get the flow analyzer of a video's camera session."""
+    return session_manager.get(video_id).flow_analyzer
 
 
 @router.get("/flow/{video_id}")
@@ -610,21 +631,17 @@ async def get_flow_analysis(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    analyzer = _get_flow_analyzer(video_id)
+    with session_manager.get(video_id).lock:
+        analyzer = _get_flow_analyzer(video_id)
 
-    # Update with current detections if stream is active
-    if video_id in active_streams:
-        processor = active_streams[video_id]
-        detections = [d.to_dict() for d in processor.last_detections]
-        result = analyzer.update(detections)
-    else:
-        result = analyzer.get_counter_flow_summary()
+        # Latest per-frame result if the stream is active
+        result = _last_analysis(video_id, "flow") or analyzer.get_counter_flow_summary()
 
-    return {
-        "video_id": video_id,
-        **result,
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            **result,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.get("/flow/{video_id}/heatmap")
@@ -640,13 +657,14 @@ async def get_direction_heatmap(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    analyzer = _get_flow_analyzer(video_id)
+    with session_manager.get(video_id).lock:
+        analyzer = _get_flow_analyzer(video_id)
 
-    return {
-        "video_id": video_id,
-        "heatmap": analyzer.get_direction_heatmap(),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            "heatmap": analyzer.get_direction_heatmap(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.get("/flow/{video_id}/counter-flow")
@@ -662,13 +680,14 @@ async def get_counter_flow_events(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    analyzer = _get_flow_analyzer(video_id)
+    with session_manager.get(video_id).lock:
+        analyzer = _get_flow_analyzer(video_id)
 
-    return {
-        "video_id": video_id,
-        **analyzer.get_counter_flow_summary(),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            **analyzer.get_counter_flow_summary(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 # ============================================================================
@@ -676,10 +695,8 @@ async def get_counter_flow_events(video_id: str) -> Dict[str, Any]:
 # ============================================================================
 
 def _get_dwell_analyzer(video_id: str) -> DwellTimeAnalyzer:
-    """Get or create dwell time analyzer for a video."""
-    if video_id not in dwell_analyzers:
-        dwell_analyzers[video_id] = DwellTimeAnalyzer()
-    return dwell_analyzers[video_id]
+    """Get the dwell time analyzer of a video's camera session."""
+    return session_manager.get(video_id).dwell_analyzer
 
 
 @router.get("/dwell/{video_id}")
@@ -695,20 +712,16 @@ async def get_dwell_analysis(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    analyzer = _get_dwell_analyzer(video_id)
+    with session_manager.get(video_id).lock:
+        analyzer = _get_dwell_analyzer(video_id)
 
-    # Update with current detections if stream is active
-    if video_id in active_streams:
-        processor = active_streams[video_id]
-        detections = [d.to_dict() for d in processor.last_detections]
-        result = analyzer.update(detections)
-    else:
-        result = analyzer.get_summary()
+        # Latest per-frame result if the stream is active
+        result = _last_analysis(video_id, "dwell") or analyzer.get_summary()
 
-    return {
-        "video_id": video_id,
-        **result
-    }
+        return {
+            "video_id": video_id,
+            **result
+        }
 
 
 @router.get("/dwell/{video_id}/anomalies")
@@ -724,13 +737,14 @@ async def get_dwell_anomalies(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    analyzer = _get_dwell_analyzer(video_id)
+    with session_manager.get(video_id).lock:
+        analyzer = _get_dwell_analyzer(video_id)
 
-    return {
-        "video_id": video_id,
-        "anomalies": analyzer.get_anomalous_dwells(),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            "anomalies": analyzer.get_anomalous_dwells(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.get("/dwell/{video_id}/history/{zone_id}")
@@ -752,14 +766,15 @@ async def get_zone_occupancy_history(
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    analyzer = _get_dwell_analyzer(video_id)
+    with session_manager.get(video_id).lock:
+        analyzer = _get_dwell_analyzer(video_id)
 
-    return {
-        "video_id": video_id,
-        "zone_id": zone_id,
-        "history": analyzer.get_zone_occupancy_history(zone_id, window_seconds),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            "zone_id": zone_id,
+            "history": analyzer.get_zone_occupancy_history(zone_id, window_seconds),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 # ============================================================================
@@ -767,10 +782,8 @@ async def get_zone_occupancy_history(
 # ============================================================================
 
 def _get_anomaly_detector(video_id: str) -> AnomalyDetector:
-    """Get or create anomaly detector for a video."""
-    if video_id not in anomaly_detectors:
-        anomaly_detectors[video_id] = AnomalyDetector()
-    return anomaly_detectors[video_id]
+    """Get the anomaly detector of a video's camera session."""
+    return session_manager.get(video_id).anomaly_detector
 
 
 @router.get("/anomalies/{video_id}")
@@ -786,26 +799,24 @@ async def get_anomaly_analysis(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    detector = _get_anomaly_detector(video_id)
+    with session_manager.get(video_id).lock:
+        detector = _get_anomaly_detector(video_id)
 
-    # Update with current detections if stream is active
-    if video_id in active_streams:
-        processor = active_streams[video_id]
-        detections = [d.to_dict() for d in processor.last_detections]
-        result = detector.update(detections)
-    else:
-        result = {
-            "new_anomalies": [],
-            "total_anomalies": len(detector.anomaly_events),
-            "average_crowd_velocity": detector.average_crowd_velocity,
-            "active_tracks": len(detector.track_history)
-        }
+        # Latest per-frame result if the stream is active
+        result = _last_analysis(video_id, "anomalies")
+        if result is None:
+            result = {
+                "new_anomalies": [],
+                "total_anomalies": len(detector.anomaly_events),
+                "average_crowd_velocity": detector.average_crowd_velocity,
+                "active_tracks": len(detector.track_history)
+            }
 
-    return {
-        "video_id": video_id,
-        **result,
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            **result,
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.get("/anomalies/{video_id}/active")
@@ -825,13 +836,14 @@ async def get_active_anomalies(
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    detector = _get_anomaly_detector(video_id)
+    with session_manager.get(video_id).lock:
+        detector = _get_anomaly_detector(video_id)
 
-    return {
-        "video_id": video_id,
-        "anomalies": detector.get_active_anomalies(max_age_seconds),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            "anomalies": detector.get_active_anomalies(max_age_seconds),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.get("/anomalies/{video_id}/summary")
@@ -847,13 +859,14 @@ async def get_anomaly_summary(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    detector = _get_anomaly_detector(video_id)
+    with session_manager.get(video_id).lock:
+        detector = _get_anomaly_detector(video_id)
 
-    return {
-        "video_id": video_id,
-        **detector.get_anomaly_summary(),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    }
+        return {
+            "video_id": video_id,
+            **detector.get_anomaly_summary(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        }
 
 
 @router.post("/anomalies/{video_id}/reset")
@@ -869,10 +882,11 @@ async def reset_anomaly_detection(video_id: str) -> Dict[str, str]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    detector = _get_anomaly_detector(video_id)
-    detector.reset()
+    with session_manager.get(video_id).lock:
+        detector = _get_anomaly_detector(video_id)
+        detector.reset()
 
-    return {"status": "reset", "video_id": video_id}
+        return {"status": "reset", "video_id": video_id}
 
 
 # ============================================================================
@@ -892,27 +906,103 @@ async def get_advanced_analytics(video_id: str) -> Dict[str, Any]:
     if video_id not in VIDEO_FILES:
         raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    # Get or create all analyzers
-    gate_counter = _get_gate_counter(video_id)
-    flow_analyzer = _get_flow_analyzer(video_id)
-    dwell_analyzer = _get_dwell_analyzer(video_id)
-    anomaly_detector = _get_anomaly_detector(video_id)
+    with session_manager.get(video_id).lock:
+        # The camera session updates all analyzers on every processed frame
+        gate_counter = _get_gate_counter(video_id)
+        flow_analyzer = _get_flow_analyzer(video_id)
+        dwell_analyzer = _get_dwell_analyzer(video_id)
+        anomaly_detector = _get_anomaly_detector(video_id)
+
+        return convert_numpy_types({
+            "video_id": video_id,
+            "gates": gate_counter.get_gate_stats(),
+            "flow": flow_analyzer.get_counter_flow_summary(),
+            "dwell": dwell_analyzer.get_summary(),
+            "anomalies": anomaly_detector.get_anomaly_summary(),
+            "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+        })
+
+
+# ============================================================================
+# OFFLINE BATCH ANALYSIS
+# ============================================================================
+
+# One recording at a time: a batch job saturates the detector on its own
+batch_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="batch-analysis")
+batch_jobs: Dict[str, Dict[str, Any]] = {}  # In submission order
+
+
+def prune_batch_jobs(keep: int = BATCH_JOBS_KEPT):
+    """Forget the oldest finished jobs beyond ``keep`` (queued and running ones stay)."""
+    finished = [job_id for job_id, job in batch_jobs.items() if job["status"] in ("done", "failed")]
+    for job_id in finished[:max(0, len(finished) - keep)]:
+        del batch_jobs[job_id]
+
+
+def run_batch_job(job: Dict[str, Any], batch_size: int):
+    """Analyze a recording for a queued job and save the .npz (blocking)."""
+    def report(done: int, expected: int):
+        job["frames_done"] = done
+        job["frames_expected"] = expected
+
+    job["status"] = "running"
+    try:
+        analyzer = BatchAnalyzer(job["video_id"], batch_size=batch_size, progress=report)
+        job["summary"] = analyzer.run()
+        output = BATCH_OUTPUT_DIR / f"{job['job_id']}.npz"
+        job["output"] = str(analyzer.save(output))
+        job["status"] = "done"
+    except Exception as e:
+        job["status"] = "failed"
+        job["error"] = str(e)
+
 
-    # Update all if stream is active
-    if video_id in active_streams:
-        processor = active_streams[video_id]
-        detections = [d.to_dict() for d in processor.last_detections]
+@router.post("/batch/{video_id}")
+async def start_batch_analysis(
+    video_id: str,
+    batch_size: int = Query(BATCH_ANALYSIS_SIZE, ge=1, le=64, description="Frames per detector forward pass")
+) -> Dict[str, Any]:
+    """Queue an offline analysis of a whole recording.
+
+    The recording is processed end to end as fast as possible (no pacing,
+    every processed frame detected) and written to a columnar .npz.
+
+    Args:
+        video_id: ID of the video
+        batch_size: Frames per detector forward pass
 
-        gate_counter.update(detections)
-        flow_analyzer.update(detections)
-        dwell_analyzer.update(detections)
-        anomaly_detector.update(detections)
+    Returns:
+        The queued job (poll GET /batch/{job_id} for progress)
+    """
+    if video_id not in VIDEO_FILES:
+        raise HTTPException(status_code=404, detail=f"Video '{video_id}' not found")
 
-    return convert_numpy_types({
+    prune_batch_jobs()
+    job_id = f"{video_id}-{uuid.uuid4().hex[:12]}"
+    job = {
+        "job_id": job_id,
         "video_id": video_id,
-        "gates": gate_counter.get_gate_stats(),
-        "flow": flow_analyzer.get_counter_flow_summary(),
-        "dwell": dwell_analyzer.get_summary(),
-        "anomalies": anomaly_detector.get_anomaly_summary(),
-        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
-    })
+        "status": "queued",
+        "frames_done": 0,
+        "frames_expected": None,
+        "submitted": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
+    }
+    batch_jobs[job_id] = job
+    batch_executor.submit(run_batch_job, job, batch_size)
+    return dict(job)
+
+
+@router.get("/batch/{job_id}")
+async def get_batch_analysis(job_id: str) -> Dict[str, Any]:
+    """Get the status of an offline analysis job.
+
+    Args:
+        job_id: ID returned when the job was queued
+
+    Returns:
+        Job status, progress and, once done, the throughput summary and output file
+    """
+    job = batch_jobs.get(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"Batch job '{job_id}' not found")
+    return dict(job)
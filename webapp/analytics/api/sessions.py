@@ -0,0 +1,345 @@
+"""Shared per-camera pipeline sessions fanned out to every transport."""
+
+from typing import Any, Callable, Dict, List, Optional, Set, Union
+from concurrent.futures import Future, ThreadPoolExecutor, wait
+import asyncio
+import json
+import threading
+import time
+import numpy as np
+
+from processors.video_processor import VideoProcessor
+from processors.camera_worker import CameraWorker, RemoteProcessor
+from processors.gate_counter import BiDirectionalGateCounter
+from processors.flow_detector import FlowAnalyzer
+from processors.dwell_analyzer import DwellTimeAnalyzer
+from processors.anomaly_detector import AnomalyDetector
+from models.detector import DetectionBatch
+from config import SUBSCRIBER_QUEUE_SIZE, PIPELINE_MAX_CAMERAS, CAMERA_WORKER_PROCESSES
+
+# Decode and inference run here (or are supervised from here), never on the event loop
+pipeline_executor = ThreadPoolExecutor(max_workers=PIPELINE_MAX_CAMERAS, thread_name_prefix="camera")
+
+
+class NumpyJSONEncoder(json.JSONEncoder):
+    """JSON encoder that handles numpy types and detection batches."""
+    def default(self, obj):
+        if isinstance(obj, DetectionBatch):
+            return obj.to_dicts()
+        if isinstance(obj, np.integer):
+            return int(obj)
+        if isinstance(obj, np.floating):
+            return float(obj)
+        if isinstance(obj, np.ndarray):
+            return obj.tolist()
+        return super().default(obj)
+
+
+class Subscription:
+    """A client's view of a session: a small queue of serialized results.
+
+    A slow client never holds up the pipeline; when its queue is full the
+    oldest message is dropped.
+    """
+
+    def __init__(self, min_interval: float = 0.0, size: int = SUBSCRIBER_QUEUE_SIZE):
+        """Initialize the subscription.
+
+        Args:
+            min_interval: Minimum seconds between delivered results (0 = every frame)
+            size: Messages buffered before the oldest is dropped
+        """
+        self.queue: "asyncio.Queue[Optional[str]]" = asyncio.Queue(maxsize=size)
+        self.min_interval = min_interval
+        self.last_delivered = 0.0
+        self.dropped = 0
+
+    def offer(self, message: Optional[str], force: bool = False):
+        """Queue a message, subject to the rate limit unless forced.
+
+        Args:
+            message: JSON text, or None to signal the end of the session
+            force: Deliver regardless of ``min_interval`` (errors, end of stream)
+        """
+        now = time.monotonic()
+        if not force and now - self.last_delivered < self.min_interval:
+            return
+        if self.queue.full():
+            self.queue.get_nowait()
+            self.dropped += 1
+        self.queue.put_nowait(message)
+        self.last_delivered = now
+
+    async def get(self) -> Optional[str]:
+        """Wait for the next message; None means the session ended."""
+        return await self.queue.get()
+
+
+class CameraSession:
+    """One long-lived pipeline per camera, shared by all of its clients.
+
+    The session owns the camera's VideoProcessor and Tier 3 analyzers. A
+    single pipeline runs while at least one subscriber (SSE or WebSocket
+    client) is attached. Decode, inference, analysis and serialization
+    all happen on a ``pipeline_executor`` thread; only the finished JSON
+    is handed to the event loop, which offers it to every subscriber's
+    asyncio queue. REST endpoints read the same state under ``lock``.
+    CPU cost is therefore per camera, not per viewer, and the event loop
+    never waits on a model.
+
+    With CAMERA_WORKER_PROCESSES the pipeline itself runs in a supervised
+    worker process (see CameraWorker) and the executor thread only reads
+    its results, runs the analyzers and serializes, so cameras spread
+    across cores and a crashing pipeline cannot take the API down.
+    """
+
+    def __init__(self, video_id: str):
+        """Initialize the session.
+
+        Args:
+            video_id: ID of the camera/video
+        """
+        self.video_id = video_id
+        self.processor: Optional[Union[VideoProcessor, RemoteProcessor]] = None
+        self.subscribers: Set[Subscription] = set()
+        self.task: Optional[asyncio.Future] = None
+        self._pipeline: Optional[Future] = None  # Executor future of the latest run, kept after stop
+        self._stop_event: Optional[threading.Event] = None
+
+        # Tier 3 analyzers, kept across pipeline restarts. The pipeline
+        # thread updates them under the lock; readers take it too.
+        self.lock = threading.Lock()
+        self.gate_counter = BiDirectionalGateCounter()
+        self.flow_analyzer = FlowAnalyzer()
+        self.dwell_analyzer = DwellTimeAnalyzer()
+        self.anomaly_detector = AnomalyDetector()
+
+        # Latest per-frame outputs for REST readers
+        self.last_result: Optional[Dict[str, Any]] = None
+        self.last_analysis: Dict[str, Dict] = {}
+        self.frames_published = 0
+
+    @property
+    def is_running(self) -> bool:
+        return self.task is not None and not self.task.done()
+
+    def subscribe(self, min_interval: float = 0.0) -> Subscription:
+        """Attach a client, starting the pipeline if it is not running.
+
+        Must be called from the event loop.
+
+        Args:
+            min_interval: Minimum seconds between results for this client
+
+        Returns:
+            Subscription to read results from
+        """
+        subscription = Subscription(min_interval)
+        self.subscribers.add(subscription)
+        if not self.is_running:
+            self.start()
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        """Detach a client, stopping the pipeline when none are left."""
+        self.subscribers.discard(subscription)
+        subscription.offer(None, force=True)
+        if not self.subscribers:
+            self.stop()
+
+    def start(self):
+        """Start the pipeline on the executor with a fresh processor.
+
+        A run that was just stopped may still be inside a frame; the new
+        one waits for it to exit before touching the session.
+        """
+        loop = asyncio.get_running_loop()
+        previous = self._pipeline
+        self._stop_event = threading.Event()
+        self._pipeline = pipeline_executor.submit(self._run, loop, self._stop_event, previous)
+        self.task = asyncio.wrap_future(self._pipeline, loop=loop)
+
+    def stop(self):
+        """Stop the pipeline and end every subscription."""
+        if self._stop_event is not None:
+            self._stop_event.set()
+        if self.processor is not None:
+            self.processor.is_processing = False
+        self.task = None
+        for subscription in self.subscribers:
+            subscription.offer(None, force=True)
+        self.subscribers.clear()
+
+    def _analyze(self, processor: Union[VideoProcessor, RemoteProcessor], result: Dict[str, Any]):
+        """Run the Tier 3 analyzers on a frame result (caller holds the lock)."""
+        detections = result["detections"]
+        motion_grid = processor.velocity_estimator.motion_grid
+
+        self.gate_counter.update(detections)
+        flow_result = self.flow_analyzer.update(detections, motion_grid)
+        dwell_result = self.dwell_analyzer.update(detections)
+        anomaly_result = self.anomaly_detector.update(detections, motion_grid)
+        self.last_analysis = {"flow": flow_result, "dwell": dwell_result, "anomalies": anomaly_result}
+
+        # Add Tier 3 analytics to result (compact format for the live payload)
+        result["advanced"] = {
+            "gates": self.gate_counter.get_gate_stats(),
+            "dominantFlow": flow_result.get("dominant_flow"),
+            "counterFlowCount": flow_result.get("total_counter_flow_count", 0),
+            "counterFlowDetected": flow_result.get("counter_flow_detected", False),
+            "counterFlowCells": flow_result.get("counter_flow_cells", []),
+            "anomalyCount": anomaly_result.get("total_anomalies", 0),
+            "newAnomalies": anomaly_result.get("new_anomalies", [])[:3]  # Limit for bandwidth
+        }
+
+    def _publish(self, data: str, force: bool = False):
+        """Offer serialized JSON to every subscriber (event loop only)."""
+        for subscription in list(self.subscribers):
+            subscription.offer(data, force=force)
+
+    def _run(self, loop: asyncio.AbstractEventLoop, stop: threading.Event, previous: Optional[Future] = None):
+        """Pipeline loop, run on a pipeline_executor thread.
+
+        Args:
+            loop: Event loop to hand results to
+            stop: Set by ``stop`` to end the loop
+            previous: The session's stopped run, waited for before starting
+        """
+        if previous is not None:
+            wait([previous])
+        if stop.is_set():  # Stopped again while waiting
+            return
+
+        def hand_over(message: Dict[str, Any], force: bool = False):
+            data = json.dumps(message, cls=NumpyJSONEncoder)
+            if not stop.is_set():
+                loop.call_soon_threadsafe(self._publish, data, force)
+
+        try:
+            if CAMERA_WORKER_PROCESSES:
+                self._run_worker(stop, hand_over)
+            else:
+                self._run_inline(stop, hand_over)
+        except Exception as e:
+            hand_over({"error": str(e)}, force=True)
+
+    def _accept(self, processor: Union[VideoProcessor, RemoteProcessor], result: Dict[str, Any],
+                stop: threading.Event, hand_over: Callable[[Dict[str, Any]], None]):
+        """Analyze a frame result, keep it for REST readers and publish it.
+
+        Results finished after ``stop`` are dropped without touching the
+        shared analyzers, which a restarted run may already own.
+        """
+        with self.lock:
+            if stop.is_set():
+                return
+            self._analyze(processor, result)
+            self.last_result = result
+        processor.record_latency(result)
+        self.frames_published += 1
+        hand_over(result)
+
+    def _run_inline(self, stop: threading.Event, hand_over: Callable[..., None]):
+        """Run the camera's pipeline on this thread."""
+        processor = None
+        try:
+            processor = VideoProcessor(self.video_id)
+            self.processor = processor
+            if not processor.open():
+                hand_over({"error": f"Failed to open video: {self.video_id}"}, force=True)
+                return
+
+            processor.is_processing = True
+            processor.frame_count = 0
+
+            while processor.is_processing and not stop.is_set():
+                cycle_start = time.monotonic()
+                frame = processor.read_frame()
+                if frame is None:
+                    break
+
+                self._accept(processor, processor.process_frame(frame), stop, hand_over)
+
+                # Control processing rate
+                stop.wait(processor.frame_delay(cycle_start))
+
+        finally:
+            if processor is not None:
+                processor.close()
+
+    def _run_worker(self, stop: threading.Event, hand_over: Callable[..., None]):
+        """Supervise the camera's worker process and consume its results."""
+        worker = CameraWorker(self.video_id)
+        processor = RemoteProcessor(self.video_id, worker)
+        self.processor = processor
+        try:
+            worker.start()
+            processor.is_processing = True
+
+            while processor.is_processing and not stop.is_set():
+                message = worker.receive()
+                if message is None:
+                    if worker.failed:
+                        hand_over({"error": f"Camera worker for '{self.video_id}' keeps crashing"}, force=True)
+                        break
+                    continue
+
+                kind, payload = message
+                if kind == "error":
+                    hand_over({"error": payload}, force=True)
+                    break
+                if kind == "end":
+                    break
+                if kind == "status":
+                    processor.worker_status = payload
+                    continue
+
+                result = processor.observe(payload)
+                if result is not None:  # None: overwritten in the ring while we lagged
+                    self._accept(processor, result, stop, hand_over)
+
+        finally:
+            worker.stop()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Session state for status endpoints."""
+        return {
+            "running": self.is_running,
+            "subscribers": len(self.subscribers),
+            "frames_published": self.frames_published,
+            "dropped_messages": sum(s.dropped for s in self.subscribers),
+            "processor": self.processor.get_status() if self.processor is not None else None
+        }
+
+
+class SessionManager:
+    """Registry of camera sessions, one per video ID."""
+
+    def __init__(self):
+        self.sessions: Dict[str, CameraSession] = {}
+
+    def get(self, video_id: str) -> CameraSession:
+        """Get or create the session of a camera (without starting it)."""
+        if video_id not in self.sessions:
+            self.sessions[video_id] = CameraSession(video_id)
+        return self.sessions[video_id]
+
+    def active_processor(self, video_id: str) -> Optional[Union[VideoProcessor, RemoteProcessor]]:
+        """The processor of a running session, or None."""
+        session = self.sessions.get(video_id)
+        if session is None or not session.is_running:
+            return None
+        return session.processor
+
+    def active_ids(self) -> List[str]:
+        """IDs of cameras whose pipeline is running."""
+        return [video_id for video_id, session in self.sessions.items() if session.is_running]
+
+    def stop_all(self):
+        """Stop every running session (event loop only)."""
+        for session in self.sessions.values():
+            session.stop()
+
+
+# Global session manager shared by the REST, SSE and WebSocket endpoints
+session_manager = SessionManager()
@@ -5,27 +5,8 @@ from fastapi import APIRouter, WebSocket, WebSocketDisconnect
 import asyncio
 import json
 import time
-import numpy as np
 
-from processors.video_processor import VideoProcessor
-
-
-class NumpyJSONEncoder(json.JSONEncoder):
-    """JSON encoder that handles numpy types."""
-    def default(self, obj):
-        if isinstance(obj, np.integer):
-            return int(obj)
-        if isinstance(obj, np.floating):
-            return float(obj)
-        if isinstance(obj, np.ndarray):
-            return obj.tolist()
-        return super().default(obj)
-
-
-from processors.gate_counter import BiDirectionalGateCounter
-from processors.flow_detector import FlowAnalyzer
-from processors.dwell_analyzer import DwellTimeAnalyzer
-from processors.anomaly_detector import AnomalyDetector
+from api.sessions import session_manager, Subscription, NumpyJSONEncoder
 from config import VIDEO_FILES, WS_UPDATE_INTERVAL
 
 
@@ -33,20 +14,20 @@ websocket_router = APIRouter()
 
 
 class ConnectionManager:
-    """Manages WebSocket connections for video streams."""
+    """Manages WebSocket connections for video streams.
+
+    All sockets of a video share one subscription to the camera's
+    pipeline session; each result is forwarded to every socket at most
+    once per WS_UPDATE_INTERVAL.
+    """
 
     def __init__(self):
         # Map of video_id -> set of connected websockets
         self.active_connections: Dict[str, Set[WebSocket]] = {}
-        # Map of video_id -> processor
-        self.processors: Dict[str, VideoProcessor] = {}
-        # Map of video_id -> processing task
+        # Map of video_id -> session subscription
+        self.subscriptions: Dict[str, Subscription] = {}
+        # Map of video_id -> forwarding task
         self.tasks: Dict[str, asyncio.Task] = {}
-        # Tier 3 analyzers per video
-        self.gate_counters: Dict[str, BiDirectionalGateCounter] = {}
-        self.flow_analyzers: Dict[str, FlowAnalyzer] = {}
-        self.dwell_analyzers: Dict[str, DwellTimeAnalyzer] = {}
-        self.anomaly_detectors: Dict[str, AnomalyDetector] = {}
 
     async def connect(self, websocket: WebSocket, video_id: str):
         """Accept a new WebSocket connection.
@@ -62,9 +43,9 @@ class ConnectionManager:
 
         self.active_connections[video_id].add(websocket)
 
-        # Start processing if not already running
+        # Subscribe to the camera session if not already forwarding
         if video_id not in self.tasks or self.tasks[video_id].done():
-            await self.start_processing(video_id)
+            self.start_forwarding(video_id)
 
     def disconnect(self, websocket: WebSocket, video_id: str):
         """Handle WebSocket disconnection.
@@ -76,129 +57,47 @@ class ConnectionManager:
         if video_id in self.active_connections:
             self.active_connections[video_id].discard(websocket)
 
-            # Stop processing if no more connections
+            # Unsubscribe if no more connections
             if not self.active_connections[video_id]:
-                self.stop_processing(video_id)
+                self.stop_forwarding(video_id)
                 del self.active_connections[video_id]
 
-    async def start_processing(self, video_id: str):
-        """Start video processing for a stream.
+    def start_forwarding(self, video_id: str):
+        """Subscribe to the camera session and forward its results.
 
         Args:
-            video_id: ID of the video to process
+            video_id: ID of the video
         """
-        if video_id in self.processors:
-            self.processors[video_id].is_processing = False
-
-        processor = VideoProcessor(video_id)
-        self.processors[video_id] = processor
+        subscription = session_manager.get(video_id).subscribe(min_interval=WS_UPDATE_INTERVAL)
+        self.subscriptions[video_id] = subscription
+        self.tasks[video_id] = asyncio.create_task(self._forward_loop(video_id, subscription))
 
-        # Initialize Tier 3 analyzers for this video
-        self.gate_counters[video_id] = BiDirectionalGateCounter()
-        self.flow_analyzers[video_id] = FlowAnalyzer()
-        self.dwell_analyzers[video_id] = DwellTimeAnalyzer()
-        self.anomaly_detectors[video_id] = AnomalyDetector()
-
-        # Create background task for processing
-        self.tasks[video_id] = asyncio.create_task(
-            self._process_loop(video_id, processor)
-        )
-
-    def stop_processing(self, video_id: str):
-        """Stop video processing for a stream.
+    def stop_forwarding(self, video_id: str):
+        """Unsubscribe from the camera session.
 
         Args:
             video_id: ID of the video stream
         """
-        if video_id in self.processors:
-            self.processors[video_id].is_processing = False
-
         if video_id in self.tasks:
-            self.tasks[video_id].cancel()
-
-        # Clean up Tier 3 analyzers
-        if video_id in self.gate_counters:
-            del self.gate_counters[video_id]
-        if video_id in self.flow_analyzers:
-            del self.flow_analyzers[video_id]
-        if video_id in self.dwell_analyzers:
-            del self.dwell_analyzers[video_id]
-        if video_id in self.anomaly_detectors:
-            del self.anomaly_detectors[video_id]
+            self.tasks.pop(video_id).cancel()
+        if video_id in self.subscriptions:
+            session_manager.get(video_id).unsubscribe(self.subscriptions.pop(video_id))
 
-    async def _process_loop(self, video_id: str, processor: VideoProcessor):
-        """Background processing loop.
+    async def _forward_loop(self, video_id: str, subscription: Subscription):
+        """Send each session result to the video's sockets.
 
         Args:
             video_id: ID of the video
-            processor: VideoProcessor instance
+            subscription: Session subscription for this video
         """
         try:
-            if not processor.open():
-                await self.broadcast(video_id, {
-                    "error": f"Failed to open video: {video_id}"
-                })
-                return
-
-            processor.is_processing = True
-
-            while processor.is_processing and video_id in self.active_connections:
-                # Read and process frame
-                ret, frame = processor.cap.read()
-
-                if not ret:
-                    # Loop video
-                    processor.cap.set(0, 0)  # Seek to beginning
-                    processor.tracker.reset_flow_count()
-                    continue
-
-                processor.frame_count += 1
-
-                # Skip frames for efficiency
-                if processor.frame_count % processor.frame_skip != 0:
-                    await asyncio.sleep(0.01)
-                    continue
-
-                # Process frame
-                result = processor.process_frame(frame)
-
-                # Run Tier 3 analyzers on detections
-                detections = result.get("detections", [])
-                if detections and video_id in self.gate_counters:
-                    # Update gate counter
-                    self.gate_counters[video_id].update(detections)
-
-                    # Update flow analyzer
-                    flow_result = self.flow_analyzers[video_id].update(detections)
-
-                    # Update dwell analyzer
-                    self.dwell_analyzers[video_id].update(detections)
-
-                    # Update anomaly detector
-                    anomaly_result = self.anomaly_detectors[video_id].update(detections)
-
-                    # Add Tier 3 analytics to result (compact format for WebSocket)
-                    result["advanced"] = {
-                        "gates": self.gate_counters[video_id].get_gate_stats(),
-                        "dominantFlow": flow_result.get("dominant_flow"),
-                        "counterFlowCount": flow_result.get("total_counter_flow_count", 0),
-                        "counterFlowDetected": flow_result.get("counter_flow_detected", False),
-                        "anomalyCount": anomaly_result.get("total_anomalies", 0),
-                        "newAnomalies": anomaly_result.get("new_anomalies", [])[:3]  # Limit for bandwidth
-                    }
-
-                # Broadcast to all connected clients
-                await self.broadcast(video_id, result)
-
-                # Control update rate
-                await asyncio.sleep(WS_UPDATE_INTERVAL)
-
+            while video_id in self.active_connections:
+                data = await subscription.get()
+                if data is None:
+                    break  # Session stopped
+                await self.broadcast_text(video_id, data)
         except asyncio.CancelledError:
             pass
-        except Exception as e:
-            await self.broadcast(video_id, {"error": str(e)})
-        finally:
-            processor.close()
 
     async def broadcast(self, video_id: str, message: dict):
         """Broadcast a message to all connected clients.
@@ -207,11 +106,19 @@ class ConnectionManager:
             video_id: ID of the video stream
             message: Message to send
         """
+        await self.broadcast_text(video_id, json.dumps(message, cls=NumpyJSONEncoder))
+
+    async def broadcast_text(self, video_id: str, data: str):
+        """Broadcast already serialized JSON to all connected clients.
+
+        Args:
+            video_id: ID of the video stream
+            data: JSON text to send
+        """
         if video_id not in self.active_connections:
             return
 
         disconnected = set()
-        data = json.dumps(message, cls=NumpyJSONEncoder)
 
         for websocket in self.active_connections[video_id]:
             try:
@@ -261,13 +168,15 @@ async def websocket_endpoint(websocket: WebSocket, video_id: str):
 
                     elif command.get("action") == "set_zone_area":
                         zone_area = command.get("area_sqm", 100.0)
-                        if video_id in manager.processors:
-                            manager.processors[video_id].metrics_aggregator.set_zone_area(zone_area)
+                        processor = session_manager.active_processor(video_id)
+                        if processor is not None:
+                            processor.metrics_aggregator.set_zone_area(zone_area)
 
                     elif command.get("action") == "set_counting_line":
                         y_pos = command.get("y_percentage", 50.0)
-                        if video_id in manager.processors:
-                            manager.processors[video_id].tracker.set_counting_line(y_pos)
+                        processor = session_manager.active_processor(video_id)
+                        if processor is not None:
+                            processor.tracker.set_counting_line(y_pos)
 
                 except json.JSONDecodeError:
                     pass
@@ -297,6 +206,10 @@ async def websocket_status():
             video_id: len(connections)
             for video_id, connections in manager.active_connections.items()
         },
-        "processing": list(manager.processors.keys()),
+        "processing": session_manager.active_ids(),
+        "sessions": {
+            video_id: session.get_status()
+            for video_id, session in session_manager.sessions.items()
+        },
         "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime())
     }
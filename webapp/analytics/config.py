@@ -1,28 +1,105 @@
 """Configuration settings for the video analytics backend."""
 
 from pathlib import Path
-from typing import Dict, Any
+from typing import Dict, Any, List
+from functools import lru_cache
+import json
 
 # Paths
 BASE_DIR = Path(__file__).parent
 WEBAPP_DIR = BASE_DIR.parent
 VIDEO_DIR = WEBAPP_DIR / "public" / "videos"
 DATA_DIR = BASE_DIR / "data"
+MODELS_DIR = DATA_DIR / "models"  # Exported detector graphs (ONNX / OpenVINO)
+CALIBRATION_FILE = DATA_DIR / "calibration.json"
 
 # Model settings
 YOLO_MODEL = "yolov8s.pt"  # Small model for balance of speed/accuracy
 YOLO_CONFIDENCE = 0.4  # Minimum detection confidence
 YOLO_IOU_THRESHOLD = 0.5  # NMS IoU threshold
 PERSON_CLASS_ID = 0  # COCO person class
+# Detector backend: "ultralytics" (PyTorch), "onnxruntime" or "openvino"
+DETECTOR_BACKEND = "ultralytics"
+DETECTOR_INT8 = False  # Use the INT8-quantized graph with onnxruntime/openvino
+DETECTOR_IMGSZ = 640  # Detector input size for a full frame or tile
+DETECTOR_STRIDE = 32  # Input sizes must be a multiple of the model stride
+ONNX_MODEL = MODELS_DIR / "yolov8s.onnx"
+ONNX_INT8_MODEL = MODELS_DIR / "yolov8s_int8.onnx"
+OPENVINO_DEVICE = "CPU"
+CPU_THREADS = 0  # Intra-op threads for CPU backends (0 = runtime default)
+MODEL_WARMUP_SIZE = 640  # Square dummy frame size used to warm up loaded models
+PRELOAD_MODELS = True  # Load and warm up the detector at API startup
+
+# Batched inference (frames from all cameras share one forward pass)
+BATCH_INFERENCE = True  # Route detection through the shared batching server
+INFERENCE_MAX_BATCH = 16  # Maximum frames per forward pass
+INFERENCE_MAX_LATENCY_MS = 15  # Maximum wait for a batch to fill (only while other callers are active)
+INFERENCE_ACTIVE_SECONDS = 1.0  # A caller that submitted this recently is waited for when filling a batch
+
+# Tiled inference defaults (enabled per camera via "tiling" in calibration.json)
+TILE_GRID = (3, 2)  # Tiles across, tiles down
+TILE_OVERLAP = 0.2  # Fractional overlap between neighbouring tiles
+TILE_MERGE_THRESHOLD = 0.6  # Intersection-over-smaller above which tile boxes merge
 
 # Processing settings
 PROCESS_FPS = 5  # Process 5 frames per second (skip frames for efficiency)
+SEEK_SKIP_FRAMES = 90  # Frame skips this long seek instead of grabbing frame by frame
+FRAME_PREFETCH = True  # Decode frames on a background thread per source
+FRAME_QUEUE_SIZE = 4  # Decoded frames buffered ahead of inference
+FRAME_QUEUE_POLICY = "block"  # When full: "block" (offline, lossless) or "drop_oldest" (live, keep the latest)
 MAX_TRACK_AGE = 30  # Max frames to keep track alive without detection
 MIN_TRACK_HITS = 3  # Min detections before track is confirmed
+TRACK_TRAJECTORY_LENGTH = 30  # Center points kept per track
+FLOW_RATE_WINDOW_SECONDS = 60  # Default window for the counting-line flow rate
+FLOW_RATE_HISTORY_SECONDS = 600  # Longest flow-rate window that can be queried
+FLOW_RATE_MIN_SECONDS = 10  # Observation span before a flow rate is reported (0 until then)
+TRACK_ACTIVATION_THRESHOLD = 0.25  # Min confidence for a detection to start a new track
+TRACK_CENTER_DISTANCE_WEIGHT = 0.5  # Fallback tracker: weight of centre distance (in box diagonals) in the match cost
+TRACK_MAX_MATCH_COST = 1.5  # Fallback tracker: pairs costlier than this are never matched
+TRACK_MATCH_IOU = 0.3  # Min IoU to pair a tracked box with its source detection
+TRACK_HISTORY_TTL = 5.0  # Seconds an analyzer keeps a per-ID history after the track was last seen
+PARALLEL_STAGES = True  # Run detection and optical flow for a frame on separate threads
+
+# Live mode (newest frame only, held to a latency target; per camera: "live" in calibration.json)
+LIVE_MODE = False  # Process the newest decoded frame and enforce LIVE_LATENCY_TARGET_MS
+LIVE_LATENCY_TARGET_MS = 500  # Capture-to-publish latency target (p90 over the window)
+LIVE_LATENCY_WINDOW = 10  # Frames per latency evaluation (and settle time after a change)
+LIVE_RECOVER_RATIO = 0.6  # p90 below this fraction of the target steps quality back up
+LIVE_MAX_RATE_DIVISOR = 4  # Slowest live processing rate, as a divisor of PROCESS_FPS
+LIVE_MODEL_LADDER: Dict[str, List[str]] = {  # Detector weights from largest to smallest, per backend
+    "ultralytics": ["yolov8s.pt", "yolov8n.pt"],
+}
+
+# Offline batch analysis (recordings processed end to end without pacing)
+BATCH_ANALYSIS_SIZE = 8  # Frames per detector forward pass
+BATCH_OUTPUT_DIR = DATA_DIR / "batch"  # Columnar .npz results
+BATCH_JOBS_KEPT = 50  # Finished batch jobs the API remembers (oldest are forgotten; their files stay)
+
+# Motion gate (skip detection when the scene is static)
+MOTION_GATE_ENABLED = True
+MOTION_GATE_WIDTH = 160  # Thumbnail width for frame differencing
+MOTION_PIXEL_THRESHOLD = 25  # Grey-level change counted as motion
+MOTION_MIN_CHANGED_FRACTION = 0.01  # Changed-pixel fraction that triggers detection
+MOTION_MAX_SKIP = 10  # Max consecutive processed frames without detection
+
+# Keyframe detection (YOLO every K frames, boxes propagated in between)
+KEYFRAME_DETECTION = False  # Enable per camera with "keyframes" in calibration.json
+KEYFRAME_MAX_INTERVAL = 5  # Largest K on calm scenes
+KEYFRAME_VELOCITY_REF = 0.5  # Crowd speed (m/s) that halves K
+KEYFRAME_DENSITY_REF = 2.0  # Crowd density (people/m²) that halves K
+PROPAGATION_SCALE = 0.5  # Downscale factor for sparse box propagation
+PROPAGATION_GRID = 3  # LK sample points per box side
 
 # Velocity estimation (optical flow)
 OPTICAL_FLOW_SCALE = 0.5  # Downscale factor for optical flow computation
+VELOCITY_MODE = "sparse"  # "sparse" (LK on tracked people) or "dense" (whole-frame flow, for scenes where detection fails)
+FLOW_ENGINE = "farneback"  # Dense flow engine: "farneback" or "dis"
+FLOW_PRESET = None  # DIS preset: "ultrafast", "fast" or "medium" (None = ultrafast)
+FLOW_DIRECTION_GRID = (16, 9)  # (columns, rows) of the coarse mean-flow grid
+SPARSE_FLOW_POINTS_PER_TRACK = 8  # Good-feature points tracked per person in sparse mode
 PIXELS_PER_METER = 50  # Approximate pixels per meter (calibration needed)
+GROUND_GRID_STEP = 40  # Pixel spacing of the cached metres-per-pixel lattice
+GROUND_MAX_SCALE = 10.0  # Cap on far-field metres-per-pixel, relative to the image centre
 
 # Density thresholds (people per square meter)
 DENSITY_THRESHOLDS = {
@@ -42,9 +119,22 @@ VELOCITY_THRESHOLDS = {
 
 # Zone definitions (will be loaded from calibration.json)
 DEFAULT_ZONE_AREA_SQM = 100.0  # Default zone area in square meters
+LOCAL_DENSITY_CELLS = 5  # Ground-plane lattice cells per side of the peak-density window
 
 # WebSocket settings
 WS_UPDATE_INTERVAL = 1.0  # Seconds between WebSocket updates
+SUBSCRIBER_QUEUE_SIZE = 8  # Results buffered per SSE/WebSocket client before the oldest is dropped
+PIPELINE_MAX_CAMERAS = 32  # Camera pipelines that can run at once (one executor thread each)
+
+# Camera worker processes
+CAMERA_WORKER_PROCESSES = False  # Run each camera's pipeline in its own process instead of an API thread
+WORKER_RING_SLOTS = 4  # Frames/detection arrays held in each worker's shared-memory rings
+WORKER_MAX_DETECTIONS = 1024  # Detections per frame that fit in a ring slot (extra ones are dropped)
+WORKER_THREADS = 2  # Torch/OpenCV threads per worker, so many workers do not oversubscribe the cores
+WORKER_RESTART_DELAY = 2.0  # Seconds before restarting a crashed worker (doubles per consecutive crash)
+WORKER_MAX_RESTARTS = 5  # Consecutive crashes before a session gives up
+WORKER_STATUS_INTERVAL = 1.0  # Seconds between full processor status snapshots from a worker
+WORKER_FRAME_INTERVAL = 1.0  # Seconds between frames copied to the shared-memory ring while no client streams frames
 
 # Video file mapping
 VIDEO_FILES: Dict[str, str] = {
@@ -69,3 +159,24 @@ def get_video_path(video_id: str) -> Path:
     """Get the full path to a video file."""
     filename = VIDEO_FILES.get(video_id, f"{video_id}.mp4")
     return VIDEO_DIR / filename
+
+
+def get_detector_model_path(backend: str = DETECTOR_BACKEND, int8: bool = DETECTOR_INT8) -> str:
+    """Get the default model file for a detector backend."""
+    if backend == "ultralytics":
+        return YOLO_MODEL
+    return str(ONNX_INT8_MODEL if int8 else ONNX_MODEL)
+
+
+@lru_cache(maxsize=1)
+def load_calibration() -> Dict[str, Any]:
+    """Load per-camera calibration from calibration.json."""
+    if not CALIBRATION_FILE.exists():
+        return {}
+    with open(CALIBRATION_FILE) as f:
+        return json.load(f)
+
+
+def get_zone_calibration(video_id: str) -> Dict[str, Any]:
+    """Get calibration for a camera, or an empty dict if it has none."""
+    return load_calibration().get("zones", {}).get(video_id, {})
@@ -12,6 +12,8 @@ import uvicorn
 
 from api.routes import router as api_router
 from api.websocket import websocket_router
+from models.registry import model_registry
+from config import PRELOAD_MODELS
 
 
 # Create FastAPI app
@@ -32,6 +34,13 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+@app.on_event("startup")
+async def preload_models():
+    """Load and warm up shared models before the first request."""
+    if PRELOAD_MODELS:
+        model_registry.preload()
+
+
 # Include routers
 app.include_router(api_router)
 app.include_router(websocket_router)
@@ -3,5 +3,19 @@
 from .detector import PeopleDetector
 from .tracker import PeopleTracker
 from .velocity import VelocityEstimator
+from .backends import DetectorBackend, create_backend
+from .registry import ModelRegistry, model_registry, get_model
+from .inference_server import BatchInferenceServer, get_inference_server
 
-__all__ = ["PeopleDetector", "PeopleTracker", "VelocityEstimator"]
+__all__ = [
+    "PeopleDetector",
+    "PeopleTracker",
+    "VelocityEstimator",
+    "DetectorBackend",
+    "create_backend",
+    "ModelRegistry",
+    "model_registry",
+    "get_model",
+    "BatchInferenceServer",
+    "get_inference_server"
+]
@@ -0,0 +1,312 @@
+"""Pluggable inference backends for the people detector.
+
+Every backend takes a list of BGR frames and returns, per frame, the
+person boxes (pixel xyxy) and confidences after NMS, so the detector and
+the batching server do not care which runtime produced them.
+"""
+
+from abc import ABC, abstractmethod
+from typing import List, Dict, Any, Optional, Tuple
+from pathlib import Path
+import threading
+import time
+import numpy as np
+import cv2
+
+try:
+    from ultralytics import YOLO
+    ULTRALYTICS_AVAILABLE = True
+except ImportError:
+    ULTRALYTICS_AVAILABLE = False
+
+try:
+    import onnxruntime as ort
+    ONNXRUNTIME_AVAILABLE = True
+except ImportError:
+    ONNXRUNTIME_AVAILABLE = False
+
+try:
+    import openvino as ov
+    OPENVINO_AVAILABLE = True
+except ImportError:
+    OPENVINO_AVAILABLE = False
+
+from config import (
+    YOLO_CONFIDENCE, YOLO_IOU_THRESHOLD, PERSON_CLASS_ID, MODEL_WARMUP_SIZE,
+    DETECTOR_IMGSZ, CPU_THREADS, OPENVINO_DEVICE
+)
+
+# (boxes_xyxy (N, 4), confidences (N,)) in pixel coordinates
+FrameDetections = Tuple[np.ndarray, np.ndarray]
+
+
+def empty_detections() -> FrameDetections:
+    """Get an empty detection result."""
+    return np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=np.float32)
+
+
+def letterbox(frame: np.ndarray, imgsz: int) -> Tuple[np.ndarray, float, Tuple[int, int]]:
+    """Resize with unchanged aspect ratio and pad to a square input.
+
+    Returns:
+        Tuple of (padded_image, scale_ratio, (pad_x, pad_y))
+    """
+    h, w = frame.shape[:2]
+    ratio = min(imgsz / h, imgsz / w)
+    new_w, new_h = int(round(w * ratio)), int(round(h * ratio))
+    pad_x = (imgsz - new_w) // 2
+    pad_y = (imgsz - new_h) // 2
+
+    canvas = np.full((imgsz, imgsz, 3), 114, dtype=np.uint8)
+    canvas[pad_y:pad_y + new_h, pad_x:pad_x + new_w] = cv2.resize(
+        frame, (new_w, new_h), interpolation=cv2.INTER_LINEAR
+    )
+    return canvas, ratio, (pad_x, pad_y)
+
+
+def preprocess_batch(
+    frames: List[np.ndarray],
+    imgsz: int = DETECTOR_IMGSZ
+) -> Tuple[np.ndarray, List[Tuple[float, Tuple[int, int]]]]:
+    """Letterbox frames into one (B, 3, S, S) float32 RGB tensor.
+
+    Returns:
+        Tuple of (batch_tensor, [(scale_ratio, (pad_x, pad_y)), ...])
+    """
+    batch = np.empty((len(frames), 3, imgsz, imgsz), dtype=np.float32)
+    transforms = []
+    for i, frame in enumerate(frames):
+        canvas, ratio, pad = letterbox(frame, imgsz)
+        # BGR HWC uint8 -> RGB CHW float [0, 1]
+        batch[i] = canvas[:, :, ::-1].transpose(2, 0, 1) * (1.0 / 255.0)
+        transforms.append((ratio, pad))
+    return batch, transforms
+
+
+class DetectorBackend(ABC):
+    """Base class for a thread-safe, shared detector runtime."""
+
+    name = "base"
+
+    def __init__(self, model_path: str):
+        self.model_path = str(model_path)
+        self.confidence = YOLO_CONFIDENCE
+        self.iou_threshold = YOLO_IOU_THRESHOLD
+        self.imgsz = DETECTOR_IMGSZ  # Default input size
+        self.loaded_at = time.time()
+        self.load_seconds = 0.0
+        self.inference_count = 0
+        self.inference_seconds = 0.0
+        self._lock = threading.Lock()
+
+    def predict(self, frames: List[np.ndarray], imgsz: Optional[int] = None) -> List[FrameDetections]:
+        """Detect people in a batch of frames.
+
+        Calls are serialized on the backend's lock so one loaded model can
+        be shared by every camera.
+
+        Args:
+            frames: List of BGR images (H, W, C)
+            imgsz: Input size (multiple of DETECTOR_STRIDE) to letterbox
+                to, None for the backend's default
+
+        Returns:
+            List of (boxes_xyxy, confidences) per frame, in pixel coords
+        """
+        if not frames:
+            return []
+
+        with self._lock:
+            start = time.perf_counter()
+            results = self._predict(frames, imgsz or self.imgsz)
+            self.inference_seconds += time.perf_counter() - start
+            self.inference_count += 1
+        return results
+
+    @abstractmethod
+    def _predict(self, frames: List[np.ndarray], imgsz: int) -> List[FrameDetections]:
+        """Run the model on a batch of frames, called under the lock."""
+
+    def warmup(self, size: int = MODEL_WARMUP_SIZE):
+        """Run a dummy inference so the first real frame pays no setup cost."""
+        self.predict([np.zeros((size, size, 3), dtype=np.uint8)])
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Convert to dictionary for status reporting."""
+        avg_ms = self.inference_seconds / self.inference_count * 1000 if self.inference_count else 0.0
+        return {
+            "backend": self.name,
+            "model": self.model_path,
+            "load_seconds": round(self.load_seconds, 2),
+            "inference_count": self.inference_count,
+            "avg_inference_ms": round(avg_ms, 1),
+            "loaded_at": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime(self.loaded_at))
+        }
+
+
+class UltralyticsBackend(DetectorBackend):
+    """PyTorch inference through the ultralytics YOLO API."""
+
+    name = "ultralytics"
+
+    def __init__(self, model_path: str):
+        super().__init__(model_path)
+        if not ULTRALYTICS_AVAILABLE:
+            raise ImportError("ultralytics is required for the 'ultralytics' backend")
+        self.model = YOLO(self.model_path)
+
+    def _predict(self, frames: List[np.ndarray], imgsz: int) -> List[FrameDetections]:
+        results = self.model(
+            frames,
+            imgsz=imgsz,
+            conf=self.confidence,
+            iou=self.iou_threshold,
+            classes=[PERSON_CLASS_ID],  # Only detect people
+            verbose=False
+        )
+
+        outputs = []
+        for result in results:
+            if result.boxes is not None and len(result.boxes) > 0:
+                outputs.append((result.boxes.xyxy.cpu().numpy(), result.boxes.conf.cpu().numpy()))
+            else:
+                outputs.append(empty_detections())
+        return outputs
+
+
+class ExportedYOLOBackend(DetectorBackend):
+    """Shared pre/post-processing for exported YOLOv8 graphs (ONNX, OpenVINO).
+
+    The exported graph takes a (B, 3, S, S) float input and returns raw
+    (B, 4 + classes, anchors) predictions; letterboxing, person filtering
+    and NMS happen here.
+    """
+
+    def __init__(self, model_path: str, imgsz: int = DETECTOR_IMGSZ):
+        super().__init__(model_path)
+        if not Path(self.model_path).exists():
+            raise FileNotFoundError(
+                f"Exported model not found: {self.model_path} "
+                f"(run scripts/export_detector.py first)"
+            )
+        self.imgsz = imgsz
+
+    def _postprocess(
+        self,
+        output: np.ndarray,
+        frame: np.ndarray,
+        ratio: float,
+        pad: Tuple[int, int]
+    ) -> FrameDetections:
+        """Decode one frame's raw predictions into person boxes."""
+        # (4 + classes, anchors) -> person confidences per anchor
+        scores = output[4 + PERSON_CLASS_ID]
+        keep = scores >= self.confidence
+        if not np.any(keep):
+            return empty_detections()
+
+        cx, cy, bw, bh = output[:4, keep]
+        scores = scores[keep]
+
+        # Undo letterbox and convert to xyxy
+        x1 = (cx - bw / 2 - pad[0]) / ratio
+        y1 = (cy - bh / 2 - pad[1]) / ratio
+        w = bw / ratio
+        h = bh / ratio
+
+        indices = cv2.dnn.NMSBoxes(
+            np.stack([x1, y1, w, h], axis=1).tolist(),
+            scores.tolist(),
+            self.confidence,
+            self.iou_threshold
+        )
+        if len(indices) == 0:
+            return empty_detections()
+        indices = np.asarray(indices).reshape(-1)
+
+        height, width = frame.shape[:2]
+        boxes = np.stack([x1, y1, x1 + w, y1 + h], axis=1)[indices]
+        boxes[:, [0, 2]] = boxes[:, [0, 2]].clip(0, width)
+        boxes[:, [1, 3]] = boxes[:, [1, 3]].clip(0, height)
+        return boxes.astype(np.float32), scores[indices].astype(np.float32)
+
+    def _predict(self, frames: List[np.ndarray], imgsz: int) -> List[FrameDetections]:
+        # Exported with dynamic height and width, so any stride multiple works
+        batch, transforms = preprocess_batch(frames, imgsz)
+        outputs = self._run(batch)
+        return [
+            self._postprocess(outputs[i], frame, ratio, pad)
+            for i, (frame, (ratio, pad)) in enumerate(zip(frames, transforms))
+        ]
+
+    @abstractmethod
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        """Run the graph on a preprocessed batch, returning (B, 4 + classes, anchors)."""
+
+
+class OnnxRuntimeBackend(ExportedYOLOBackend):
+    """ONNX Runtime CPU inference (FP32 or INT8 quantized graphs)."""
+
+    name = "onnxruntime"
+
+    def __init__(self, model_path: str, imgsz: int = DETECTOR_IMGSZ):
+        super().__init__(model_path, imgsz)
+        if not ONNXRUNTIME_AVAILABLE:
+            raise ImportError("onnxruntime is required for the 'onnxruntime' backend")
+
+        options = ort.SessionOptions()
+        options.graph_optimization_level = ort.GraphOptimizationLevel.ORT_ENABLE_ALL
+        if CPU_THREADS > 0:
+            options.intra_op_num_threads = CPU_THREADS
+        self.session = ort.InferenceSession(
+            self.model_path,
+            sess_options=options,
+            providers=["CPUExecutionProvider"]
+        )
+        self.input_name = self.session.get_inputs()[0].name
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.session.run(None, {self.input_name: batch})[0]
+
+
+class OpenVINOBackend(ExportedYOLOBackend):
+    """OpenVINO inference on an ONNX or IR graph."""
+
+    name = "openvino"
+
+    def __init__(self, model_path: str, imgsz: int = DETECTOR_IMGSZ):
+        super().__init__(model_path, imgsz)
+        if not OPENVINO_AVAILABLE:
+            raise ImportError("openvino is required for the 'openvino' backend")
+
+        core = ov.Core()
+        config = {"PERFORMANCE_HINT": "THROUGHPUT"}
+        if CPU_THREADS > 0:
+            config["INFERENCE_NUM_THREADS"] = CPU_THREADS
+        self.compiled = core.compile_model(self.model_path, OPENVINO_DEVICE, config)
+        self.output = self.compiled.output(0)
+
+    def _run(self, batch: np.ndarray) -> np.ndarray:
+        return self.compiled(batch)[self.output]
+
+
+BACKENDS = {
+    UltralyticsBackend.name: UltralyticsBackend,
+    OnnxRuntimeBackend.name: OnnxRuntimeBackend,
+    OpenVINOBackend.name: OpenVINOBackend,
+}
+
+
+def create_backend(backend: str, model_path: str) -> DetectorBackend:
+    """Create a detector backend by name.
+
+    Args:
+        backend: Backend name ("ultralytics", "onnxruntime" or "openvino")
+        model_path: Weights (.pt) or exported graph (.onnx / .xml)
+
+    Returns:
+        Loaded DetectorBackend
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown detector backend '{backend}'. Available: {list(BACKENDS)}")
+    return BACKENDS[backend](model_path)
@@ -0,0 +1,96 @@
+"""Sparse optical flow propagation of detection boxes between keyframes."""
+
+from typing import Optional, Tuple
+import numpy as np
+import cv2
+
+from config import PROPAGATION_SCALE, PROPAGATION_GRID
+
+
+class BoxPropagator:
+    """Moves boxes from the previous frame to the current one with pyramidal LK.
+
+    A small grid of points inside each box is tracked with one
+    calcOpticalFlowPyrLK call for all boxes, and each box is shifted by
+    the median displacement of its successfully tracked points.
+    """
+
+    def __init__(self, scale: float = PROPAGATION_SCALE, grid: int = PROPAGATION_GRID):
+        """Initialize the propagator.
+
+        Args:
+            scale: Downscale factor for the grey frames used by LK
+            grid: Points per box side (grid x grid points per box)
+        """
+        self.scale = scale
+        self.grid = grid
+        self.prev_gray: Optional[np.ndarray] = None
+        self.lk_params = dict(
+            winSize=(15, 15),
+            maxLevel=2,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
+        )
+
+        # Relative positions of the sample grid inside a box (kept off the edges)
+        steps = (np.arange(grid) + 0.5) / grid
+        gx, gy = np.meshgrid(0.2 + 0.6 * steps, 0.2 + 0.6 * steps)
+        self._grid_offsets = np.stack([gx.ravel(), gy.ravel()], axis=1).astype(np.float32)
+
+    def _gray(self, frame: np.ndarray) -> np.ndarray:
+        """Convert a frame to the downscaled grey image used by LK."""
+        gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+        h, w = gray.shape
+        return cv2.resize(gray, (int(w * self.scale), int(h * self.scale)))
+
+    def observe(self, frame: np.ndarray):
+        """Store a frame as the reference for the next propagation."""
+        self.prev_gray = self._gray(frame)
+
+    def propagate(
+        self,
+        frame: np.ndarray,
+        boxes_pct: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Move boxes from the previous frame into this one.
+
+        Args:
+            frame: Current BGR frame
+            boxes_pct: (N, 4) boxes as (x, y, width, height) percentages
+
+        Returns:
+            Tuple of (moved boxes (N, 4), (N,) bool mask of boxes with a
+            reliable flow estimate)
+        """
+        gray = self._gray(frame)
+        prev_gray, self.prev_gray = self.prev_gray, gray
+
+        n = len(boxes_pct)
+        if prev_gray is None or n == 0 or prev_gray.shape != gray.shape:
+            return boxes_pct.copy(), np.zeros(n, dtype=bool)
+
+        h, w = gray.shape
+        scale = np.array([w / 100.0, h / 100.0], dtype=np.float32)
+
+        # (N, P, 2) sample points in downscaled pixel coords
+        origin = boxes_pct[:, None, :2] * scale
+        size = boxes_pct[:, None, 2:4] * scale
+        points = (origin + self._grid_offsets[None] * size).reshape(-1, 1, 2).astype(np.float32)
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None, **self.lk_params)
+
+        displacement = (moved - points).reshape(n, -1, 2)
+        valid = status.reshape(n, -1).astype(bool)
+        displacement[~valid] = np.nan
+
+        with np.errstate(all="ignore"):
+            median = np.nanmedian(displacement, axis=1)  # (N, 2)
+        reliable = valid.sum(axis=1) >= max(2, valid.shape[1] // 3)
+        median[~reliable] = 0.0
+
+        result = boxes_pct.copy()
+        result[:, :2] += median / scale
+        return result, reliable
+
+    def reset(self):
+        """Forget the reference frame."""
+        self.prev_gray = None
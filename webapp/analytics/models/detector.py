@@ -1,10 +1,40 @@
 """YOLOv8 People Detector."""
 
-from typing import List, Dict, Any, Optional
+from typing import List, Dict, Any, Optional, Tuple, Union
+from pathlib import Path
 import numpy as np
-from ultralytics import YOLO
 
-from config import YOLO_MODEL, YOLO_CONFIDENCE, YOLO_IOU_THRESHOLD, PERSON_CLASS_ID
+from models.registry import get_model
+from models.inference_server import get_inference_server
+from config import (
+    DETECTOR_BACKEND, DETECTOR_IMGSZ, DETECTOR_STRIDE, BATCH_INFERENCE, TILE_GRID, TILE_OVERLAP,
+    TILE_MERGE_THRESHOLD
+)
+
+# Pixel rectangle (x0, y0, x1, y1)
+Region = Tuple[int, int, int, int]
+
+# One row per detection; coordinates are percentages of the frame
+DETECTION_DTYPE = np.dtype([
+    ("x", np.float32),  # Top-left x
+    ("y", np.float32),  # Top-left y
+    ("width", np.float32),
+    ("height", np.float32),
+    ("confidence", np.float32),  # 0-100
+    ("track_id", np.int32),  # NO_TRACK if untracked
+])
+NO_TRACK = -1
+
+
+def format_track_id(track_id: int) -> str:
+    """Format a numeric track ID for the API (e.g. 7 -> "T007")."""
+    return f"T{track_id:03d}"
+
+
+def parse_track_id(label: Any) -> int:
+    """Numeric track ID of an API label ("T007" -> 7), NO_TRACK if it has none."""
+    digits = "".join(ch for ch in str(label) if ch.isdigit()) if label is not None else ""
+    return int(digits) if digits else NO_TRACK
 
 
 class Detection:
@@ -50,69 +80,546 @@ class Detection:
         return (self.x, self.y, self.x + self.width, self.y + self.height)
 
 
+class DetectionBatch:
+    """All person detections of one frame in a single structured array.
+
+    Hot paths work on the columns directly; dictionaries are only built at
+    the API edge by to_dicts().
+    """
+
+    def __init__(self, data: Optional[np.ndarray] = None):
+        self.data = data if data is not None else np.zeros(0, dtype=DETECTION_DTYPE)
+
+    @classmethod
+    def from_xyxy(
+        cls,
+        boxes: np.ndarray,
+        confidences: np.ndarray,
+        frame_size: Tuple[int, int]
+    ) -> "DetectionBatch":
+        """Build a batch from pixel boxes.
+
+        Args:
+            boxes: (N, 4) boxes as (x1, y1, x2, y2) in pixels
+            confidences: (N,) confidences in 0-1
+            frame_size: (width, height) of the frame
+        """
+        width, height = frame_size
+        data = np.empty(len(boxes), dtype=DETECTION_DTYPE)
+        if len(boxes) > 0:
+            data["x"] = boxes[:, 0] / width * 100
+            data["y"] = boxes[:, 1] / height * 100
+            data["width"] = (boxes[:, 2] - boxes[:, 0]) / width * 100
+            data["height"] = (boxes[:, 3] - boxes[:, 1]) / height * 100
+            data["confidence"] = confidences * 100
+            data["track_id"] = NO_TRACK
+        return cls(data)
+
+    @classmethod
+    def from_dicts(cls, objects: List[Dict[str, Any]]) -> "DetectionBatch":
+        """Build a batch from API-style dictionaries (x, y, width, height,
+        confidence and an 'id' label or numeric 'track_id')."""
+        data = np.zeros(len(objects), dtype=DETECTION_DTYPE)
+        for name in ("x", "y", "width", "height", "confidence"):
+            data[name] = [obj.get(name, 0) for obj in objects]
+        data["track_id"] = [parse_track_id(obj.get("id", obj.get("track_id"))) for obj in objects]
+        return cls(data)
+
+    def __len__(self) -> int:
+        return len(self.data)
+
+    def __getitem__(self, index: int) -> Detection:
+        row = self.data[index]
+        track_id = int(row["track_id"])
+        return Detection(
+            x=float(row["x"]),
+            y=float(row["y"]),
+            width=float(row["width"]),
+            height=float(row["height"]),
+            confidence=float(row["confidence"]),
+            track_id=format_track_id(track_id) if track_id != NO_TRACK else None
+        )
+
+    @property
+    def track_id(self) -> np.ndarray:
+        """Track ID column (writable view)."""
+        return self.data["track_id"]
+
+    @property
+    def confidence(self) -> np.ndarray:
+        """Confidence column (0-100)."""
+        return self.data["confidence"]
+
+    def xywh(self) -> np.ndarray:
+        """Boxes as an (N, 4) array of (x, y, width, height) percentages."""
+        return np.stack(
+            [self.data["x"], self.data["y"], self.data["width"], self.data["height"]],
+            axis=1
+        )
+
+    def xyxy_pixels(self, frame_size: Tuple[int, int]) -> np.ndarray:
+        """Boxes as an (N, 4) array of (x1, y1, x2, y2) pixels."""
+        width, height = frame_size
+        xywh = self.xywh()
+        xyxy = np.concatenate([xywh[:, :2], xywh[:, :2] + xywh[:, 2:]], axis=1)
+        return xyxy * (np.array([width, height, width, height], dtype=np.float32) / 100.0)
+
+    def centers(self) -> np.ndarray:
+        """Box centres as an (N, 2) array of percentages."""
+        return np.stack([
+            self.data["x"] + self.data["width"] / 2,
+            self.data["y"] + self.data["height"] / 2
+        ], axis=1)
+
+    def feet_pixels(self, frame_size: Tuple[int, int]) -> np.ndarray:
+        """Bottom-centre (ground contact) points as an (N, 2) array of pixels."""
+        width, height = frame_size
+        return np.stack([
+            (self.data["x"] + self.data["width"] / 2) * (width / 100.0),
+            (self.data["y"] + self.data["height"]) * (height / 100.0)
+        ], axis=1)
+
+    def with_boxes(self, xywh: np.ndarray) -> "DetectionBatch":
+        """Copy of the batch with new (x, y, width, height) boxes."""
+        data = self.data.copy()
+        data["x"], data["y"], data["width"], data["height"] = xywh.T
+        return DetectionBatch(data)
+
+    def tracked(self) -> "DetectionBatch":
+        """The detections that belong to a track."""
+        return DetectionBatch(self.data[self.data["track_id"] != NO_TRACK])
+
+    def to_dicts(self) -> List[Dict[str, Any]]:
+        """Convert to a list of dictionaries for API responses."""
+        columns = [
+            np.round(self.data[name].astype(np.float64), digits).tolist()
+            for name, digits in (("x", 2), ("y", 2), ("width", 2), ("height", 2), ("confidence", 1))
+        ]
+        result = []
+        for (x, y, width, height, confidence), track_id in zip(zip(*columns), self.data["track_id"].tolist()):
+            item = {"x": x, "y": y, "width": width, "height": height, "confidence": confidence}
+            if track_id != NO_TRACK:
+                item["id"] = format_track_id(track_id)
+            result.append(item)
+        return result
+
+
+TrackedObjects = Union[DetectionBatch, List[Dict[str, Any]]]
+
+
+def as_batch(tracked_objects: TrackedObjects) -> DetectionBatch:
+    """A DetectionBatch for a batch or a list of dicts.
+
+    Lets the analyzers work on columns on hot paths while still
+    accepting the dictionaries sent by API clients.
+    """
+    if isinstance(tracked_objects, DetectionBatch):
+        return tracked_objects
+    return DetectionBatch.from_dicts(tracked_objects)
+
+
+def normalized_positions(batch: DetectionBatch) -> Tuple[np.ndarray, np.ndarray]:
+    """Top-left (x, y) of every detection in 0-1 frame units.
+
+    Percentages are divided by 100; rows already in 0-1 (dicts from
+    clients) are left alone.
+    """
+    x = batch.data["x"].astype(np.float64)
+    y = batch.data["y"].astype(np.float64)
+    percent = (x > 1) | (y > 1)
+    return np.where(percent, x / 100.0, x), np.where(percent, y / 100.0, y)
+
+
+def merge_boxes(
+    boxes: np.ndarray,
+    confidences: np.ndarray,
+    groups: Optional[np.ndarray] = None,
+    threshold: float = TILE_MERGE_THRESHOLD
+) -> Tuple[np.ndarray, np.ndarray]:
+    """Greedy NMS across tiles using intersection over the smaller box.
+
+    A person cut by a tile edge shows up as a partial box inside the full
+    one, which plain IoU would keep; intersection-over-smaller removes it.
+    Boxes from the same tile were already de-duplicated by the model, so
+    only boxes from different groups suppress each other.
+
+    Args:
+        boxes: (N, 4) xyxy boxes in pixel coords
+        confidences: (N,) confidence scores
+        groups: Optional (N,) tile index of each box
+        threshold: Overlap above which the lower-scoring box is dropped
+
+    Returns:
+        Tuple of (boxes, confidences) that survive merging
+    """
+    if len(boxes) < 2:
+        return boxes, confidences
+
+    x1, y1, x2, y2 = boxes.T
+    areas = (x2 - x1) * (y2 - y1)
+    order = np.argsort(-confidences)
+    keep = []
+
+    while order.size > 0:
+        i = order[0]
+        keep.append(i)
+        rest = order[1:]
+
+        inter = (
+            np.clip(np.minimum(x2[i], x2[rest]) - np.maximum(x1[i], x1[rest]), 0, None) *
+            np.clip(np.minimum(y2[i], y2[rest]) - np.maximum(y1[i], y1[rest]), 0, None)
+        )
+        overlap = inter / (np.minimum(areas[i], areas[rest]) + 1e-9)
+        suppress = overlap > threshold
+        if groups is not None:
+            suppress &= groups[rest] != groups[i]
+        order = rest[~suppress]
+
+    return boxes[keep], confidences[keep]
+
+
+def box_iou(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """Pairwise IoU between (N, 4) and (M, 4) xyxy boxes.
+
+    Returns:
+        (N, M) IoU matrix
+    """
+    if len(a) == 0 or len(b) == 0:
+        return np.zeros((len(a), len(b)), dtype=np.float32)
+    x1 = np.maximum(a[:, None, 0], b[None, :, 0])
+    y1 = np.maximum(a[:, None, 1], b[None, :, 1])
+    x2 = np.minimum(a[:, None, 2], b[None, :, 2])
+    y2 = np.minimum(a[:, None, 3], b[None, :, 3])
+    inter = np.clip(x2 - x1, 0, None) * np.clip(y2 - y1, 0, None)
+    area_a = (a[:, 2] - a[:, 0]) * (a[:, 3] - a[:, 1])
+    area_b = (b[:, 2] - b[:, 0]) * (b[:, 3] - b[:, 1])
+    return inter / (area_a[:, None] + area_b[None, :] - inter + 1e-9)
+
+
+def points_in_polygon(points: np.ndarray, polygon: np.ndarray) -> np.ndarray:
+    """Vectorized ray-casting test of many points against one polygon.
+
+    Args:
+        points: (N, 2) array of (x, y)
+        polygon: (M, 2) array of polygon vertices in the same units
+
+    Returns:
+        (N,) boolean array, True where the point is inside
+    """
+    x, y = points[:, 0], points[:, 1]
+    inside = np.zeros(len(points), dtype=bool)
+    xj, yj = polygon[-1]
+    for xi, yi in polygon:
+        crosses = (yi > y) != (yj > y)
+        with np.errstate(divide="ignore", invalid="ignore"):
+            x_cross = (xj - xi) * (y - yi) / (yj - yi) + xi
+        inside ^= crosses & (x < x_cross)
+        xj, yj = xi, yi
+    return inside
+
+
 class PeopleDetector:
     """YOLOv8-based people detector."""
 
-    def __init__(self, model_path: str = YOLO_MODEL):
-        """Initialize the detector with a YOLO model.
+    def __init__(
+        self,
+        model_path: Optional[str] = None,
+        backend: str = DETECTOR_BACKEND,
+        batched: bool = BATCH_INFERENCE,
+        tiling: Optional[Dict[str, Any]] = None,
+        polygon: Optional[List[List[float]]] = None,
+        roi_boxes: Optional[List[List[float]]] = None
+    ):
+        """Initialize the detector with a shared YOLO model.
+
+        The weights are loaded once per process by the model registry, so
+        creating a detector is cheap.
 
         Args:
-            model_path: Path to YOLO model weights or model name (e.g., "yolov8s.pt")
+            model_path: Weights or exported graph (defaults to the backend's model)
+            backend: Inference backend ("ultralytics", "onnxruntime" or "openvino")
+            batched: Send frames through the shared cross-camera batching server
+            tiling: Optional tiled-inference settings from calibration.json
+                ({"enabled": bool, "grid": [cols, rows], "overlap": float})
+            polygon: Optional monitored-area polygon in percentage coords
+            roi_boxes: Optional [x1, y1, x2, y2] percentage boxes to run
+                inference on (defaults to the polygon's bounding box)
         """
-        self.model = YOLO(model_path)
-        self.confidence = YOLO_CONFIDENCE
-        self.iou_threshold = YOLO_IOU_THRESHOLD
+        self.backend = backend
+        self.model_path = model_path
+        self.model = get_model(model_path, backend)
+        self.server = get_inference_server(model_path, backend) if batched else None
         self._last_raw_detections = None  # Store for tracker use
 
-    def detect(self, frame: np.ndarray) -> List[Detection]:
+        # Tiled inference for dense crowds of small people
+        self.tile_grid: Optional[Tuple[int, int]] = None
+        self.tile_overlap = TILE_OVERLAP
+        if tiling and tiling.get("enabled", True):
+            self.set_tiling(tuple(tiling.get("grid", TILE_GRID)), tiling.get("overlap", TILE_OVERLAP))
+
+        # Region of interest: only these parts of the frame are inferred on
+        self.roi_polygon: Optional[np.ndarray] = None
+        self.roi_boxes: List[Tuple[float, float, float, float]] = []
+        self.set_roi(polygon, roi_boxes)
+
+    def set_model(self, model_path: Optional[str] = None):
+        """Switch to other weights on the same backend, e.g. a smaller model under load.
+
+        The weights come from the shared registry, so each model is loaded
+        once per process and switching back is free.
+
+        Args:
+            model_path: Weights or exported graph (None = the backend's default)
+        """
+        if model_path == self.model_path:
+            return
+        self.model_path = model_path
+        self.model = get_model(model_path, self.backend)
+        if self.server is not None:
+            self.server = get_inference_server(model_path, self.backend)
+
+    def set_roi(
+        self,
+        polygon: Optional[List[List[float]]] = None,
+        roi_boxes: Optional[List[List[float]]] = None
+    ):
+        """Restrict detection to a monitored area.
+
+        Inference runs only on the ROI boxes (the polygon's bounding box if
+        none are given) and detections whose centre falls outside the
+        polygon are dropped. A polygon covering the whole frame disables
+        cropping.
+
+        Args:
+            polygon: Polygon vertices as [x, y] percentages, or None
+            roi_boxes: List of [x1, y1, x2, y2] percentage boxes, or None
+        """
+        self.roi_polygon = None
+        self.roi_boxes = []
+
+        if polygon:
+            points = np.clip(np.asarray(polygon, dtype=np.float32), 0, 100)
+            x1, y1 = points.min(axis=0)
+            x2, y2 = points.max(axis=0)
+            if (x1, y1, x2, y2) != (0, 0, 100, 100):
+                self.roi_polygon = points
+                self.roi_boxes = [(float(x1), float(y1), float(x2), float(y2))]
+
+        if roi_boxes:
+            self.roi_boxes = [
+                tuple(float(v) for v in np.clip(box, 0, 100)) for box in roi_boxes
+            ]
+
+    def set_tiling(self, grid: Optional[Tuple[int, int]] = TILE_GRID, overlap: float = TILE_OVERLAP):
+        """Enable tiled inference, or disable it with grid=None.
+
+        Args:
+            grid: (tiles across, tiles down)
+            overlap: Fractional overlap between neighbouring tiles (0-0.5)
+        """
+        self.tile_grid = (max(1, int(grid[0])), max(1, int(grid[1]))) if grid else None
+        self.tile_overlap = min(max(overlap, 0.0), 0.5)
+
+    def _tile_spans(self, length: int, count: int) -> List[Tuple[int, int]]:
+        """Split one axis into ``count`` overlapping spans."""
+        if count <= 1:
+            return [(0, length)]
+        tile = length / (count - (count - 1) * self.tile_overlap)
+        step = tile * (1 - self.tile_overlap)
+        return [
+            (int(round(i * step)), min(length, int(round(i * step + tile))))
+            for i in range(count)
+        ]
+
+    def _roi_regions(self, width: int, height: int) -> List[Region]:
+        """Get the ROI boxes in pixel coords (the full frame if no ROI)."""
+        if not self.roi_boxes:
+            return [(0, 0, width, height)]
+
+        regions = []
+        for x1, y1, x2, y2 in self.roi_boxes:
+            x0, y0 = int(x1 / 100 * width), int(y1 / 100 * height)
+            x3, y3 = int(np.ceil(x2 / 100 * width)), int(np.ceil(y2 / 100 * height))
+            if x3 - x0 > 1 and y3 - y0 > 1:
+                regions.append((x0, y0, x3, y3))
+        return regions or [(0, 0, width, height)]
+
+    def _regions(self, width: int, height: int) -> List[Region]:
+        """Get the pixel regions to run inference on for a frame size."""
+        regions = self._roi_regions(width, height)
+        if self.tile_grid is None:
+            return regions
+        return [
+            (rx0 + x0, ry0 + y0, rx0 + x1, ry0 + y1)
+            for rx0, ry0, rx1, ry1 in regions
+            for y0, y1 in self._tile_spans(ry1 - ry0, self.tile_grid[1])
+            for x0, x1 in self._tile_spans(rx1 - rx0, self.tile_grid[0])
+        ]
+
+    def _region_imgsz(self, region: Region, width: int, height: int) -> Optional[int]:
+        """Input size that keeps an ROI crop at the full frame's scale.
+
+        Letterboxed to the full input size, a crop would be upsampled and
+        cost as much as the whole frame; at the frame's own scale the cost
+        falls with the crop's area. Tiles keep the full size, since
+        enlarging small people is what tiling is for.
+
+        Returns:
+            Input size for the crop, None for the default
+        """
+        if self.tile_grid is not None:
+            return None
+        x0, y0, x1, y1 = region
+        side = DETECTOR_IMGSZ * max(x1 - x0, y1 - y0) / max(width, height)
+        imgsz = int(np.ceil(side / DETECTOR_STRIDE)) * DETECTOR_STRIDE
+        return imgsz if imgsz < DETECTOR_IMGSZ else None
+
+    def _filter_to_polygon(
+        self,
+        boxes: np.ndarray,
+        confidences: np.ndarray,
+        width: int,
+        height: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Drop detections whose centre lies outside the ROI polygon."""
+        if self.roi_polygon is None or len(boxes) == 0:
+            return boxes, confidences
+        centers = np.stack([
+            (boxes[:, 0] + boxes[:, 2]) / 2 / width * 100,
+            (boxes[:, 1] + boxes[:, 3]) / 2 / height * 100
+        ], axis=1)
+        inside = points_in_polygon(centers, self.roi_polygon)
+        return boxes[inside], confidences[inside]
+
+    def _predict_batch(
+        self,
+        frames: List[np.ndarray],
+        sizes: List[Optional[int]]
+    ) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Run the model on several images, one forward pass per input size.
+
+        Args:
+            frames: BGR images
+            sizes: Input size per image, None for the default
+        """
+        if self.server is not None:
+            futures = [self.server.submit(f, imgsz) for f, imgsz in zip(frames, sizes)]
+            return [future.result() for future in futures]
+
+        results: List[Optional[Tuple[np.ndarray, np.ndarray]]] = [None] * len(frames)
+        for imgsz in set(sizes):
+            indices = [i for i, size in enumerate(sizes) if size == imgsz]
+            for i, result in zip(indices, self.model.predict([frames[i] for i in indices], imgsz)):
+                results[i] = result
+        return results
+
+    def _merge_regions(
+        self,
+        regions: List[Region],
+        results: List[Tuple[np.ndarray, np.ndarray]],
+        width: int,
+        height: int
+    ) -> Tuple[np.ndarray, np.ndarray]:
+        """Map per-region detections back to the frame and merge them.
+
+        Returns:
+            Tuple of (boxes_xyxy (N, 4), confidences (N,)) in pixel coords
+        """
+        all_boxes = []
+        all_confidences = []
+        all_groups = []
+        for index, ((x0, y0, _, _), (boxes, confidences)) in enumerate(zip(regions, results)):
+            if len(boxes) > 0:
+                # Map crop coordinates back to the full frame
+                all_boxes.append(boxes + np.array([x0, y0, x0, y0], dtype=boxes.dtype))
+                all_confidences.append(confidences)
+                all_groups.append(np.full(len(boxes), index))
+
+        if not all_boxes:
+            return np.zeros((0, 4), dtype=np.float32), np.zeros((0,), dtype=np.float32)
+
+        boxes = np.concatenate(all_boxes)
+        confidences = np.concatenate(all_confidences)
+        if len(regions) > 1:
+            boxes, confidences = merge_boxes(boxes, confidences, np.concatenate(all_groups))
+
+        return self._filter_to_polygon(boxes, confidences, width, height)
+
+    def _predict_many(self, frames: List[np.ndarray]) -> List[Tuple[np.ndarray, np.ndarray]]:
+        """Run the model on the ROI crops and tiles of several frames, batched by input size.
+
+        Returns:
+            Per frame, a tuple of (boxes_xyxy (N, 4), confidences (N,)) in pixel coords
+        """
+        frame_regions = []
+        crops = []
+        sizes = []
+        for frame in frames:
+            height, width = frame.shape[:2]
+            regions = self._regions(width, height)
+            frame_regions.append(regions)
+            if len(regions) == 1 and regions[0] == (0, 0, width, height):
+                crops.append(frame)
+                sizes.append(None)
+            else:
+                crops.extend(frame[y0:y1, x0:x1] for x0, y0, x1, y1 in regions)
+                sizes.extend(self._region_imgsz(region, width, height) for region in regions)
+
+        results = self._predict_batch(crops, sizes)
+
+        predictions = []
+        start = 0
+        for frame, regions in zip(frames, frame_regions):
+            height, width = frame.shape[:2]
+            frame_results = results[start:start + len(regions)]
+            start += len(regions)
+            if len(regions) == 1 and regions[0] == (0, 0, width, height):
+                predictions.append(frame_results[0])
+            else:
+                predictions.append(self._merge_regions(regions, frame_results, width, height))
+        return predictions
+
+    def detect(self, frame: np.ndarray) -> DetectionBatch:
         """Detect people in a frame.
 
         Args:
             frame: BGR image as numpy array (H, W, C)
 
         Returns:
-            List of Detection objects for detected people
+            DetectionBatch with one row per detected person
         """
         height, width = frame.shape[:2]
 
-        # Run YOLO detection
-        results = self.model(
-            frame,
-            conf=self.confidence,
-            iou=self.iou_threshold,
-            classes=[PERSON_CLASS_ID],  # Only detect people
-            verbose=False
-        )[0]
-
-        detections = []
-
-        if results.boxes is not None and len(results.boxes) > 0:
-            boxes = results.boxes.xyxy.cpu().numpy()  # (x1, y1, x2, y2)
-            confidences = results.boxes.conf.cpu().numpy()
+        boxes, confidences = self._predict_many([frame])[0]  # (x1, y1, x2, y2)
 
+        if len(boxes) > 0:
             # Store raw detections for tracker
             self._last_raw_detections = {
                 "boxes": boxes,
                 "confidences": confidences,
                 "frame_size": (width, height)
             }
-
-            for box, conf in zip(boxes, confidences):
-                x1, y1, x2, y2 = box
-
-                # Convert to percentage coordinates
-                det = Detection(
-                    x=(x1 / width) * 100,
-                    y=(y1 / height) * 100,
-                    width=((x2 - x1) / width) * 100,
-                    height=((y2 - y1) / height) * 100,
-                    confidence=float(conf) * 100
-                )
-                detections.append(det)
         else:
             self._last_raw_detections = None
 
-        return detections
+        return DetectionBatch.from_xyxy(boxes, confidences, (width, height))
+
+    def detect_many(self, frames: List[np.ndarray]) -> List[DetectionBatch]:
+        """Detect people in several frames with one forward pass.
+
+        Used by offline analysis, which does not need the raw detections
+        kept by ``detect``.
+
+        Args:
+            frames: BGR images as numpy arrays (H, W, C)
+
+        Returns:
+            One DetectionBatch per frame
+        """
+        return [
+            DetectionBatch.from_xyxy(boxes, confidences, (frame.shape[1], frame.shape[0]))
+            for frame, (boxes, confidences) in zip(frames, self._predict_many(frames))
+        ]
 
     def get_raw_detections(self) -> Optional[Dict[str, Any]]:
         """Get the last raw detection results for use by tracker."""
@@ -120,9 +627,13 @@ class PeopleDetector:
 
     @property
     def model_info(self) -> Dict[str, str]:
-        """Get model information."""
+        """Get model information for the weights currently in use."""
+        stem = Path(self.model.model_path).stem  # e.g. "yolov8n" after a live-mode downgrade
         return {
-            "name": "YOLOv8s",
+            "name": f"YOLO{stem[4:]}" if stem.lower().startswith("yolo") else stem,
+            "model": self.model.model_path,
             "task": "People Detection",
-            "accuracy": "90-95%"
+            "accuracy": "90-95%",
+            "backend": self.model.name,
+            "tiles": self.tile_grid[0] * self.tile_grid[1] if self.tile_grid else 1
         }
@@ -0,0 +1,98 @@
+"""Pluggable dense optical flow engines for velocity estimation."""
+
+from abc import ABC, abstractmethod
+from typing import Dict, Optional
+import numpy as np
+import cv2
+
+from config import FLOW_ENGINE, FLOW_PRESET
+
+DIS_PRESETS = {
+    "ultrafast": cv2.DISOPTICAL_FLOW_PRESET_ULTRAFAST,
+    "fast": cv2.DISOPTICAL_FLOW_PRESET_FAST,
+    "medium": cv2.DISOPTICAL_FLOW_PRESET_MEDIUM,
+}
+
+
+class FlowEngine(ABC):
+    """Common interface for dense flow engines.
+
+    ``compute`` takes two single-channel uint8 frames of equal size and
+    returns an (H, W, 2) float32 flow field in pixels per frame.
+    """
+
+    name = "base"
+
+    def __init__(self, preset: Optional[str] = None):
+        self.preset = preset
+
+    @abstractmethod
+    def compute(self, prev_gray: np.ndarray, gray: np.ndarray) -> np.ndarray:
+        """Flow from ``prev_gray`` to ``gray``."""
+
+    @property
+    def label(self) -> str:
+        """Engine and preset, e.g. ``dis-ultrafast``."""
+        return f"{self.name}-{self.preset}" if self.preset else self.name
+
+    def to_dict(self) -> Dict[str, Optional[str]]:
+        return {"engine": self.name, "preset": self.preset}
+
+
+class FarnebackEngine(FlowEngine):
+    """OpenCV Farneback polynomial-expansion flow (the original engine)."""
+
+    name = "farneback"
+
+    def __init__(self, preset: Optional[str] = None):
+        super().__init__(preset=None)
+        self.flow_params = dict(
+            pyr_scale=0.5,
+            levels=3,
+            winsize=15,
+            iterations=3,
+            poly_n=5,
+            poly_sigma=1.2,
+            flags=0
+        )
+
+    def compute(self, prev_gray: np.ndarray, gray: np.ndarray) -> np.ndarray:
+        return cv2.calcOpticalFlowFarneback(prev_gray, gray, None, **self.flow_params)
+
+
+class DISEngine(FlowEngine):
+    """OpenCV Dense Inverse Search flow with a speed/quality preset."""
+
+    name = "dis"
+
+    def __init__(self, preset: Optional[str] = None):
+        preset = preset or "ultrafast"
+        if preset not in DIS_PRESETS:
+            raise ValueError(f"Unknown DIS preset '{preset}'. Available: {list(DIS_PRESETS)}")
+        super().__init__(preset=preset)
+        self.dis = cv2.DISOpticalFlow_create(DIS_PRESETS[preset])
+
+    def compute(self, prev_gray: np.ndarray, gray: np.ndarray) -> np.ndarray:
+        return self.dis.calc(prev_gray, gray, None)
+
+
+FLOW_ENGINES = {
+    FarnebackEngine.name: FarnebackEngine,
+    DISEngine.name: DISEngine,
+}
+
+
+def create_flow_engine(engine: str = FLOW_ENGINE, preset: Optional[str] = FLOW_PRESET) -> FlowEngine:
+    """Create a flow engine by name.
+
+    Args:
+        engine: One of FLOW_ENGINES ("farneback", "dis")
+        preset: Engine preset; DIS accepts "ultrafast", "fast" or "medium",
+            Farneback ignores it
+
+    Returns:
+        FlowEngine instance
+    """
+    if engine not in FLOW_ENGINES:
+        raise ValueError(f"Unknown flow engine '{engine}'. Available: {list(FLOW_ENGINES)}")
+    return FLOW_ENGINES[engine](preset)
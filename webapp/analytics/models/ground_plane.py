@@ -0,0 +1,207 @@
+"""Ground-plane homography and metres-per-pixel lookup for a camera."""
+
+from typing import Any, Dict, Optional, Tuple
+import numpy as np
+import cv2
+
+from config import PIXELS_PER_METER, GROUND_GRID_STEP, GROUND_MAX_SCALE
+
+
+def _cross(a: np.ndarray, b: np.ndarray) -> np.ndarray:
+    """2D cross product of stacked vectors."""
+    return a[..., 0] * b[..., 1] - a[..., 1] * b[..., 0]
+
+
+class GroundPlane:
+    """Maps image pixels onto the ground plane of one camera.
+
+    The homography sends pixel coordinates to ground coordinates in
+    metres. At construction it is evaluated once on a lattice every
+    ``step`` pixels to build a cached grid of metres per pixel (the
+    square root of each lattice cell's ground area divided by its pixel
+    area) and of cell ground areas, so per-frame conversions are a
+    single gather from precomputed arrays.
+    """
+
+    def __init__(
+        self,
+        homography: Optional[np.ndarray],
+        frame_size: Tuple[int, int],
+        pixels_per_meter: float = PIXELS_PER_METER,
+        step: int = GROUND_GRID_STEP
+    ):
+        """Initialize the ground plane.
+
+        Args:
+            homography: 3x3 pixel -> metres homography, or None for a
+                flat ``1 / pixels_per_meter`` scale everywhere
+            frame_size: (width, height) of the frame in pixels
+            pixels_per_meter: Scalar calibration, used without a homography
+                and to cap far-field values
+            step: Lattice spacing in pixels
+        """
+        self.homography = homography
+        self.frame_size = frame_size
+        self.step = step
+
+        width, height = frame_size
+        cols = max(1, int(np.ceil(width / step)))
+        rows = max(1, int(np.ceil(height / step)))
+        self.cell_size = (width / cols, height / rows)
+
+        if homography is None:
+            self.metres_per_pixel = np.full((rows, cols), 1.0 / pixels_per_meter, dtype=np.float32)
+        else:
+            self.metres_per_pixel = self._scale_grid(homography, width, height, cols, rows)
+            # Cells near or past the horizon blow up; cap them relative to the centre
+            centre = self.metres_per_pixel[rows // 2, cols // 2]
+            cap = centre * GROUND_MAX_SCALE if np.isfinite(centre) and centre > 0 else 1.0 / pixels_per_meter
+            invalid = ~np.isfinite(self.metres_per_pixel) | (self.metres_per_pixel <= 0)
+            self.metres_per_pixel[invalid] = cap
+            np.minimum(self.metres_per_pixel, cap, out=self.metres_per_pixel)
+
+        # Ground area of each lattice cell in m²
+        self.cell_area_sqm = self.metres_per_pixel ** 2 * (self.cell_size[0] * self.cell_size[1])
+        self._resampled: Dict[Tuple[int, int], np.ndarray] = {}
+
+    @staticmethod
+    def _scale_grid(homography: np.ndarray, width: int, height: int, cols: int, rows: int) -> np.ndarray:
+        """Metres per pixel of every lattice cell, from its projected corners."""
+        xs = np.linspace(0, width, cols + 1, dtype=np.float64)
+        ys = np.linspace(0, height, rows + 1, dtype=np.float64)
+        gx, gy = np.meshgrid(xs, ys)
+        corners = np.stack([gx.ravel(), gy.ravel(), np.ones(gx.size)])
+        projected = homography @ corners
+        with np.errstate(divide="ignore", invalid="ignore"):
+            ground = (projected[:2] / projected[2]).T.reshape(rows + 1, cols + 1, 2)
+            behind = (projected[2] <= 0).reshape(rows + 1, cols + 1)
+
+        # Shoelace area of each projected quad
+        p00, p01 = ground[:-1, :-1], ground[:-1, 1:]
+        p11, p10 = ground[1:, 1:], ground[1:, :-1]
+        with np.errstate(invalid="ignore"):
+            area = 0.5 * np.abs(_cross(p00, p01) + _cross(p01, p11) + _cross(p11, p10) + _cross(p10, p00))
+
+        cell_pixels = (width / cols) * (height / rows)
+        scale = np.sqrt(area / cell_pixels)
+        invalid = behind[:-1, :-1] | behind[:-1, 1:] | behind[1:, 1:] | behind[1:, :-1]
+        scale[invalid] = np.nan
+        return scale.astype(np.float32)
+
+    @classmethod
+    def from_camera(
+        cls,
+        frame_size: Tuple[int, int],
+        camera_height_m: float,
+        camera_angle_deg: float,
+        pixels_per_meter: float = PIXELS_PER_METER
+    ) -> "GroundPlane":
+        """Build the homography of a pinhole camera tilted down at the ground.
+
+        The focal length is chosen so the scale at the image centre
+        matches ``pixels_per_meter``, keeping the existing per-camera
+        calibration while adding the near/far-field variation.
+
+        Args:
+            frame_size: (width, height) of the frame in pixels
+            camera_height_m: Camera height above the ground
+            camera_angle_deg: Depression angle below horizontal (90 = straight down)
+            pixels_per_meter: Scale at the image centre
+        """
+        width, height = frame_size
+        cx, cy = width / 2, height / 2
+        theta = np.radians(np.clip(camera_angle_deg, 1.0, 90.0))
+        sin_t, cos_t = np.sin(theta), np.cos(theta)
+
+        distance = camera_height_m / sin_t  # Along the optical axis to the ground
+        focal = distance * pixels_per_meter / np.sqrt(sin_t)
+
+        h = camera_height_m
+        homography = np.array([
+            [h, 0.0, -h * cx],
+            [0.0, -h * sin_t, h * (focal * cos_t + cy * sin_t)],
+            [0.0, cos_t, focal * sin_t - cy * cos_t],
+        ])
+        return cls(homography, frame_size, pixels_per_meter)
+
+    @classmethod
+    def from_points(
+        cls,
+        frame_size: Tuple[int, int],
+        image_points_pct: np.ndarray,
+        ground_points_m: np.ndarray,
+        pixels_per_meter: float = PIXELS_PER_METER
+    ) -> "GroundPlane":
+        """Build the homography from four marked image/ground correspondences.
+
+        Args:
+            frame_size: (width, height) of the frame in pixels
+            image_points_pct: (4, 2) image points as percentages
+            ground_points_m: (4, 2) matching ground points in metres
+            pixels_per_meter: Fallback scale used to cap the far field
+        """
+        width, height = frame_size
+        image_px = np.asarray(image_points_pct, dtype=np.float32) * np.float32([width, height]) / 100
+        homography = cv2.getPerspectiveTransform(image_px, np.asarray(ground_points_m, dtype=np.float32))
+        return cls(homography, frame_size, pixels_per_meter)
+
+    @classmethod
+    def from_calibration(cls, calibration: Dict[str, Any], frame_size: Tuple[int, int]) -> "GroundPlane":
+        """Build the ground plane for a camera's calibration entry.
+
+        Uses ``ground_points`` ({"image": [[x%, y%] x4], "ground": [[X, Y] x4]})
+        when present, otherwise ``camera_height_m`` / ``camera_angle_deg``,
+        otherwise a flat ``pixels_per_meter`` scale.
+        """
+        pixels_per_meter = calibration.get("pixels_per_meter", PIXELS_PER_METER)
+
+        points = calibration.get("ground_points")
+        if points:
+            return cls.from_points(frame_size, points["image"], points["ground"], pixels_per_meter)
+
+        if "camera_height_m" in calibration and "camera_angle_deg" in calibration:
+            return cls.from_camera(
+                frame_size,
+                calibration["camera_height_m"],
+                calibration["camera_angle_deg"],
+                pixels_per_meter
+            )
+
+        return cls(None, frame_size, pixels_per_meter)
+
+    def _cells(self, points_px: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Lattice row and column of each (x, y) pixel point."""
+        rows, cols = self.metres_per_pixel.shape
+        col = np.clip((points_px[:, 0] / self.cell_size[0]).astype(int), 0, cols - 1)
+        row = np.clip((points_px[:, 1] / self.cell_size[1]).astype(int), 0, rows - 1)
+        return row, col
+
+    def scale_at(self, points_px: np.ndarray) -> np.ndarray:
+        """Metres per pixel at (N, 2) full-resolution pixel points."""
+        row, col = self._cells(np.asarray(points_px, dtype=np.float32).reshape(-1, 2))
+        return self.metres_per_pixel[row, col]
+
+    def cell_index(self, points_px: np.ndarray) -> np.ndarray:
+        """Flat lattice cell index of (N, 2) full-resolution pixel points."""
+        row, col = self._cells(np.asarray(points_px, dtype=np.float32).reshape(-1, 2))
+        return row * self.metres_per_pixel.shape[1] + col
+
+    def scale_grid(self, shape: Tuple[int, int]) -> np.ndarray:
+        """Metres per full-resolution pixel, resampled to an (h, w) array.
+
+        Cached per shape, so dense flow pays for the resize once.
+        """
+        if shape not in self._resampled:
+            self._resampled[shape] = cv2.resize(
+                self.metres_per_pixel, (shape[1], shape[0]), interpolation=cv2.INTER_LINEAR
+            )
+        return self._resampled[shape]
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Summary for status payloads."""
+        return {
+            "homography": self.homography is not None,
+            "metres_per_pixel_min": round(float(self.metres_per_pixel.min()), 4),
+            "metres_per_pixel_max": round(float(self.metres_per_pixel.max()), 4),
+            "visible_area_sqm": round(float(self.cell_area_sqm.sum()), 1),
+        }
@@ -0,0 +1,208 @@
+"""Cross-camera batching inference server for the people detector."""
+
+from typing import Dict, Any, List, Optional, Tuple
+from concurrent.futures import Future
+import queue
+import threading
+import time
+import numpy as np
+
+from models.backends import DetectorBackend
+from models.registry import get_model
+from config import (
+    DETECTOR_BACKEND, INFERENCE_MAX_BATCH, INFERENCE_MAX_LATENCY_MS, INFERENCE_ACTIVE_SECONDS,
+    get_detector_model_path
+)
+
+# (frame, future, calling thread, input size)
+Request = Tuple[np.ndarray, Future, int, Optional[int]]
+
+
+class BatchInferenceServer:
+    """Gathers frames from all cameras into batched YOLO calls.
+
+    Callers submit single frames; a worker thread collects requests until
+    either the batch is full or the oldest request has waited
+    ``max_latency_ms``, then runs one forward pass for the whole batch.
+    It only waits while another caller (camera thread) that submitted
+    within ``active_seconds`` has nothing in the batch yet, so a single
+    camera is dispatched at once instead of paying the batching delay.
+    Requests for different input sizes in one batch run as one forward
+    pass per size.
+    """
+
+    def __init__(
+        self,
+        handle: DetectorBackend,
+        max_batch: int = INFERENCE_MAX_BATCH,
+        max_latency_ms: float = INFERENCE_MAX_LATENCY_MS,
+        active_seconds: float = INFERENCE_ACTIVE_SECONDS
+    ):
+        """Initialize the server.
+
+        Args:
+            handle: Shared detector backend to run inference with
+            max_batch: Maximum number of frames per forward pass
+            max_latency_ms: Maximum time a request waits for a batch to fill
+            active_seconds: How recently a caller must have submitted to be waited for
+        """
+        self.handle = handle
+        self.max_batch = max(1, max_batch)
+        self.max_latency = max_latency_ms / 1000.0
+        self.active_seconds = active_seconds
+
+        # Last submit time per calling thread
+        self._sources: Dict[int, float] = {}
+        self._sources_lock = threading.Lock()
+
+        # Statistics
+        self.batch_count = 0
+        self.frame_count = 0
+        self.max_batch_seen = 0
+        self.inference_seconds = 0.0
+
+        self._queue: "queue.Queue[Request]" = queue.Queue()
+        self._thread = threading.Thread(
+            target=self._run,
+            name=f"inference-{handle.name}",
+            daemon=True
+        )
+        self._thread.start()
+
+    def submit(self, frame: np.ndarray, imgsz: Optional[int] = None) -> Future:
+        """Queue a frame for inference.
+
+        Args:
+            frame: BGR image as numpy array (H, W, C)
+            imgsz: Input size for this frame, None for the backend's default
+
+        Returns:
+            Future resolving to (boxes_xyxy, confidences) in pixel coords
+        """
+        future: Future = Future()
+        source = threading.get_ident()
+        with self._sources_lock:
+            self._sources[source] = time.perf_counter()
+        self._queue.put((frame, future, source, imgsz))
+        return future
+
+    def infer(self, frame: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+        """Run inference on a frame, blocking until its batch completes.
+
+        Args:
+            frame: BGR image as numpy array (H, W, C)
+
+        Returns:
+            Tuple of (boxes_xyxy (N, 4), confidences (N,)) in pixel coords
+        """
+        return self.submit(frame).result()
+
+    def _others_active(self, batch: List[Request]) -> bool:
+        """Whether a recently active caller has no request in the batch yet."""
+        cutoff = time.perf_counter() - self.active_seconds
+        waiting_for = {source for _, _, source, _ in batch}
+        with self._sources_lock:
+            for source in [s for s, seen in self._sources.items() if seen < cutoff]:
+                del self._sources[source]
+            return any(source not in waiting_for for source in self._sources)
+
+    def _collect_batch(self) -> List[Request]:
+        """Block for the first request, then gather more until full or deadline.
+
+        Requests already queued are always taken; the server only waits
+        for new ones while other callers are active.
+        """
+        batch = [self._queue.get()]
+        deadline = time.perf_counter() + self.max_latency
+
+        while len(batch) < self.max_batch:
+            try:
+                batch.append(self._queue.get_nowait())
+                continue
+            except queue.Empty:
+                pass
+
+            remaining = deadline - time.perf_counter()
+            if remaining <= 0 or not self._others_active(batch):
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+
+        return batch
+
+    def _run(self):
+        """Worker loop: collect, infer, and resolve futures."""
+        while True:
+            sizes: Dict[Optional[int], List[Request]] = {}
+            for request in self._collect_batch():
+                sizes.setdefault(request[3], []).append(request)
+
+            for imgsz, batch in sizes.items():
+                frames = [frame for frame, _, _, _ in batch]
+
+                try:
+                    start = time.perf_counter()
+                    results = self.handle.predict(frames, imgsz)
+                    self.inference_seconds += time.perf_counter() - start
+                except Exception as e:
+                    for _, future, _, _ in batch:
+                        future.set_exception(e)
+                    continue
+
+                self.batch_count += 1
+                self.frame_count += len(batch)
+                self.max_batch_seen = max(self.max_batch_seen, len(batch))
+
+                for (_, future, _, _), result in zip(batch, results):
+                    future.set_result(result)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get batching statistics."""
+        avg_batch = self.frame_count / self.batch_count if self.batch_count else 0.0
+        return {
+            "backend": self.handle.name,
+            "model": self.handle.model_path,
+            "max_batch": self.max_batch,
+            "max_latency_ms": round(self.max_latency * 1000, 1),
+            "queue_depth": self._queue.qsize(),
+            "active_callers": len(self._sources),
+            "batches": self.batch_count,
+            "frames": self.frame_count,
+            "avg_batch_size": round(avg_batch, 2),
+            "max_batch_seen": self.max_batch_seen,
+            "avg_batch_ms": round(self.inference_seconds / self.batch_count * 1000, 1) if self.batch_count else 0.0
+        }
+
+
+# One server per model, shared by every camera
+_servers: Dict[Tuple[str, str], BatchInferenceServer] = {}
+_servers_lock = threading.Lock()
+
+
+def get_inference_server(
+    model_path: Optional[str] = None,
+    backend: str = DETECTOR_BACKEND
+) -> BatchInferenceServer:
+    """Get the shared batching server for a model, starting it on first use."""
+    key = (backend, str(model_path or get_detector_model_path(backend)))
+    server = _servers.get(key)
+    if server is not None:
+        return server
+
+    with _servers_lock:
+        server = _servers.get(key)
+        if server is None:
+            server = BatchInferenceServer(get_model(key[1], backend))
+            _servers[key] = server
+
+    return server
+
+
+def get_inference_status() -> Dict[str, Any]:
+    """Get status of all running batching servers."""
+    return {
+        f"{backend}:{path}": server.get_status()
+        for (backend, path), server in _servers.items()
+    }
@@ -0,0 +1,156 @@
+"""NumPy-only multi-object tracker used when supervision is not installed."""
+
+from typing import Tuple
+import numpy as np
+
+try:
+    import lap
+    LAP_AVAILABLE = True
+except ImportError:
+    LAP_AVAILABLE = False
+
+from models.detector import box_iou
+from config import (
+    MAX_TRACK_AGE, TRACK_ACTIVATION_THRESHOLD, TRACK_CENTER_DISTANCE_WEIGHT, TRACK_MAX_MATCH_COST
+)
+
+
+class IoUTracker:
+    """Constant-velocity tracker with IoU + centre-distance association.
+
+    All live tracks are held in flat arrays. Each update predicts every
+    box one frame ahead, builds a single (tracks x detections) cost
+    matrix and solves it with Hungarian assignment (``lap.lapjv``), or a
+    greedy lowest-cost-first pass if ``lapx`` is missing.
+
+    The cost of a pair is ``1 - IoU + w * d``, where ``d`` is the centre
+    distance in units of the predicted box diagonal, so fast or small
+    people whose boxes stop overlapping can still be matched.
+    """
+
+    def __init__(
+        self,
+        max_age: int = MAX_TRACK_AGE,
+        activation_threshold: float = TRACK_ACTIVATION_THRESHOLD,
+        distance_weight: float = TRACK_CENTER_DISTANCE_WEIGHT,
+        max_cost: float = TRACK_MAX_MATCH_COST,
+        velocity_smoothing: float = 0.5
+    ):
+        """Initialize the tracker.
+
+        Args:
+            max_age: Frames a track survives without a matching detection
+            activation_threshold: Minimum confidence for a detection to start a track
+            distance_weight: Weight of the normalized centre distance in the cost
+            max_cost: Pairs above this cost are never matched
+            velocity_smoothing: Weight of the newest displacement in the velocity estimate
+        """
+        self.max_age = max_age
+        self.activation_threshold = activation_threshold
+        self.distance_weight = distance_weight
+        self.max_cost = max_cost
+        self.velocity_smoothing = velocity_smoothing
+        self.reset()
+
+    def _cost_matrix(self, predicted: np.ndarray, detections: np.ndarray) -> np.ndarray:
+        """Association cost between predicted tracks and detections."""
+        iou = box_iou(predicted, detections)
+
+        track_centers = (predicted[:, :2] + predicted[:, 2:]) / 2
+        det_centers = (detections[:, :2] + detections[:, 2:]) / 2
+        diagonal = np.hypot(predicted[:, 2] - predicted[:, 0], predicted[:, 3] - predicted[:, 1])
+        distance = np.linalg.norm(track_centers[:, None] - det_centers[None], axis=2)
+        distance /= np.maximum(diagonal, 1.0)[:, None]
+
+        return 1.0 - iou + self.distance_weight * distance
+
+    def _assign(self, cost: np.ndarray) -> np.ndarray:
+        """Solve the assignment problem.
+
+        Returns:
+            (T,) detection index per track, -1 where unmatched
+        """
+        if LAP_AVAILABLE:
+            _, track_to_det, _ = lap.lapjv(cost.astype(np.float64), extend_cost=True, cost_limit=self.max_cost)
+            return track_to_det.astype(np.int64)
+
+        # Greedy: accept feasible pairs from cheapest up
+        track_to_det = np.full(cost.shape[0], -1, dtype=np.int64)
+        rows, cols = np.nonzero(cost <= self.max_cost)
+        order = np.argsort(cost[rows, cols], kind="stable")
+        det_taken = np.zeros(cost.shape[1], dtype=bool)
+        for r, c in zip(rows[order].tolist(), cols[order].tolist()):
+            if track_to_det[r] < 0 and not det_taken[c]:
+                track_to_det[r] = c
+                det_taken[c] = True
+        return track_to_det
+
+    def update(
+        self,
+        detections_xyxy: np.ndarray,
+        confidences: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Advance all tracks by one frame.
+
+        Args:
+            detections_xyxy: (N, 4) detection boxes in pixel coords
+            confidences: (N,) confidence scores
+
+        Returns:
+            Tuple of (boxes (M, 4), track IDs (M,), detection index (M,))
+            for the tracks matched to a detection this frame
+        """
+        detections = np.asarray(detections_xyxy, dtype=np.float32).reshape(-1, 4)
+        confidences = np.asarray(confidences, dtype=np.float32).reshape(-1)
+
+        predicted = self.boxes + self.velocities
+        if len(predicted) and len(detections):
+            track_to_det = self._assign(self._cost_matrix(predicted, detections))
+        else:
+            track_to_det = np.full(len(predicted), -1, dtype=np.int64)
+
+        # Matched tracks: snap to the detection and refresh the velocity
+        matched = track_to_det >= 0
+        observed = detections[track_to_det[matched]]
+        self.velocities[matched] = (
+            self.velocity_smoothing * (observed - self.boxes[matched]) +
+            (1 - self.velocity_smoothing) * self.velocities[matched]
+        )
+        self.boxes[matched] = observed
+        self.misses[matched] = 0
+
+        # Unmatched tracks coast on their prediction
+        self.boxes[~matched] = predicted[~matched]
+        self.misses[~matched] += 1
+
+        # Unmatched confident detections start new tracks
+        det_taken = np.zeros(len(detections), dtype=bool)
+        det_taken[track_to_det[matched]] = True
+        new = np.flatnonzero(~det_taken & (confidences >= self.activation_threshold))
+        new_ids = np.arange(self._next_id, self._next_id + len(new), dtype=np.int64)
+        self._next_id += len(new)
+
+        self.boxes = np.concatenate([self.boxes, detections[new]])
+        self.velocities = np.concatenate([self.velocities, np.zeros((len(new), 4), dtype=np.float32)])
+        self.ids = np.concatenate([self.ids, new_ids])
+        self.misses = np.concatenate([self.misses, np.zeros(len(new), dtype=np.int32)])
+        track_to_det = np.concatenate([track_to_det, new])
+
+        # Drop tracks that have been lost for too long
+        alive = self.misses <= self.max_age
+        self.boxes = self.boxes[alive]
+        self.velocities = self.velocities[alive]
+        self.ids = self.ids[alive]
+        self.misses = self.misses[alive]
+        track_to_det = track_to_det[alive]
+
+        visible = track_to_det >= 0
+        return self.boxes[visible].copy(), self.ids[visible].copy(), track_to_det[visible]
+
+    def reset(self):
+        """Drop all tracks."""
+        self.boxes = np.empty((0, 4), dtype=np.float32)  # xyxy pixel coords
+        self.velocities = np.empty((0, 4), dtype=np.float32)  # Per-frame box displacement
+        self.ids = np.empty(0, dtype=np.int64)
+        self.misses = np.empty(0, dtype=np.int32)
+        self._next_id = 1
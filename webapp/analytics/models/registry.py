@@ -0,0 +1,78 @@
+"""Process-wide registry of shared detector models."""
+
+from typing import Dict, Any, List, Optional, Tuple
+import threading
+import time
+
+from models.backends import DetectorBackend, create_backend
+from config import DETECTOR_BACKEND, get_detector_model_path
+
+
+class ModelRegistry:
+    """Loads each model once per backend and hands out shared handles.
+
+    All processors, SSE streams and WebSocket sessions that use the same
+    weights share one backend instance, so the weights are held in memory
+    once however many cameras run.
+    """
+
+    def __init__(self):
+        self._handles: Dict[Tuple[str, str], DetectorBackend] = {}
+        self._lock = threading.Lock()
+
+    def get(
+        self,
+        model_path: Optional[str] = None,
+        backend: str = DETECTOR_BACKEND
+    ) -> DetectorBackend:
+        """Get the shared handle for a model, loading it on first use.
+
+        Args:
+            model_path: Weights or exported graph (defaults to the backend's model)
+            backend: Backend name ("ultralytics", "onnxruntime" or "openvino")
+
+        Returns:
+            Shared, warmed-up DetectorBackend
+        """
+        key = (backend, str(model_path or get_detector_model_path(backend)))
+        handle = self._handles.get(key)
+        if handle is not None:
+            return handle
+
+        with self._lock:
+            # Another thread may have loaded it while we waited
+            handle = self._handles.get(key)
+            if handle is None:
+                start = time.perf_counter()
+                handle = create_backend(backend, key[1])
+                handle.warmup()
+                handle.load_seconds = time.perf_counter() - start
+                self._handles[key] = handle
+
+        return handle
+
+    def preload(self, model_paths: Optional[List[str]] = None, backend: str = DETECTOR_BACKEND):
+        """Load and warm up models ahead of the first request.
+
+        Args:
+            model_paths: Models to load (defaults to the configured model)
+            backend: Backend to load them with
+        """
+        for model_path in model_paths or [None]:
+            self.get(model_path, backend)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get status of all loaded models."""
+        return {
+            f"{backend}:{path}": handle.to_dict()
+            for (backend, path), handle in self._handles.items()
+        }
+
+
+# Global model registry
+model_registry = ModelRegistry()
+
+
+def get_model(model_path: Optional[str] = None, backend: str = DETECTOR_BACKEND) -> DetectorBackend:
+    """Get the shared handle for a model from the global registry."""
+    return model_registry.get(model_path, backend)
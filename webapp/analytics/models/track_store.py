@@ -0,0 +1,233 @@
+"""Columnar storage for live tracks."""
+
+from typing import Any, Dict, Tuple
+import numpy as np
+
+from config import MAX_TRACK_AGE, TRACK_TRAJECTORY_LENGTH
+
+
+class TrackStore:
+    """Fixed-width NumPy columns for every live track, indexed by slot.
+
+    Each track occupies one slot in preallocated arrays (bbox, age,
+    hits, trajectory ring). Expired slots go on a free list and are
+    reused by new tracks, and the arrays double in size when full.
+    Updates, aging and expiry touch all tracks with single vectorized
+    operations instead of per-object Python work.
+    """
+
+    def __init__(
+        self,
+        capacity: int = 256,
+        trajectory_length: int = TRACK_TRAJECTORY_LENGTH,
+        max_age: int = MAX_TRACK_AGE
+    ):
+        """Initialize the store.
+
+        Args:
+            capacity: Initial number of slots
+            trajectory_length: Center points kept per track
+            max_age: Frames a track survives without an update
+        """
+        self.trajectory_length = trajectory_length
+        self.max_age = max_age
+        self._allocate(capacity)
+
+    def _allocate(self, capacity: int):
+        """Create empty columns with the given number of slots."""
+        self.capacity = capacity
+        self.active = np.zeros(capacity, dtype=bool)
+        self.ids = np.full(capacity, -1, dtype=np.int64)
+        self.bbox = np.zeros((capacity, 4), dtype=np.float32)  # (x1, y1, x2, y2) in percentage
+        self.age = np.zeros(capacity, dtype=np.int32)
+        self.hits = np.zeros(capacity, dtype=np.int32)
+        self.detection_index = np.full(capacity, -1, dtype=np.int64)  # Input row matched this frame
+        self.trajectory = np.zeros((capacity, self.trajectory_length, 2), dtype=np.float32)
+        self.trajectory_count = np.zeros(capacity, dtype=np.int32)  # Points written so far
+        self._free = list(range(capacity - 1, -1, -1))
+        self.expired_ids = np.empty(0, dtype=np.int64)  # IDs dropped by the last update
+
+    def _grow(self):
+        """Double the number of slots, keeping existing tracks in place."""
+        old = self.capacity
+        free = self._free
+        columns = {
+            name: getattr(self, name)
+            for name in ("active", "ids", "bbox", "age", "hits", "detection_index",
+                         "trajectory", "trajectory_count")
+        }
+        self._allocate(old * 2)
+        for name, values in columns.items():
+            getattr(self, name)[:old] = values
+        self._free = list(range(self.capacity - 1, old - 1, -1)) + free
+
+    def __len__(self) -> int:
+        return int(self.active.sum())
+
+    @property
+    def centers(self) -> np.ndarray:
+        """(capacity, 2) bbox centers for every slot."""
+        return (self.bbox[:, :2] + self.bbox[:, 2:]) / 2
+
+    def slots_for(self, track_ids: np.ndarray) -> np.ndarray:
+        """Look up the slots of track IDs.
+
+        Returns:
+            (N,) slot per ID, -1 for IDs not in the store
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        live = np.flatnonzero(self.active)
+        if len(live) == 0 or len(track_ids) == 0:
+            return np.full(len(track_ids), -1, dtype=np.int64)
+
+        order = np.argsort(self.ids[live])
+        sorted_ids = self.ids[live][order]
+        pos = np.clip(np.searchsorted(sorted_ids, track_ids), 0, len(sorted_ids) - 1)
+        found = sorted_ids[pos] == track_ids
+        return np.where(found, live[order[pos]], -1)
+
+    def update(
+        self,
+        track_ids: np.ndarray,
+        boxes_pct: np.ndarray,
+        detection_index: np.ndarray
+    ) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+        """Write one frame of tracker output and age everything else.
+
+        Args:
+            track_ids: (T,) IDs seen this frame
+            boxes_pct: (T, 4) xyxy boxes in percentage coords
+            detection_index: (T,) input detection row per track, -1 if none
+
+        Returns:
+            Tuple of (IDs, old centers, new centers) for the tracks that
+            already existed, for line-crossing checks
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        slots = self.slots_for(track_ids)
+
+        existing = slots >= 0
+        known = slots[existing]
+        old_centers = self.centers[known]
+
+        # Refresh known tracks and append their new center to the ring
+        self.bbox[known] = boxes_pct[existing]
+        self.hits[known] += 1
+        new_centers = self.centers[known]
+        ring = self.trajectory_count[known] % self.trajectory_length
+        self.trajectory[known, ring] = new_centers
+        self.trajectory_count[known] += 1
+
+        # New tracks take slots from the free list
+        needed = int((~existing).sum())
+        while len(self._free) < needed:
+            self._grow()
+        fresh = np.array([self._free.pop() for _ in range(needed)], dtype=np.int64)
+        self.active[fresh] = True
+        self.ids[fresh] = track_ids[~existing]
+        self.bbox[fresh] = boxes_pct[~existing]
+        self.hits[fresh] = 1
+        self.trajectory_count[fresh] = 0
+        slots[~existing] = fresh
+
+        # Age and expire everything not seen this frame
+        seen = np.zeros(self.capacity, dtype=bool)
+        seen[slots] = True
+        self.age[seen] = 0
+        self.age[self.active & ~seen] += 1
+        self.detection_index[:] = -1
+        self.detection_index[slots] = detection_index
+
+        expired = np.flatnonzero(self.active & (self.age > self.max_age))
+        self.expired_ids = self.ids[expired]
+        self.active[expired] = False
+        self.ids[expired] = -1
+        self._free.extend(expired.tolist())
+
+        return track_ids[existing], old_centers, new_centers
+
+    def last_displacements(self) -> Tuple[np.ndarray, np.ndarray]:
+        """Displacement between the last two trajectory points of each track.
+
+        Returns:
+            Tuple of (track IDs (M,), (M, 2) displacements) for tracks
+            with at least two points
+        """
+        slots = np.flatnonzero(self.active & (self.trajectory_count >= 2))
+        count = self.trajectory_count[slots]
+        last = self.trajectory[slots, (count - 1) % self.trajectory_length]
+        prev = self.trajectory[slots, (count - 2) % self.trajectory_length]
+        return self.ids[slots], last - prev
+
+    def clear(self):
+        """Drop all tracks, keeping the allocated capacity."""
+        self._allocate(self.capacity)
+
+
+class TrackTable:
+    """Per-track analyzer state as NumPy columns, keyed by track ID.
+
+    Rows are kept sorted by ID, so a frame's IDs are matched with one
+    ``searchsorted``, new tracks are merged in and ended ones dropped with
+    single vectorized copies. Columns are declared up front as
+    ``name=(dtype, trailing shape)`` and start at zero for new rows.
+    """
+
+    def __init__(self, **columns: Tuple[Any, Tuple[int, ...]]):
+        """Initialize an empty table.
+
+        Args:
+            columns: Column name to (dtype, per-row shape), e.g.
+                ``position=(np.float32, (2,))``
+        """
+        self._specs = {name: (np.dtype(dtype), tuple(shape)) for name, (dtype, shape) in columns.items()}
+        self.clear()
+
+    def clear(self):
+        """Drop every row."""
+        self.ids = np.empty(0, dtype=np.int64)
+        self.columns: Dict[str, np.ndarray] = {
+            name: np.zeros((0,) + shape, dtype=dtype) for name, (dtype, shape) in self._specs.items()
+        }
+
+    def __len__(self) -> int:
+        return len(self.ids)
+
+    def __getitem__(self, name: str) -> np.ndarray:
+        return self.columns[name]
+
+    def find(self, track_ids: np.ndarray) -> np.ndarray:
+        """Rows of track IDs.
+
+        Returns:
+            (N,) row per ID, -1 for IDs not in the table
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        if len(self.ids) == 0 or len(track_ids) == 0:
+            return np.full(len(track_ids), -1, dtype=np.int64)
+        pos = np.clip(np.searchsorted(self.ids, track_ids), 0, len(self.ids) - 1)
+        return np.where(self.ids[pos] == track_ids, pos, -1)
+
+    def upsert(self, track_ids: np.ndarray) -> np.ndarray:
+        """Add rows for unknown IDs (zero-filled) and look all of them up.
+
+        Returns:
+            (N,) row per ID after insertion
+        """
+        track_ids = np.asarray(track_ids, dtype=np.int64)
+        new_ids = np.setdiff1d(track_ids, self.ids)
+        if len(new_ids):
+            at = np.searchsorted(self.ids, new_ids)
+            self.ids = np.insert(self.ids, at, new_ids)
+            for name, (dtype, shape) in self._specs.items():
+                self.columns[name] = np.insert(
+                    self.columns[name], at, np.zeros((len(new_ids),) + shape, dtype=dtype), axis=0
+                )
+        return self.find(track_ids)
+
+    def drop(self, mask: np.ndarray):
+        """Remove the rows where ``mask`` is True."""
+        keep = ~np.asarray(mask, dtype=bool)
+        self.ids = self.ids[keep]
+        for name in self.columns:
+            self.columns[name] = self.columns[name][keep]
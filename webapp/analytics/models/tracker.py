@@ -1,6 +1,7 @@
 """Multi-object tracker using ByteTrack via supervision."""
 
-from typing import List, Dict, Any, Optional, Tuple
+from typing import Dict, Optional, Tuple
+import time
 import numpy as np
 
 try:
@@ -9,188 +10,277 @@ try:
 except ImportError:
     SUPERVISION_AVAILABLE = False
 
-from config import MAX_TRACK_AGE, MIN_TRACK_HITS
+from models.detector import box_iou
+from models.iou_tracker import IoUTracker
+from models.track_store import TrackStore
+from config import (
+    MAX_TRACK_AGE, MIN_TRACK_HITS, TRACK_MATCH_IOU, TRACK_ACTIVATION_THRESHOLD,
+    FLOW_RATE_WINDOW_SECONDS, FLOW_RATE_HISTORY_SECONDS, FLOW_RATE_MIN_SECONDS
+)
 
 
-class TrackedObject:
-    """A tracked person with persistent ID."""
+class CrossingCounter:
+    """Fixed-memory counter answering "crossings in the last N seconds".
 
-    def __init__(self, track_id: int, bbox: Tuple[float, float, float, float]):
-        self.track_id = track_id
-        self.bbox = bbox  # (x1, y1, x2, y2) in percentage
-        self.trajectory: List[Tuple[float, float]] = []  # List of center points
-        self.velocities: List[float] = []  # Estimated velocities
-        self.age = 0
-        self.hits = 1
+    A ring holds the cumulative crossing total at the end of each of the
+    last ``history_seconds`` seconds, so a windowed count is one
+    subtraction no matter how long the camera has been running.
+    """
 
-    @property
-    def center(self) -> Tuple[float, float]:
-        """Get current center point."""
-        x1, y1, x2, y2 = self.bbox
-        return ((x1 + x2) / 2, (y1 + y2) / 2)
-
-    def update(self, bbox: Tuple[float, float, float, float]):
-        """Update track with new detection."""
-        old_center = self.center
-        self.bbox = bbox
-        new_center = self.center
-        self.trajectory.append(new_center)
-
-        # Keep trajectory limited
-        if len(self.trajectory) > 30:
-            self.trajectory = self.trajectory[-30:]
+    def __init__(
+        self,
+        history_seconds: int = FLOW_RATE_HISTORY_SECONDS,
+        min_seconds: float = FLOW_RATE_MIN_SECONDS
+    ):
+        """Initialize the counter.
 
-        self.hits += 1
-        self.age = 0
+        Args:
+            history_seconds: Longest window that can be queried
+            min_seconds: Observation span before a rate is reported, so a
+                few early crossings are not extrapolated to a minute
+        """
+        self.size = history_seconds + 1
+        self.min_seconds = min_seconds
+        self.reset()
+
+    def _advance(self, now: float):
+        """Close every whole second between the last event and now."""
+        second = int(now)
+        if self._second is None:
+            self._second = second
+            self._start_time = now
+            return
+
+        gap = second - self._second
+        if gap >= self.size:
+            self._totals[:] = self.total
+        elif gap > 0:
+            self._totals[np.arange(self._second, second) % self.size] = self.total
+        self._second = max(self._second, second)
+
+    def add(self, count: int = 1, now: Optional[float] = None):
+        """Record crossings happening now."""
+        self._advance(time.time() if now is None else now)
+        self.total += count
+
+    def rate_per_minute(self, window_seconds: float, now: Optional[float] = None) -> float:
+        """Crossings per minute over the last ``window_seconds``.
+
+        Until ``min_seconds`` have passed since the first event the rate
+        is 0; after that it is divided by the observed span, up to the
+        full window.
+        """
+        now = time.time() if now is None else now
+        self._advance(now)
 
-        return old_center, new_center
+        window = int(min(max(window_seconds, 1), self.size - 1))
+        elapsed = min(window, now - self._start_time)
+        if elapsed <= 0 or elapsed < min(self.min_seconds, window):
+            return 0.0
+        count = self.total - self._totals[(self._second - window) % self.size]
+        return count * 60.0 / elapsed
 
-    def to_dict(self) -> Dict[str, Any]:
-        """Convert to dictionary."""
-        return {
-            "id": f"T{self.track_id:03d}",
-            "bbox": self.bbox,
-            "center": self.center,
-            "trajectory_length": len(self.trajectory)
-        }
+    def reset(self):
+        """Forget all crossings."""
+        self._totals = np.zeros(self.size, dtype=np.int64)  # Cumulative total at the end of each second
+        self.total = 0
+        self._second: Optional[int] = None
+        self._start_time = 0.0
 
 
 class PeopleTracker:
-    """ByteTrack-based multi-object tracker."""
+    """ByteTrack-based multi-object tracker.
+
+    Falls back to the NumPy-only IoUTracker when supervision is not
+    installed, so per-track analytics keep working on slim deployments.
+    """
 
     def __init__(self):
         """Initialize the tracker."""
+        self._create_tracker()
+        self._id_offset = 0  # Added to tracker IDs so a restarted tracker never reuses one
+        self._max_track_id = 0
+
+        self.tracks = TrackStore()
+        self.detection_track_ids = np.empty(0, dtype=np.int32)  # Track ID per input detection, -1 if unmatched
+        self.frame_count = 0
+        self.crossings = CrossingCounter()  # For flow rate counting
+        self._counting_line_y = 50  # Default: middle of frame (percentage)
+        self._last_crossed_ids = set()
+
+    def _create_tracker(self):
+        """Create the underlying ByteTrack, or the IoU fallback."""
         if SUPERVISION_AVAILABLE:
             self.tracker = sv.ByteTrack(
-                track_activation_threshold=0.25,
+                track_activation_threshold=TRACK_ACTIVATION_THRESHOLD,
                 lost_track_buffer=MAX_TRACK_AGE,
                 minimum_matching_threshold=0.8,
                 frame_rate=5
             )
+            self.fallback_tracker = None
         else:
             self.tracker = None
-
-        self.tracks: Dict[int, TrackedObject] = {}
-        self.frame_count = 0
-        self.total_crossed = 0  # For flow rate counting
-        self._counting_line_y = 50  # Default: middle of frame (percentage)
-        self._last_crossed_ids = set()
+            self.fallback_tracker = IoUTracker()
 
     def update(
         self,
         detections_xyxy: np.ndarray,
         confidences: np.ndarray,
-        frame_size: Tuple[int, int]
-    ) -> List[TrackedObject]:
+        frame_size: Tuple[int, int],
+        now: Optional[float] = None
+    ) -> np.ndarray:
         """Update tracks with new detections.
 
         Args:
             detections_xyxy: Detection boxes as (N, 4) array in pixel coords
             confidences: Confidence scores as (N,) array
             frame_size: (width, height) of the frame
+            now: Frame time in seconds for the crossing counter (None = wall clock)
 
         Returns:
-            List of currently tracked objects
+            (N,) track ID per input detection, -1 if unmatched (also
+            kept as ``detection_track_ids``)
         """
         self.frame_count += 1
-        width, height = frame_size
+        self.detection_track_ids = np.full(len(detections_xyxy), -1, dtype=np.int32)
 
-        if not SUPERVISION_AVAILABLE or self.tracker is None:
-            # Fallback: simple tracking by proximity
-            return self._simple_track(detections_xyxy, confidences, frame_size)
+        track_boxes = np.empty((0, 4), dtype=np.float32)
+        track_ids = det_index = np.empty(0, dtype=np.int64)
 
-        # Create supervision Detections object
-        if len(detections_xyxy) > 0:
+        if self.tracker is None:
+            # Fallback: built-in IoU tracker
+            track_boxes, track_ids, det_index = self.fallback_tracker.update(detections_xyxy, confidences)
+        else:
+            # Create supervision Detections object (empty ones still age
+            # ByteTrack's lost tracks)
             sv_detections = sv.Detections(
-                xyxy=detections_xyxy,
-                confidence=confidences
+                xyxy=np.asarray(detections_xyxy, dtype=np.float32).reshape(-1, 4),
+                confidence=np.asarray(confidences, dtype=np.float32).reshape(-1)
             )
 
             # Update tracker
             tracked = self.tracker.update_with_detections(sv_detections)
 
-            # Process tracked detections
-            current_track_ids = set()
-
-            if tracked.tracker_id is not None:
-                for i, track_id in enumerate(tracked.tracker_id):
-                    track_id = int(track_id)
-                    current_track_ids.add(track_id)
-
-                    # Convert to percentage coordinates
-                    x1, y1, x2, y2 = tracked.xyxy[i]
-                    bbox_pct = (
-                        (x1 / width) * 100,
-                        (y1 / height) * 100,
-                        (x2 / width) * 100,
-                        (y2 / height) * 100
-                    )
-
-                    if track_id in self.tracks:
-                        old_center, new_center = self.tracks[track_id].update(bbox_pct)
-                        # Check line crossing for flow rate
-                        self._check_line_crossing(track_id, old_center, new_center)
-                    else:
-                        self.tracks[track_id] = TrackedObject(track_id, bbox_pct)
-
-            # Age out old tracks
-            for tid in list(self.tracks.keys()):
-                if tid not in current_track_ids:
-                    self.tracks[tid].age += 1
-                    if self.tracks[tid].age > MAX_TRACK_AGE:
-                        del self.tracks[tid]
-
-        return list(self.tracks.values())
-
-    def _simple_track(
+            if tracked.tracker_id is not None and len(tracked) > 0:
+                track_boxes, track_ids = tracked.xyxy, tracked.tracker_id
+                det_index = self._match_detections(track_boxes, detections_xyxy)
+
+        # Also applied on empty frames so lost tracks age out
+        self._apply_tracks(track_boxes, track_ids, det_index, frame_size, now)
+        return self.detection_track_ids
+
+    def _apply_tracks(
         self,
-        detections_xyxy: np.ndarray,
-        confidences: np.ndarray,
-        frame_size: Tuple[int, int]
-    ) -> List[TrackedObject]:
-        """Simple nearest-neighbor tracking fallback."""
+        track_boxes: np.ndarray,
+        track_ids: np.ndarray,
+        det_index: np.ndarray,
+        frame_size: Tuple[int, int],
+        now: Optional[float] = None
+    ):
+        """Fold one frame of tracker output into the persistent tracks.
+
+        Args:
+            track_boxes: (T, 4) tracked boxes in pixel coords
+            track_ids: (T,) track IDs
+            det_index: (T,) input detection index per track, -1 if none
+            frame_size: (width, height) of the frame
+            now: Frame time in seconds (None = wall clock)
+        """
         width, height = frame_size
+        track_ids = np.asarray(track_ids, dtype=np.int64) + self._id_offset
+        if len(track_ids):
+            self._max_track_id = max(self._max_track_id, int(track_ids.max()))
+        matched = det_index >= 0
+        self.detection_track_ids[det_index[matched]] = track_ids[matched]
 
-        # Convert to percentage
-        tracks_out = []
-        for i, det in enumerate(detections_xyxy):
-            x1, y1, x2, y2 = det
-            bbox_pct = (
-                (x1 / width) * 100,
-                (y1 / height) * 100,
-                (x2 / width) * 100,
-                (y2 / height) * 100
-            )
-            # Simple ID assignment
-            tracks_out.append(TrackedObject(i, bbox_pct))
+        boxes_pct = np.asarray(track_boxes, dtype=np.float32).reshape(-1, 4) / np.float32(
+            [width, height, width, height]
+        ) * 100
+        ids, old_centers, new_centers = self.tracks.update(track_ids, boxes_pct, det_index)
+
+        # Check line crossing for flow rate
+        self._check_line_crossing(ids, old_centers, new_centers, now)
 
-        return tracks_out
+        # Crossed-ID bookkeeping ends with the track
+        if len(self.tracks.expired_ids):
+            self._last_crossed_ids.difference_update(self.tracks.expired_ids.tolist())
+
+    def _match_detections(self, track_boxes: np.ndarray, detection_boxes: np.ndarray) -> np.ndarray:
+        """Find the input detection behind each tracked box.
+
+        ByteTrack reorders and filters its output, so tracks are paired
+        with detections by mutual best IoU in one vectorized pass.
+
+        Args:
+            track_boxes: (T, 4) tracked boxes in pixel coords
+            detection_boxes: (N, 4) input detection boxes in pixel coords
+
+        Returns:
+            (T,) detection index per track, -1 where no detection matched
+        """
+        iou = box_iou(track_boxes, detection_boxes)
+        if iou.size == 0:
+            return np.full(len(track_boxes), -1, dtype=np.int64)
+
+        best_detection = iou.argmax(axis=1)
+        best_track = iou.argmax(axis=0)
+        rows = np.arange(len(track_boxes))
+        matched = (best_track[best_detection] == rows) & (iou[rows, best_detection] >= TRACK_MATCH_IOU)
+        return np.where(matched, best_detection, -1)
 
     def _check_line_crossing(
         self,
-        track_id: int,
-        old_center: Tuple[float, float],
-        new_center: Tuple[float, float]
+        track_ids: np.ndarray,
+        old_centers: np.ndarray,
+        new_centers: np.ndarray,
+        now: Optional[float] = None
     ):
-        """Check if a track crossed the counting line."""
-        # Check if crossed the virtual line
-        if (old_center[1] < self._counting_line_y <= new_center[1] or
-            old_center[1] > self._counting_line_y >= new_center[1]):
-            if track_id not in self._last_crossed_ids:
-                self.total_crossed += 1
-                self._last_crossed_ids.add(track_id)
-
-    def get_flow_rate(self, time_window_seconds: float = 60.0) -> float:
-        """Get flow rate (crossings per minute)."""
-        # Simplified: return total crossed normalized to per-minute
-        # In production, would track timestamps
-        return self.total_crossed
-
-    def reset_flow_count(self):
-        """Reset flow rate counter."""
-        self.total_crossed = 0
+        """Count tracks whose center crossed the counting line this frame."""
+        line = self._counting_line_y
+        old_y, new_y = old_centers[:, 1], new_centers[:, 1]
+        crossed = ((old_y < line) & (line <= new_y)) | ((old_y > line) & (line >= new_y))
+        new_crossings = set(track_ids[crossed].tolist()) - self._last_crossed_ids
+        if new_crossings:
+            self.crossings.add(len(new_crossings), now=now)
+            self._last_crossed_ids.update(new_crossings)
+
+    @property
+    def total_crossed(self) -> int:
+        """Crossings since the tracker was created."""
+        return self.crossings.total
+
+    def get_flow_rate(
+        self,
+        time_window_seconds: float = FLOW_RATE_WINDOW_SECONDS,
+        now: Optional[float] = None
+    ) -> float:
+        """Get flow rate (crossings per minute over the last time window)."""
+        return self.crossings.rate_per_minute(time_window_seconds, now=now)
+
+    def reset_tracks(self):
+        """Start tracking afresh after a scene cut, e.g. a looping source.
+
+        Tracks and crossed IDs are dropped and new tracks get IDs above
+        every earlier one. The windowed crossing counter keeps running,
+        so the flow rate spans the cut instead of restarting from zero.
+        """
+        self._create_tracker()
+        self._id_offset = self._max_track_id
+        self.tracks.clear()
+        self.detection_track_ids = np.empty(0, dtype=np.int32)
         self._last_crossed_ids.clear()
 
+    def predict_offsets(self) -> Dict[int, Tuple[float, float]]:
+        """Predict each track's motion over one processed frame.
+
+        Uses a constant-velocity model on the last two trajectory points.
+
+        Returns:
+            Map of track ID to (dx, dy) in percentage coords
+        """
+        ids, displacements = self.tracks.last_displacements()
+        return dict(zip(ids.tolist(), map(tuple, displacements.tolist())))
+
     def set_counting_line(self, y_percentage: float):
         """Set the Y position of the counting line (0-100)."""
         self._counting_line_y = y_percentage
@@ -204,7 +294,7 @@ class PeopleTracker:
     def model_info(self) -> Dict[str, str]:
         """Get model information."""
         return {
-            "name": "ByteTrack" if SUPERVISION_AVAILABLE else "Simple Tracker",
+            "name": "ByteTrack" if SUPERVISION_AVAILABLE else "IoU Tracker",
             "task": "Multi-Object Tracking",
             "accuracy": "85-90%"
         }
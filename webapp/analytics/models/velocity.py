@@ -1,54 +1,149 @@
 """Optical Flow based velocity estimation."""
 
 from typing import Optional, Tuple, Dict, Any
+import time
 import numpy as np
 import cv2
 
-from config import OPTICAL_FLOW_SCALE, PIXELS_PER_METER
+from models.flow_engines import FlowEngine, create_flow_engine
+from models.ground_plane import GroundPlane
+from config import (
+    OPTICAL_FLOW_SCALE, PIXELS_PER_METER, VELOCITY_MODE, SPARSE_FLOW_POINTS_PER_TRACK, FLOW_DIRECTION_GRID
+)
+
+VELOCITY_MODES = ("sparse", "dense")
+
+
+def compact_motion_grid(motion_grid: Dict[str, np.ndarray]) -> Dict[str, Any]:
+    """Compact per-cell motion summary for the live payload.
+
+    Args:
+        motion_grid: ``VelocityEstimator.motion_grid`` arrays of shape (rows, cols)
+
+    Returns:
+        Dict with ``cols``, ``rows`` and row-major flat lists ``speed``
+        (m/s), ``direction`` (degrees, 0 = right, 90 = down) and
+        ``motion`` (fraction of moving pixels or points)
+    """
+    rows, cols = motion_grid["speed"].shape
+    return {
+        "cols": cols,
+        "rows": rows,
+        "speed": motion_grid["speed"].ravel().round(2).tolist(),
+        "direction": (np.rint(motion_grid["direction"].ravel()) % 360).astype(int).tolist(),
+        "motion": motion_grid["motion"].ravel().round(2).tolist(),
+    }
 
 
 class VelocityEstimator:
-    """Farneback Optical Flow based velocity estimator."""
+    """Optical flow based velocity estimator.
+
+    Two modes are available:
 
-    def __init__(self, pixels_per_meter: float = PIXELS_PER_METER):
+    - ``sparse`` (default): pyramidal Lucas-Kanade on a few good-feature
+      points inside each tracked person's box. Cheap, and also yields a
+      speed per track. Needs detections.
+    - ``dense``: a dense flow engine (Farneback or DIS, see
+      models.flow_engines) over the whole downscaled frame. Costlier,
+      but works on scenes where detection fails.
+    """
+
+    def __init__(
+        self,
+        pixels_per_meter: float = PIXELS_PER_METER,
+        mode: str = VELOCITY_MODE,
+        flow_engine: Optional[FlowEngine] = None
+    ):
         """Initialize the velocity estimator.
 
         Args:
             pixels_per_meter: Calibration factor for converting pixels to meters
+            mode: "sparse" or "dense"
+            flow_engine: Dense flow engine (defaults to FLOW_ENGINE / FLOW_PRESET)
         """
+        if mode not in VELOCITY_MODES:
+            raise ValueError(f"Unknown velocity mode '{mode}'. Available: {list(VELOCITY_MODES)}")
+
         self.pixels_per_meter = pixels_per_meter
+        self.ground_plane: Optional[GroundPlane] = None  # Perspective-aware scale, if set
+        self.mode = mode
         self.prev_gray: Optional[np.ndarray] = None
         self.scale = OPTICAL_FLOW_SCALE
         self.velocity_history = []
         self.max_history = 30  # Keep last 30 measurements for smoothing
 
-        # Farneback parameters
-        self.flow_params = dict(
-            pyr_scale=0.5,
-            levels=3,
-            winsize=15,
-            iterations=3,
-            poly_n=5,
-            poly_sigma=1.2,
-            flags=0
+        # Sparse mode state: boxes and IDs of the previous frame
+        self.points_per_track = SPARSE_FLOW_POINTS_PER_TRACK
+        self.prev_boxes = np.empty((0, 4), dtype=np.float32)
+        self.prev_track_ids = np.empty(0, dtype=np.int64)
+        self.track_speeds: Dict[int, float] = {}  # m/s per track from the last sparse estimate
+        self.lk_params = dict(
+            winSize=(15, 15),
+            maxLevel=2,
+            criteria=(cv2.TERM_CRITERIA_EPS | cv2.TERM_CRITERIA_COUNT, 10, 0.03)
         )
 
+        # CPU time per mode
+        self.cpu_seconds = {mode_name: 0.0 for mode_name in VELOCITY_MODES}
+        self.calls = {mode_name: 0 for mode_name in VELOCITY_MODES}
+
+        # Dense flow engine
+        self.flow_engine = flow_engine or create_flow_engine()
+
+        # Motion summary of the last estimate, all at flow resolution
+        self.grid_size = FLOW_DIRECTION_GRID
+        self.last_flow: Optional[np.ndarray] = None
+        self.direction = "static"
+        self.direction_grid = np.zeros((self.grid_size[1], self.grid_size[0], 2), dtype=np.float32)
+        self.motion_grid = self._empty_motion_grid()
+
+    def _empty_motion_grid(self) -> Dict[str, np.ndarray]:
+        """Per-cell mean speed (m/s), direction (degrees) and motion fraction."""
+        shape = (self.grid_size[1], self.grid_size[0])
+        return {name: np.zeros(shape, dtype=np.float32) for name in ("speed", "direction", "motion")}
+
     def estimate(
         self,
         frame: np.ndarray,
         fps: float = 5.0,
-        mask: Optional[np.ndarray] = None
+        mask: Optional[np.ndarray] = None,
+        boxes_pct: Optional[np.ndarray] = None,
+        track_ids: Optional[np.ndarray] = None,
+        defer_boxes: bool = False
     ) -> Tuple[float, np.ndarray]:
         """Estimate average velocity from optical flow.
 
+        Sparse mode anchors on ``boxes_pct``; when no boxes are passed at
+        all (the caller has no detector) it falls back to dense flow.
+
+        Sparse flow tracks points inside the *previous* frame's boxes, so
+        this frame's boxes are only stored for the next call. With
+        ``defer_boxes`` they are left out entirely and handed over later
+        through ``observe_boxes``, letting flow run while detection for
+        the same frame is still in progress.
+
         Args:
             frame: BGR image as numpy array
             fps: Frame rate for velocity calculation
             mask: Optional mask to focus on specific regions
+            boxes_pct: (N, 4) tracked boxes as (x, y, width, height) percentages
+            track_ids: (N,) track ID per box, -1 if untracked
+            defer_boxes: Use the configured mode without this frame's boxes;
+                call ``observe_boxes`` once they are known
 
         Returns:
-            Tuple of (average_velocity_mps, flow_field)
+            Tuple of (average_velocity_mps, flow). Flow is the (h, w, 2)
+            field at flow resolution in dense mode and (P, 2) point
+            displacements in sparse mode, both in downscaled pixels per
+            frame. ``direction``, ``direction_grid`` and ``motion_grid``
+            are updated in the same pass; use ``flow_overlay`` for a full-size field.
         """
+        start = time.thread_time()
+        if defer_boxes:
+            mode = self.mode
+        else:
+            mode = "dense" if self.mode == "dense" or boxes_pct is None else "sparse"
+
         # Convert to grayscale and resize for efficiency
         gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
         h, w = gray.shape
@@ -57,24 +152,190 @@ class VelocityEstimator:
             (int(w * self.scale), int(h * self.scale))
         )
 
-        if self.prev_gray is None:
-            self.prev_gray = small_gray
-            return 0.0, np.zeros((h, w, 2), dtype=np.float32)
+        if mode == "sparse":
+            velocity_mps, flow = self._estimate_sparse(small_gray, fps, mask)
+            if not defer_boxes:
+                self.observe_boxes(boxes_pct, track_ids)
+        else:
+            velocity_mps, flow = self._estimate_dense(small_gray, fps, mask)
+        self.prev_gray = small_gray
+        self.last_flow = flow
 
-        # Calculate optical flow
-        flow = cv2.calcOpticalFlowFarneback(
-            self.prev_gray,
-            small_gray,
-            None,
-            **self.flow_params
+        if velocity_mps is None:
+            smoothed_velocity = 0.0
+        else:
+            # Smooth with history
+            self.velocity_history.append(velocity_mps)
+            if len(self.velocity_history) > self.max_history:
+                self.velocity_history = self.velocity_history[-self.max_history:]
+
+            smoothed_velocity = np.mean(self.velocity_history)
+
+        self.cpu_seconds[mode] += time.thread_time() - start
+        self.calls[mode] += 1
+        return smoothed_velocity, flow
+
+    def _estimate_sparse(
+        self,
+        gray: np.ndarray,
+        fps: float,
+        mask: Optional[np.ndarray]
+    ) -> Tuple[Optional[float], np.ndarray]:
+        """Track good features inside the previous frame's boxes with LK.
+
+        Returns:
+            Tuple of (raw velocity in m/s or None on the first frame,
+            (P, 2) point displacements)
+        """
+        prev_gray, prev_boxes, prev_ids = self.prev_gray, self.prev_boxes, self.prev_track_ids
+        self.track_speeds = {}
+        no_motion = np.zeros((0, 2), dtype=np.float32)
+        self._set_direction(0.0, 0.0, 0, 1)
+        self._clear_grids()
+
+        if prev_gray is None or prev_gray.shape != gray.shape:
+            return None, no_motion
+        if len(prev_boxes) == 0:
+            return 0.0, no_motion
+
+        # Feature mask covering the previous frame's boxes
+        h, w = gray.shape
+        boxes_px = np.round(prev_boxes * np.float32([w, h, w, h]) / 100).astype(int)
+        x1 = np.clip(boxes_px[:, 0], 0, w)
+        y1 = np.clip(boxes_px[:, 1], 0, h)
+        x2 = np.clip(boxes_px[:, 0] + boxes_px[:, 2], 0, w)
+        y2 = np.clip(boxes_px[:, 1] + boxes_px[:, 3], 0, h)
+        feature_mask = np.zeros((h, w), dtype=np.uint8)
+        for bx1, by1, bx2, by2 in zip(x1.tolist(), y1.tolist(), x2.tolist(), y2.tolist()):
+            feature_mask[by1:by2, bx1:bx2] = 255
+        if mask is not None:
+            feature_mask &= (cv2.resize(mask, (w, h)) > 0).astype(np.uint8) * 255
+
+        points = cv2.goodFeaturesToTrack(
+            prev_gray,
+            maxCorners=len(prev_boxes) * self.points_per_track,
+            qualityLevel=0.01,
+            minDistance=3,
+            mask=feature_mask
         )
+        if points is None:
+            return 0.0, no_motion
+
+        moved, status, _ = cv2.calcOpticalFlowPyrLK(prev_gray, gray, points, None, **self.lk_params)
+        ok = status.ravel().astype(bool)
+        start_points = points.reshape(-1, 2)[ok]
+        displacement = (moved - points).reshape(-1, 2)[ok]
+        if len(displacement) == 0:
+            return 0.0, no_motion
+
+        # Assign each point to the first box that contains it
+        px, py = start_points[:, 0:1], start_points[:, 1:2]
+        inside = (px >= x1) & (px < x2) & (py >= y1) & (py < y2)  # (P, N)
+        owned = inside.any(axis=1)
+        owner = inside.argmax(axis=1)[owned]
+        displacement = displacement[owned]
+
+        # Mean displacement per box, in downscaled pixels per frame
+        counts = np.bincount(owner, minlength=len(prev_boxes))
+        has_points = counts > 0
+        mean_dx = np.bincount(owner, displacement[:, 0], len(prev_boxes))[has_points] / counts[has_points]
+        mean_dy = np.bincount(owner, displacement[:, 1], len(prev_boxes))[has_points] / counts[has_points]
+        magnitude = np.hypot(mean_dx, mean_dy)
+
+        # Scale at each person's feet (bottom centre of the box)
+        feet_px = np.stack([
+            (x1 + x2)[has_points] / 2,
+            y2[has_points]
+        ], axis=1) / self.scale
+        metres_per_pixel = self._metres_per_pixel_at(feet_px)
+
+        # (pixels/frame) / scale * (metres/pixel) * (frames/second), clamped to 2 m/s
+        speeds = np.minimum(magnitude / self.scale * metres_per_pixel * fps, 2.0)
+        ids = prev_ids[has_points]
+        tracked = ids >= 0
+        self.track_speeds = dict(zip(ids[tracked].tolist(), speeds[tracked].round(3).tolist()))
 
-        self.prev_gray = small_gray
+        motion_threshold = 0.5  # Minimum pixel movement
+        moving = magnitude > motion_threshold
+        velocity_mps = float(speeds[moving].mean()) if moving.any() else 0.0
+
+        # Direction from the moving points
+        point_speeds = np.hypot(displacement[:, 0], displacement[:, 1])
+        point_moving = point_speeds > motion_threshold
+        if point_moving.any():
+            moving_displacement = displacement[point_moving]
+            mean_x, mean_y = moving_displacement.mean(axis=0)
+        else:
+            mean_x = mean_y = 0.0
+        self._set_direction(mean_x, mean_y, int(point_moving.sum()), 3)
+
+        # Coarse grid: reduce the points into cells with bincount
+        box_scale = np.zeros(len(prev_boxes), dtype=np.float32)
+        box_scale[has_points] = metres_per_pixel
+        point_speeds = np.minimum(point_speeds / self.scale * box_scale[owner] * fps, 2.0)
+        cols, rows = self.grid_size
+        points = start_points[owned]
+        cell = (
+            np.clip((points[:, 1] * rows / h).astype(int), 0, rows - 1) * cols +
+            np.clip((points[:, 0] * cols / w).astype(int), 0, cols - 1)
+        )
+        weights = point_moving.astype(np.float32)
+        cell_points = np.bincount(cell, minlength=rows * cols)
+        cell_moving = np.bincount(cell, weights, rows * cols)
+        moving_counts = np.maximum(cell_moving, 1)
+        for axis in range(2):
+            self.direction_grid[..., axis] = (
+                np.bincount(cell, displacement[:, axis] * weights, rows * cols) / moving_counts
+            ).reshape(rows, cols)
+        self._set_motion_grid(
+            (np.bincount(cell, point_speeds * weights, rows * cols) / moving_counts).reshape(rows, cols),
+            (cell_moving / np.maximum(cell_points, 1)).reshape(rows, cols)
+        )
+        return velocity_mps, displacement
+
+    def observe_boxes(self, boxes_pct: np.ndarray, track_ids: Optional[np.ndarray] = None):
+        """Store this frame's boxes as the anchors of the next sparse estimate.
+
+        Args:
+            boxes_pct: (N, 4) tracked boxes as (x, y, width, height) percentages
+            track_ids: (N,) track ID per box, -1 if untracked
+        """
+        self.prev_boxes = np.asarray(boxes_pct, dtype=np.float32).reshape(-1, 4)
+        if track_ids is None:
+            self.prev_track_ids = np.full(len(self.prev_boxes), -1, dtype=np.int64)
+        else:
+            self.prev_track_ids = np.asarray(track_ids, dtype=np.int64)
+
+    def _estimate_dense(
+        self,
+        small_gray: np.ndarray,
+        fps: float,
+        mask: Optional[np.ndarray]
+    ) -> Tuple[Optional[float], np.ndarray]:
+        """Dense flow over the whole downscaled frame.
+
+        Magnitude, direction and the coarse grid all come from the flow
+        at its own resolution; nothing is upsampled here.
+
+        Returns:
+            Tuple of (raw velocity in m/s or None on the first frame,
+            (h, w, 2) flow field at flow resolution)
+        """
+        if self.prev_gray is None or self.prev_gray.shape != small_gray.shape:
+            self._set_direction(0.0, 0.0, 0, 1)
+            self._clear_grids()
+            return None, np.zeros(small_gray.shape + (2,), dtype=np.float32)
+
+        # Calculate optical flow
+        flow = self.flow_engine.compute(self.prev_gray, small_gray)
 
         # Calculate magnitude
         fx, fy = flow[:, :, 0], flow[:, :, 1]
         magnitude = np.sqrt(fx**2 + fy**2)
 
+        # Per-pixel ground scale, one cached array at flow resolution
+        metres_per_pixel = self._metres_per_pixel_grid(magnitude.shape)
+
         # Apply mask if provided (resized to match flow)
         if mask is not None:
             mask_small = cv2.resize(mask, (flow.shape[1], flow.shape[0]))
@@ -84,72 +345,152 @@ class VelocityEstimator:
         motion_threshold = 0.5  # Minimum pixel movement
         motion_mask = magnitude > motion_threshold
 
-        if np.sum(motion_mask) > 0:
-            # Average magnitude of moving pixels
-            avg_magnitude_pixels = np.mean(magnitude[motion_mask])
-
-            # Convert to meters per second
-            # magnitude is in pixels per frame
-            # Scale back to original resolution
-            avg_magnitude_pixels = avg_magnitude_pixels / self.scale
-
-            # Convert to velocity: (pixels/frame) * (frames/second) / (pixels/meter)
-            velocity_mps = (avg_magnitude_pixels * fps) / self.pixels_per_meter
+        moving_count = int(np.count_nonzero(motion_mask))
 
-            # Clamp to reasonable walking speeds
-            velocity_mps = min(velocity_mps, 2.0)  # Max 2 m/s
+        # Direction from the same moving pixels; 100 full-resolution pixels minimum
+        if moving_count:
+            mean_x, mean_y = fx[motion_mask].mean(), fy[motion_mask].mean()
+        else:
+            mean_x = mean_y = 0.0
+        self._set_direction(mean_x, mean_y, moving_count, max(1, int(100 * self.scale ** 2)))
+
+        # Ground speed of every pixel in m/s: magnitude is in downscaled
+        # pixels per frame; scale back to original resolution and convert
+        # with the per-pixel scale
+        speed = magnitude * metres_per_pixel * (fps / self.scale)
+
+        # Coarse grid by block reduction (INTER_AREA averages each cell)
+        moving = motion_mask.astype(np.float32)
+        motion = cv2.resize(moving, self.grid_size, interpolation=cv2.INTER_AREA)
+        moving_share = np.maximum(motion, 1e-6)[..., None]
+        self.direction_grid = cv2.resize(
+            flow * moving[..., None], self.grid_size, interpolation=cv2.INTER_AREA
+        ) / moving_share
+        cell_speed = cv2.resize(speed * moving, self.grid_size, interpolation=cv2.INTER_AREA)
+        self._set_motion_grid(np.minimum(cell_speed / moving_share[..., 0], 2.0), motion)
+
+        if moving_count > 0:
+            # Average ground speed of moving pixels, clamped to reasonable walking speeds
+            velocity_mps = min(float(speed[motion_mask].mean()), 2.0)  # Max 2 m/s
         else:
             velocity_mps = 0.0
 
-        # Smooth with history
-        self.velocity_history.append(velocity_mps)
-        if len(self.velocity_history) > self.max_history:
-            self.velocity_history = self.velocity_history[-self.max_history:]
+        return velocity_mps, flow
+
+    def _metres_per_pixel_at(self, points_px: np.ndarray) -> np.ndarray:
+        """Metres per full-resolution pixel at (N, 2) points."""
+        if self.ground_plane is None:
+            return np.full(len(points_px), 1.0 / self.pixels_per_meter, dtype=np.float32)
+        return self.ground_plane.scale_at(points_px)
+
+    def _metres_per_pixel_grid(self, shape: Tuple[int, int]):
+        """Metres per full-resolution pixel for a flow-sized array (or a scalar)."""
+        if self.ground_plane is None:
+            return 1.0 / self.pixels_per_meter
+        return self.ground_plane.scale_grid(shape)
+
+    def _clear_grids(self):
+        """Start a new estimate from empty grids.
+
+        Fresh arrays rather than zeroing in place: earlier grids may
+        still be held by analyzers or queued for a worker pipe.
+        """
+        self.direction_grid = np.zeros((self.grid_size[1], self.grid_size[0], 2), dtype=np.float32)
+        self.motion_grid = self._empty_motion_grid()
+
+    def _set_motion_grid(self, speed: np.ndarray, motion: np.ndarray):
+        """Store per-cell speed and motion fraction, with direction from direction_grid."""
+        self.motion_grid = {
+            "speed": speed.astype(np.float32),
+            "direction": np.degrees(np.arctan2(
+                self.direction_grid[..., 1], self.direction_grid[..., 0]
+            )).astype(np.float32) % 360,
+            "motion": motion.astype(np.float32),
+        }
+
+    def get_motion_grid(self) -> Dict[str, Any]:
+        """Compact per-cell motion summary for the live payload (see ``compact_motion_grid``)."""
+        return compact_motion_grid(self.motion_grid)
+
+    def _set_direction(self, mean_x: float, mean_y: float, moving_count: int, min_moving: int):
+        """Store the predominant direction from the mean moving displacement."""
+        self.direction = self._direction_label(mean_x, mean_y) if moving_count >= min_moving else "static"
+
+    @staticmethod
+    def _direction_label(avg_fx: float, avg_fy: float) -> str:
+        """Map a mean displacement to left/right/up/down."""
+        if abs(avg_fx) > abs(avg_fy):
+            return "right" if avg_fx > 0 else "left"
+        else:
+            return "down" if avg_fy > 0 else "up"
 
-        smoothed_velocity = np.mean(self.velocity_history)
+    def flow_overlay(self, frame_size: Tuple[int, int]) -> Optional[np.ndarray]:
+        """Upsample the last dense flow field for a visual overlay.
 
-        # Resize flow back to original size for visualization
-        flow_full = cv2.resize(flow, (w, h))
+        Args:
+            frame_size: (width, height) of the overlay
 
-        return smoothed_velocity, flow_full
+        Returns:
+            (height, width, 2) flow field, or None if there is no dense flow
+        """
+        if self.last_flow is None or self.last_flow.ndim != 3:
+            return None
+        return cv2.resize(self.last_flow, frame_size)
 
-    def get_motion_direction(self, flow: np.ndarray) -> str:
+    def get_motion_direction(self, flow: Optional[np.ndarray] = None) -> str:
         """Get predominant motion direction.
 
         Args:
-            flow: Optical flow field (H, W, 2)
+            flow: Optical flow field (H, W, 2), or (P, 2) sparse point
+                displacements. Omit to get the direction computed by the
+                last ``estimate`` call.
 
         Returns:
             Direction string: "left", "right", "up", "down", "mixed", or "static"
         """
-        if flow is None or flow.size == 0:
+        if flow is None:
+            return self.direction
+        if flow.size == 0:
             return "static"
 
-        fx, fy = flow[:, :, 0], flow[:, :, 1]
+        fx, fy = flow[..., 0], flow[..., 1]
         magnitude = np.sqrt(fx**2 + fy**2)
 
         # Only consider significant motion
         motion_threshold = 0.5
         mask = magnitude > motion_threshold
 
-        if np.sum(mask) < 100:
+        min_moving = 3 if flow.ndim == 2 else 100
+        if np.sum(mask) < min_moving:
             return "static"
 
         # Average direction
-        avg_fx = np.mean(fx[mask])
-        avg_fy = np.mean(fy[mask])
-
-        # Determine predominant direction
-        if abs(avg_fx) > abs(avg_fy):
-            return "right" if avg_fx > 0 else "left"
-        else:
-            return "down" if avg_fy > 0 else "up"
+        return self._direction_label(np.mean(fx[mask]), np.mean(fy[mask]))
 
     def reset(self):
         """Reset the estimator state."""
         self.prev_gray = None
+        self.prev_boxes = np.empty((0, 4), dtype=np.float32)
+        self.prev_track_ids = np.empty(0, dtype=np.int64)
+        self.track_speeds = {}
+        self.last_flow = None
+        self.direction = "static"
+        self.direction_grid = np.zeros((self.grid_size[1], self.grid_size[0], 2), dtype=np.float32)
+        self.motion_grid = self._empty_motion_grid()
         self.velocity_history.clear()
 
+    def get_status(self) -> Dict[str, Any]:
+        """Get the active mode and CPU time spent per mode."""
+        return {
+            "mode": self.mode,
+            "flow_engine": self.flow_engine.label,
+            "cpu_ms_per_frame": {
+                mode: round(self.cpu_seconds[mode] / self.calls[mode] * 1000, 2)
+                for mode in VELOCITY_MODES if self.calls[mode]
+            },
+            "frames": dict(self.calls)
+        }
+
     def set_calibration(self, pixels_per_meter: float):
         """Update the pixels per meter calibration.
 
@@ -158,11 +499,19 @@ class VelocityEstimator:
         """
         self.pixels_per_meter = pixels_per_meter
 
+    def set_ground_plane(self, ground_plane: Optional[GroundPlane]):
+        """Use a perspective-aware metres-per-pixel map instead of the scalar.
+
+        Args:
+            ground_plane: Camera ground plane, or None to go back to pixels_per_meter
+        """
+        self.ground_plane = ground_plane
+
     @property
     def model_info(self) -> Dict[str, str]:
         """Get model information."""
         return {
-            "name": "Farneback Optical Flow",
+            "name": f"{self.flow_engine.label} Optical Flow" if self.mode == "dense" else "Lucas-Kanade Sparse Flow",
             "task": "Velocity Estimation",
             "accuracy": "80-85%"
         }
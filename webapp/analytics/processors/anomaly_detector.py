@@ -4,14 +4,19 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
 from collections import defaultdict
 import time
-import math
+import numpy as np
+
+from models.detector import TrackedObjects, as_batch, format_track_id, normalized_positions
+from models.track_store import TrackTable
+from config import TRACK_HISTORY_TTL
 
 
 @dataclass
 class AnomalyEvent:
     """Represents an anomaly detection event."""
     event_id: str
-    event_type: str  # 'fall', 'sudden_stop', 'unusual_position', 'crowd_surge', 'stationary_person'
+    event_type: str  # 'fall', 'sudden_stop', 'unusual_position', 'crowd_surge', 'stationary_person',
+                     # 'local_stoppage', 'local_surge'
     timestamp: float
     position: Tuple[float, float]
     track_id: Optional[str] = None
@@ -34,10 +39,11 @@ class AnomalyDetector:
     3. Unusual positions - person lying down or in distress
     4. Crowd surge - sudden increase in movement speed
     5. Stationary person - someone not moving when everyone else is
+    6. Local stoppage / surge - a motion grid cell that stops or speeds up
+       against its own running baseline (needs a motion grid)
     """
 
     def __init__(self):
-        self.track_history: Dict[str, List[Dict]] = defaultdict(list)
         self.anomaly_events: List[AnomalyEvent] = []
         self.event_counter = 0
 
@@ -49,180 +55,193 @@ class AnomalyDetector:
         self.stationary_frames = 30  # Frames to be stationary to trigger
         self.surge_velocity_multiplier = 2.5  # How much faster than average to trigger surge
 
+        # Recent records per track, oldest first, as rows of (x, y, width, height, timestamp);
+        # count is how many of them are filled
+        self.history_length = max(self.stationary_frames, self.sudden_stop_window + 5, 10)
+        self.track_history = TrackTable(
+            history=(np.float64, (self.history_length, 5)),
+            count=(np.int64, ())
+        )
+
+        # Motion grid parameters (speeds in m/s)
+        self.grid_baseline_alpha = 0.05  # EMA weight of the newest frame
+        self.grid_warmup_frames = 20  # Frames before the baselines are trusted
+        self.grid_min_speed = 0.3  # Baseline a cell needs before it can stop or surge
+        self.grid_stop_ratio = 0.2  # Stopped when below this fraction of the baseline
+        self.grid_stop_frames = 5  # Consecutive stopped frames to trigger
+        self.grid_cooldown = 30.0  # Seconds before the same cell can fire again
+
         # Global metrics
         self.average_crowd_velocity = 0.0
         self.velocity_history: List[float] = []
 
+        # Motion grid state, allocated on the first grid
+        self.grid_baseline: Optional[np.ndarray] = None
+        self.grid_stopped: Optional[np.ndarray] = None
+        self.grid_last_event: Optional[np.ndarray] = None
+        self.grid_frames = 0
+
     def _generate_event_id(self) -> str:
         """Generate unique event ID."""
         self.event_counter += 1
         return f"ANM{self.event_counter:05d}"
 
-    def _calculate_velocity(self, pos1: Tuple[float, float], pos2: Tuple[float, float], dt: float) -> float:
-        """Calculate velocity between two positions."""
-        if dt <= 0:
-            return 0.0
-        dx = pos2[0] - pos1[0]
-        dy = pos2[1] - pos1[1]
-        return math.sqrt(dx ** 2 + dy ** 2) / dt
-
-    def _calculate_aspect_ratio(self, detection: Dict) -> float:
-        """Calculate aspect ratio from detection bounding box."""
-        width = detection.get('width', 1)
-        height = detection.get('height', 1)
-        if height == 0:
-            return 0
-        return width / height
-
-    def _check_fall_detection(self, track_id: str, current: Dict, history: List[Dict]) -> Optional[AnomalyEvent]:
+    def _calculate_velocity(self, pos1: np.ndarray, pos2: np.ndarray, dt: np.ndarray) -> np.ndarray:
+        """Calculate velocities between (N, 2) positions, 0 where dt <= 0."""
+        distance = np.hypot(pos2[:, 0] - pos1[:, 0], pos2[:, 1] - pos1[:, 1])
+        return np.divide(distance, dt, out=np.zeros_like(distance), where=dt > 0)
+
+    def _calculate_aspect_ratio(self, records: np.ndarray) -> np.ndarray:
+        """Calculate bounding box aspect ratios of history records (0 where height is 0)."""
+        width, height = records[..., 2], records[..., 3]
+        return np.divide(width, height, out=np.zeros_like(width), where=height != 0)
+
+    def _check_fall_detection(
+        self,
+        track_ids: np.ndarray,
+        current: np.ndarray,
+        history: np.ndarray,
+        count: np.ndarray
+    ) -> List[AnomalyEvent]:
         """
-        Check for potential fall based on:
+        Check for potential falls based on:
         - Sudden change in aspect ratio (person goes horizontal)
         - Sudden drop in y-position (falling motion)
         - Reduction in bounding box height
         """
-        if len(history) < 5:
-            return None
-
         current_aspect = self._calculate_aspect_ratio(current)
-        current_height = current.get('height', 0)
-        current_y = current.get('y', 0)
-
-        # Get average from recent history
-        recent = history[-10:]
-        avg_aspect = sum(self._calculate_aspect_ratio(h) for h in recent) / len(recent)
-        avg_height = sum(h.get('height', 0) for h in recent) / len(recent)
-        avg_y = sum(h.get('y', 0) for h in recent) / len(recent)
+        current_height = current[:, 3]
+        current_y = current[:, 1]
+
+        # Get average from recent history (up to the last 10 records)
+        window = min(10, history.shape[1])
+        recent = history[:, -window:]
+        filled = np.arange(window) >= window - np.minimum(count, window)[:, None]
+        size = np.maximum(np.minimum(count, window), 1)
+        avg_aspect = (self._calculate_aspect_ratio(recent) * filled).sum(axis=1) / size
+        avg_height = (recent[..., 3] * filled).sum(axis=1) / size
+        avg_y = (recent[..., 1] * filled).sum(axis=1) / size
 
         # Check for fall indicators
-        fall_indicators = 0
-        details = {}
-
-        # Aspect ratio change (person becomes horizontal)
-        if current_aspect > avg_aspect * 1.5 and current_aspect > self.fall_aspect_ratio_threshold:
-            fall_indicators += 2
-            details['aspect_change'] = f"{avg_aspect:.2f} -> {current_aspect:.2f}"
-
-        # Height reduction (person falls)
-        if current_height < avg_height * 0.6 and avg_height > 0:
-            fall_indicators += 2
-            details['height_reduction'] = f"{avg_height:.1f} -> {current_height:.1f}"
-
-        # Sudden downward movement
-        if current_y > avg_y * 1.2 and current_y > 0:
-            fall_indicators += 1
-            details['downward_motion'] = True
-
-        if fall_indicators >= 3:
-            confidence = min(fall_indicators / 5.0, 1.0)
+        aspect_change = (current_aspect > avg_aspect * 1.5) & (current_aspect > self.fall_aspect_ratio_threshold)
+        height_reduction = (current_height < avg_height * 0.6) & (avg_height > 0)
+        downward_motion = (current_y > avg_y * 1.2) & (current_y > 0)
+        fall_indicators = 2 * aspect_change + 2 * height_reduction + downward_motion
+        falls = (count >= 5) & (fall_indicators >= 3)
+
+        events = []
+        for i in np.flatnonzero(falls).tolist():
+            details = {}
+            if aspect_change[i]:
+                details['aspect_change'] = f"{avg_aspect[i]:.2f} -> {current_aspect[i]:.2f}"
+            if height_reduction[i]:
+                details['height_reduction'] = f"{avg_height[i]:.1f} -> {current_height[i]:.1f}"
+            if downward_motion[i]:
+                details['downward_motion'] = True
+
+            confidence = min(int(fall_indicators[i]) / 5.0, 1.0)
             severity = "critical" if confidence > 0.8 else "high" if confidence > 0.6 else "medium"
-
-            return AnomalyEvent(
+            events.append(AnomalyEvent(
                 event_id=self._generate_event_id(),
                 event_type="fall",
-                timestamp=time.time(),
-                position=(current.get('x', 0), current.get('y', 0)),
-                track_id=track_id,
+                timestamp=float(current[i, 4]),
+                position=(float(current[i, 0]), float(current[i, 1])),
+                track_id=format_track_id(int(track_ids[i])),
                 confidence=confidence,
                 severity=severity,
                 details=details
+            ))
+
+        return events
+
+    def _check_sudden_stop(
+        self,
+        track_ids: np.ndarray,
+        current: np.ndarray,
+        history: np.ndarray,
+        count: np.ndarray
+    ) -> List[AnomalyEvent]:
+        """Check for sudden stops in a moving crowd."""
+        # Only flag if crowd is moving (based on average velocity)
+        if self.average_crowd_velocity <= self.sudden_stop_velocity_threshold * 2:
+            return []
+
+        # Recent velocity, from the last record
+        last = history[:, -1]
+        current_velocity = self._calculate_velocity(last[:, :2], current[:, :2], current[:, 4] - last[:, 4])
+
+        # Previous velocity (before potential stop), between the two records before the window
+        old1 = history[:, -self.sudden_stop_window - 2]
+        old2 = history[:, -self.sudden_stop_window - 1]
+        previous_velocity = self._calculate_velocity(old1[:, :2], old2[:, :2], old2[:, 4] - old1[:, 4])
+
+        # Check for sudden stop: was moving, now stopped
+        stops = (
+            (count >= self.sudden_stop_window + 5) &
+            (previous_velocity > self.sudden_stop_velocity_threshold * 3) &
+            (current_velocity < self.sudden_stop_velocity_threshold)
+        )
+
+        return [
+            AnomalyEvent(
+                event_id=self._generate_event_id(),
+                event_type="sudden_stop",
+                timestamp=float(current[i, 4]),
+                position=(float(current[i, 0]), float(current[i, 1])),
+                track_id=format_track_id(int(track_ids[i])),
+                confidence=0.7,
+                severity="medium",
+                details={
+                    "previous_velocity": round(float(previous_velocity[i]), 4),
+                    "current_velocity": round(float(current_velocity[i]), 4),
+                    "crowd_velocity": round(self.average_crowd_velocity, 4)
+                }
             )
-
-        return None
-
-    def _check_sudden_stop(self, track_id: str, current: Dict, history: List[Dict]) -> Optional[AnomalyEvent]:
-        """Check for sudden stop in a moving crowd."""
-        if len(history) < self.sudden_stop_window + 5:
-            return None
-
-        current_time = current.get('timestamp', time.time())
-        current_pos = (current.get('x', 0), current.get('y', 0))
-
-        # Calculate recent velocity
-        recent = history[-3:]
-        if not recent:
-            return None
-
-        recent_pos = (recent[-1].get('x', 0), recent[-1].get('y', 0))
-        recent_time = recent[-1].get('timestamp', current_time - 0.1)
-        dt = current_time - recent_time
-        current_velocity = self._calculate_velocity(recent_pos, current_pos, dt) if dt > 0 else 0
-
-        # Calculate previous velocity (before potential stop)
-        older = history[-self.sudden_stop_window - 3:-self.sudden_stop_window]
-        if len(older) >= 2:
-            old_pos1 = (older[-2].get('x', 0), older[-2].get('y', 0))
-            old_pos2 = (older[-1].get('x', 0), older[-1].get('y', 0))
-            old_time_diff = older[-1].get('timestamp', 1) - older[-2].get('timestamp', 0)
-            previous_velocity = self._calculate_velocity(old_pos1, old_pos2, old_time_diff) if old_time_diff > 0 else 0
-
-            # Check for sudden stop: was moving, now stopped
-            if (previous_velocity > self.sudden_stop_velocity_threshold * 3 and
-                current_velocity < self.sudden_stop_velocity_threshold):
-
-                # Only flag if crowd is moving (based on average velocity)
-                if self.average_crowd_velocity > self.sudden_stop_velocity_threshold * 2:
-                    return AnomalyEvent(
-                        event_id=self._generate_event_id(),
-                        event_type="sudden_stop",
-                        timestamp=time.time(),
-                        position=current_pos,
-                        track_id=track_id,
-                        confidence=0.7,
-                        severity="medium",
-                        details={
-                            "previous_velocity": round(previous_velocity, 4),
-                            "current_velocity": round(current_velocity, 4),
-                            "crowd_velocity": round(self.average_crowd_velocity, 4)
-                        }
-                    )
-
-        return None
-
-    def _check_stationary_person(self, track_id: str, history: List[Dict]) -> Optional[AnomalyEvent]:
-        """Check for person who has been stationary too long."""
-        if len(history) < self.stationary_frames:
-            return None
-
-        recent = history[-self.stationary_frames:]
-
-        # Calculate total movement over the window
-        total_movement = 0.0
-        for i in range(1, len(recent)):
-            prev = recent[i - 1]
-            curr = recent[i]
-            dx = curr.get('x', 0) - prev.get('x', 0)
-            dy = curr.get('y', 0) - prev.get('y', 0)
-            total_movement += math.sqrt(dx ** 2 + dy ** 2)
-
-        avg_movement = total_movement / len(recent)
-
-        # If very little movement while crowd is moving
-        if avg_movement < self.stationary_threshold and self.average_crowd_velocity > self.stationary_threshold * 3:
-            latest = recent[-1]
-            return AnomalyEvent(
+            for i in np.flatnonzero(stops).tolist()
+        ]
+
+    def _check_stationary_person(
+        self,
+        track_ids: np.ndarray,
+        history: np.ndarray,
+        count: np.ndarray,
+        current_time: float
+    ) -> List[AnomalyEvent]:
+        """Check for people who have been stationary too long."""
+        # Only while the crowd is moving
+        if self.average_crowd_velocity <= self.stationary_threshold * 3:
+            return []
+
+        # Average movement over the window
+        recent = history[:, -self.stationary_frames:, :2]
+        steps = np.diff(recent, axis=1)
+        avg_movement = np.hypot(steps[..., 0], steps[..., 1]).sum(axis=1) / self.stationary_frames
+
+        stationary = (count >= self.stationary_frames) & (avg_movement < self.stationary_threshold)
+        return [
+            AnomalyEvent(
                 event_id=self._generate_event_id(),
                 event_type="stationary_person",
-                timestamp=time.time(),
-                position=(latest.get('x', 0), latest.get('y', 0)),
-                track_id=track_id,
+                timestamp=current_time,
+                position=(float(recent[i, -1, 0]), float(recent[i, -1, 1])),
+                track_id=format_track_id(int(track_ids[i])),
                 confidence=0.6,
                 severity="low",
                 details={
                     "stationary_frames": self.stationary_frames,
-                    "avg_movement": round(avg_movement, 5),
+                    "avg_movement": round(float(avg_movement[i]), 5),
                     "crowd_velocity": round(self.average_crowd_velocity, 4)
                 }
             )
+            for i in np.flatnonzero(stationary).tolist()
+        ]
 
-        return None
-
-    def _check_crowd_surge(self, velocities: List[float]) -> Optional[AnomalyEvent]:
+    def _check_crowd_surge(self, velocities: np.ndarray) -> Optional[AnomalyEvent]:
         """Check for sudden crowd surge (everyone moving fast)."""
-        if not velocities or not self.velocity_history:
+        if len(velocities) == 0 or not self.velocity_history:
             return None
 
-        current_avg = sum(velocities) / len(velocities)
+        current_avg = float(velocities.mean())
         historical_avg = sum(self.velocity_history[-50:]) / len(self.velocity_history[-50:])
 
         if historical_avg > 0 and current_avg > historical_avg * self.surge_velocity_multiplier:
@@ -243,79 +262,136 @@ class AnomalyDetector:
 
         return None
 
-    def update(self, tracked_objects: List[Dict]) -> Dict:
+    def _check_motion_grid(self, motion_grid: Dict[str, np.ndarray], current_time: float) -> List[AnomalyEvent]:
+        """Check every motion grid cell against its own speed baseline.
+
+        A cell is a local stoppage when its speed has stayed below
+        ``grid_stop_ratio`` of its baseline for ``grid_stop_frames`` frames
+        while the rest of the crowd is still moving, and a local surge
+        when its speed exceeds ``surge_velocity_multiplier`` times the
+        baseline.
+        """
+        speed = motion_grid["speed"]
+        if self.grid_baseline is None or self.grid_baseline.shape != speed.shape:
+            self.grid_baseline = speed.astype(np.float32).copy()
+            self.grid_stopped = np.zeros(speed.shape, dtype=np.int32)
+            self.grid_last_event = np.full(speed.shape, -np.inf)
+            self.grid_frames = 0
+
+        baseline = self.grid_baseline
+        active = baseline > self.grid_min_speed
+        stopped = active & (speed < baseline * self.grid_stop_ratio)
+        self.grid_stopped = np.where(stopped, self.grid_stopped + 1, 0)
+
+        events = []
+        self.grid_frames += 1
+        if self.grid_frames > self.grid_warmup_frames:
+            ready = current_time - self.grid_last_event > self.grid_cooldown
+            crowd_moving = float(speed.mean()) > self.grid_min_speed * self.grid_stop_ratio
+            stoppages = ready & (self.grid_stopped == self.grid_stop_frames) & crowd_moving
+            surges = ready & active & (speed > baseline * self.surge_velocity_multiplier)
+
+            rows, cols = speed.shape
+            for event_type, cells, severity in (
+                ("local_stoppage", stoppages, "medium"),
+                ("local_surge", surges, "high"),
+            ):
+                for row, col in np.argwhere(cells).tolist():
+                    ratio = float(speed[row, col] / baseline[row, col])
+                    if event_type == "local_stoppage":
+                        confidence = 0.6
+                    else:
+                        confidence = min(ratio / (self.surge_velocity_multiplier * 1.5), 1.0)
+                    events.append(AnomalyEvent(
+                        event_id=self._generate_event_id(),
+                        event_type=event_type,
+                        timestamp=current_time,
+                        position=((col + 0.5) / cols, (row + 0.5) / rows),
+                        confidence=confidence,
+                        severity=severity,
+                        details={
+                            "cell": int(row * cols + col),
+                            "speed": round(float(speed[row, col]), 3),
+                            "baseline_speed": round(float(baseline[row, col]), 3),
+                            "speed_ratio": round(ratio, 2)
+                        }
+                    ))
+                    self.grid_last_event[row, col] = current_time
+
+        # Stopped cells keep their baseline so a long stoppage stays visible
+        update = ~stopped
+        baseline[update] += self.grid_baseline_alpha * (speed[update] - baseline[update])
+        return events
+
+    def update(
+        self,
+        tracked_objects: TrackedObjects,
+        motion_grid: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict:
         """
         Update anomaly detection with new tracked objects.
 
         Args:
-            tracked_objects: List with 'id', 'x', 'y', 'width', 'height' fields
+            tracked_objects: DetectionBatch, or list of dicts with 'id', 'x', 'y',
+                'width', 'height' fields
+            motion_grid: Optional VelocityEstimator.motion_grid, checked for
+                local stoppages and surges
 
         Returns:
             Dict with anomaly detection results
         """
         current_time = time.time()
         new_anomalies = []
-        frame_velocities = []
-
-        for obj in tracked_objects:
-            track_id = obj.get('id', str(obj.get('track_id', '')))
-            x = obj.get('x', 0)
-            y = obj.get('y', 0)
-
-            # Normalize if needed
-            if x > 1 or y > 1:
-                x = x / 100.0
-                y = y / 100.0
-
-            # Create record with timestamp
-            record = {
-                'x': x,
-                'y': y,
-                'width': obj.get('width', 0),
-                'height': obj.get('height', 0),
-                'timestamp': current_time
+
+        # Untracked detections have no identity to follow
+        batch = as_batch(tracked_objects).tracked()
+        track_ids = batch.track_id.astype(np.int64)
+        x, y = normalized_positions(batch)
+        current = np.column_stack([
+            x, y,
+            batch.data["width"].astype(np.float64),
+            batch.data["height"].astype(np.float64),
+            np.full(len(batch), current_time)
+        ])
+
+        # Each track's history so far (empty for new tracks)
+        rows = self.track_history.find(track_ids)
+        known = rows >= 0
+        history = np.zeros((len(batch), self.history_length, 5))
+        count = np.zeros(len(batch), dtype=np.int64)
+        history[known] = self.track_history["history"][rows[known]]
+        count[known] = self.track_history["count"][rows[known]]
+
+        # Calculate velocity for each continuing track
+        last = history[:, -1]
+        dt = current_time - last[:, 4]
+        moved = known & (dt > 0)
+        frame_velocities = self._calculate_velocity(last[moved, :2], current[moved, :2], dt[moved])
+
+        # Run anomaly checks
+        new_anomalies.extend(self._check_fall_detection(track_ids, current, history, count))
+        new_anomalies.extend(self._check_sudden_stop(track_ids, current, history, count))
+
+        stationary = self._check_stationary_person(track_ids, history, count, current_time)
+        if stationary:
+            # Only add if not already flagged recently
+            recently_flagged = {
+                e.track_id for e in self.anomaly_events
+                if e.event_type == "stationary_person" and current_time - e.timestamp < 30
             }
+            new_anomalies.extend(e for e in stationary if e.track_id not in recently_flagged)
 
-            history = self.track_history[track_id]
-
-            # Calculate velocity for this track
-            if history:
-                prev = history[-1]
-                dt = current_time - prev.get('timestamp', current_time - 0.1)
-                if dt > 0:
-                    velocity = self._calculate_velocity(
-                        (prev['x'], prev['y']),
-                        (x, y),
-                        dt
-                    )
-                    frame_velocities.append(velocity)
-
-            # Run anomaly checks
-            fall = self._check_fall_detection(track_id, record, history)
-            if fall:
-                new_anomalies.append(fall)
-
-            sudden_stop = self._check_sudden_stop(track_id, record, history)
-            if sudden_stop:
-                new_anomalies.append(sudden_stop)
-
-            stationary = self._check_stationary_person(track_id, history)
-            if stationary:
-                # Only add if not already flagged recently
-                recent_stationary = [e for e in self.anomaly_events
-                                     if e.track_id == track_id and e.event_type == "stationary_person"
-                                     and current_time - e.timestamp < 30]
-                if not recent_stationary:
-                    new_anomalies.append(stationary)
-
-            # Update history
-            self.track_history[track_id].append(record)
-            if len(self.track_history[track_id]) > 100:
-                self.track_history[track_id] = self.track_history[track_id][-100:]
+        # Update history
+        rows = self.track_history.upsert(track_ids)
+        self.track_history["history"][rows] = np.concatenate([history[:, 1:], current[:, None]], axis=1)
+        self.track_history["count"][rows] = np.minimum(count + 1, self.history_length)
+
+        # Forget tracks that have ended
+        self.track_history.drop(current_time - self.track_history["history"][:, -1, 4] > TRACK_HISTORY_TTL)
 
         # Update average crowd velocity
-        if frame_velocities:
-            self.average_crowd_velocity = sum(frame_velocities) / len(frame_velocities)
+        if len(frame_velocities):
+            self.average_crowd_velocity = float(frame_velocities.mean())
             self.velocity_history.append(self.average_crowd_velocity)
             if len(self.velocity_history) > 200:
                 self.velocity_history = self.velocity_history[-200:]
@@ -330,6 +406,9 @@ class AnomalyDetector:
                 if not recent_surge:
                     new_anomalies.append(surge)
 
+        if motion_grid is not None:
+            new_anomalies.extend(self._check_motion_grid(motion_grid, current_time))
+
         # Store new anomalies
         self.anomaly_events.extend(new_anomalies)
 
@@ -393,3 +472,7 @@ class AnomalyDetector:
         self.anomaly_events.clear()
         self.velocity_history.clear()
         self.average_crowd_velocity = 0.0
+        self.grid_baseline = None
+        self.grid_stopped = None
+        self.grid_last_event = None
+        self.grid_frames = 0
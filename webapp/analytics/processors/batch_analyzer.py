@@ -0,0 +1,264 @@
+"""Offline analysis of recordings, as fast as the hardware allows."""
+
+from typing import Any, Callable, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+import time
+import numpy as np
+
+from models.detector import DetectionBatch, DETECTION_DTYPE, NO_TRACK
+from processors.video_processor import VideoProcessor
+from config import BATCH_ANALYSIS_SIZE, FLOW_RATE_WINDOW_SECONDS, FLOW_RATE_MIN_SECONDS, PROCESS_FPS
+
+
+def flow_rate_per_minute(
+    times: np.ndarray,
+    crossed: np.ndarray,
+    window_seconds: float = FLOW_RATE_WINDOW_SECONDS,
+    min_seconds: float = FLOW_RATE_MIN_SECONDS
+) -> np.ndarray:
+    """Counting-line flow rate at every frame, in video time.
+
+    Same definition as CrossingCounter (crossings in the trailing window
+    divided by the window, or by the elapsed time early on, and 0 before
+    ``min_seconds``), but on the recording's clock instead of the wall
+    clock, which offline analysis runs far ahead of.
+
+    Args:
+        times: (N,) frame times in seconds, increasing
+        crossed: (N,) cumulative crossings at each frame
+        window_seconds: Trailing window
+        min_seconds: Observation span before a rate is reported
+
+    Returns:
+        (N,) crossings per minute
+    """
+    if len(times) == 0:
+        return np.zeros(0, dtype=np.float32)
+    start = np.searchsorted(times, times - window_seconds, side="left")
+    counts = crossed - crossed[start]
+    elapsed = np.minimum(window_seconds, times - times[0])
+    ready = (elapsed > 0) & (elapsed >= min(min_seconds, window_seconds))
+    rates = np.zeros(len(times), dtype=np.float32)
+    rates[ready] = counts[ready] * 60.0 / elapsed[ready]
+    return rates
+
+
+def load_batch_results(path: Path) -> Dict[str, Dict[str, np.ndarray]]:
+    """Load a saved analysis grouped into its tables.
+
+    Returns:
+        {"meta": ..., "frames": ..., "detections": ..., "tracks": ...}, each
+        a dict of column name to array
+    """
+    tables: Dict[str, Dict[str, np.ndarray]] = {}
+    with np.load(path) as data:
+        for key in data.files:
+            table, column = key.split("_", 1)
+            tables.setdefault(table, {})[column] = data[key]
+    return tables
+
+
+class BatchAnalyzer:
+    """Runs the full pipeline over a recording once, without pacing.
+
+    Frames are decoded in order on the FrameSource thread (no looping, no
+    dropping). Detection runs on chunks of ``batch_size`` frames in one
+    forward pass, on a helper thread one chunk ahead of tracking, flow
+    and metrics, which have to see the frames in order. Every processed
+    frame is detected (the motion gate and keyframe schedule are for
+    saving work live, not for archives). Results accumulate as columns
+    and are written to one compressed ``.npz``:
+
+    - ``frames_*``: per-frame number, time, counts, density, velocity,
+      direction, congestion, cumulative crossings and flow rate
+    - ``detections_*``: every detection (DETECTION_DTYPE columns) with
+      ``detections_offsets`` giving each frame's slice
+    - ``tracks_*``: one row per track ID with its first/last frame and
+      number of detections
+    - ``meta_*``: video, rates and throughput
+    """
+
+    def __init__(
+        self,
+        video_id: str,
+        video_path: Optional[Path] = None,
+        batch_size: int = BATCH_ANALYSIS_SIZE,
+        progress: Optional[Callable[[int, int], None]] = None
+    ):
+        """Initialize the analyzer.
+
+        Args:
+            video_id: Camera/video ID (selects calibration and default file)
+            video_path: Recording to analyze instead of the ID's file
+            batch_size: Frames per detector forward pass
+            progress: Called after each chunk with (frames done, frames expected)
+        """
+        self.processor = VideoProcessor(video_id)
+        if video_path is not None:
+            self.processor.video_path = Path(video_path)
+        self.video_id = video_id
+        self.batch_size = max(1, batch_size)
+        self.progress = progress
+
+        # Columns
+        self._frames: Dict[str, List[Any]] = {
+            name: [] for name in (
+                "number", "people_count", "density", "peak_density",
+                "velocity", "direction", "congestion", "crossed"
+            )
+        }
+        self._detections: List[np.ndarray] = []
+        self.elapsed_seconds = 0.0
+
+    def _read_chunk(self, limit: float) -> List[Any]:
+        """Next ``batch_size`` SourceFrames, at most ``limit`` (fewer at the end of the video)."""
+        chunk = []
+        while len(chunk) < min(self.batch_size, limit):
+            item = self.processor.frame_source.read()
+            if item is None:
+                break
+            chunk.append(item)
+        return chunk
+
+    def _detect(self, chunk: List[Any]) -> List[DetectionBatch]:
+        return self.processor.detector.detect_many([item.frame for item in chunk])
+
+    def _record(self, frame_number: int, result: Dict[str, Any]):
+        """Append one processed frame to the columns."""
+        metrics = result["metrics"]
+        columns = self._frames
+        columns["number"].append(frame_number)
+        columns["people_count"].append(len(result["detections"]))
+        columns["density"].append(metrics["density"])
+        columns["peak_density"].append(metrics["peakDensity"])
+        columns["velocity"].append(metrics["velocity"])
+        columns["direction"].append(metrics["direction"])
+        columns["congestion"].append(metrics["congestionStatus"])
+        columns["crossed"].append(self.processor.tracker.total_crossed)
+        self._detections.append(result["detections"].data)
+
+    def run(self, max_frames: Optional[int] = None) -> Dict[str, Any]:
+        """Analyze the recording from start to end.
+
+        Args:
+            max_frames: Stop after this many processed frames (None = all)
+
+        Returns:
+            Throughput summary (see ``get_summary``)
+        """
+        processor = self.processor
+        if not processor.open(offline=True):
+            raise RuntimeError(f"Failed to open video: {processor.video_path}")
+
+        expected = processor.total_frames // processor.frame_skip
+        if max_frames is not None:
+            expected = min(expected, max_frames)
+        remaining = max_frames if max_frames is not None else float("inf")
+        start = time.perf_counter()
+        try:
+            with ThreadPoolExecutor(max_workers=1, thread_name_prefix=f"batch-detect-{self.video_id}") as executor:
+                chunk = self._read_chunk(remaining)
+                pending = executor.submit(self._detect, chunk) if chunk else None
+                done = 0
+                while pending is not None:
+                    detections = pending.result()
+                    remaining -= len(chunk)
+
+                    # Detect the next chunk while this one is tracked
+                    next_chunk = self._read_chunk(remaining)
+                    pending = executor.submit(self._detect, next_chunk) if next_chunk else None
+
+                    for item, frame_detections in zip(chunk, detections):
+                        processor.frame_count = item.frame_number
+                        # Flow rate and metrics history run on the video's clock
+                        frame_time = (item.frame_number - 1) / processor.video_fps
+                        self._record(
+                            item.frame_number, processor.process_frame(item.frame, frame_detections, now=frame_time)
+                        )
+                        done += 1
+
+                    if self.progress is not None:
+                        self.progress(done, expected)
+                    chunk = next_chunk
+        finally:
+            self.elapsed_seconds = time.perf_counter() - start
+            processor.close()
+
+        return self.get_summary()
+
+    def get_summary(self) -> Dict[str, Any]:
+        """Frames processed and the throughput achieved."""
+        frames = len(self._frames["number"])
+        video_seconds = frames * self.processor.frame_skip / self.processor.video_fps
+        return {
+            "video_id": self.video_id,
+            "frames": frames,
+            "elapsed_s": round(self.elapsed_seconds, 2),
+            "fps": round(frames / self.elapsed_seconds, 2) if self.elapsed_seconds > 0 else 0.0,
+            "realtime_factor": round(video_seconds / self.elapsed_seconds, 2) if self.elapsed_seconds > 0 else 0.0
+        }
+
+    def to_columns(self) -> Dict[str, np.ndarray]:
+        """All results as flat ``table_column`` arrays."""
+        processor = self.processor
+        frames = self._frames
+        numbers = np.asarray(frames["number"], dtype=np.int64)
+        times = ((numbers - 1) / processor.video_fps).astype(np.float32)  # frame_number counts the frame itself
+        crossed = np.asarray(frames["crossed"], dtype=np.int32)
+
+        detections = np.concatenate(self._detections) if self._detections else np.zeros(0, dtype=DETECTION_DTYPE)
+        offsets = np.zeros(len(self._detections) + 1, dtype=np.int64)
+        np.cumsum([len(d) for d in self._detections], out=offsets[1:])
+
+        # One row per track: first/last frame and detections
+        tracked = detections["track_id"] != NO_TRACK
+        tracked_frames = np.repeat(numbers, np.diff(offsets))[tracked]
+        track_ids, first, inverse, counts = np.unique(
+            detections["track_id"][tracked], return_index=True, return_inverse=True, return_counts=True
+        )
+        last = np.zeros(len(track_ids), dtype=np.int64)
+        np.maximum.at(last, inverse, tracked_frames)
+
+        columns = {
+            "meta_video_id": np.array(self.video_id),
+            "meta_video_path": np.array(str(processor.video_path)),
+            "meta_video_fps": np.float32(processor.video_fps),
+            "meta_process_fps": np.float32(PROCESS_FPS),
+            "meta_frame_skip": np.int32(processor.frame_skip),
+            "meta_elapsed_s": np.float32(self.elapsed_seconds),
+            "frames_number": numbers.astype(np.int32),
+            "frames_time_s": times,
+            "frames_people_count": np.asarray(frames["people_count"], dtype=np.int32),
+            "frames_density": np.asarray(frames["density"], dtype=np.float32),
+            "frames_peak_density": np.asarray(frames["peak_density"], dtype=np.float32),
+            "frames_velocity": np.asarray(frames["velocity"], dtype=np.float32),
+            "frames_direction": np.asarray(frames["direction"], dtype=str),
+            "frames_congestion": np.asarray(frames["congestion"], dtype=str),
+            "frames_crossed": crossed,
+            "frames_flow_rate": flow_rate_per_minute(times, crossed),
+            "detections_offsets": offsets,
+            "tracks_id": track_ids.astype(np.int32),
+            "tracks_first_frame": tracked_frames[first].astype(np.int32),
+            "tracks_last_frame": last.astype(np.int32),
+            "tracks_detections": counts.astype(np.int32),
+        }
+        for name in DETECTION_DTYPE.names:
+            columns[f"detections_{name}"] = np.ascontiguousarray(detections[name])
+        return columns
+
+    def save(self, path: Path) -> Path:
+        """Write the results to a compressed ``.npz`` file.
+
+        Args:
+            path: Output file (".npz" is appended if missing)
+
+        Returns:
+            Path written
+        """
+        path = Path(path)
+        if path.suffix != ".npz":
+            path = path.with_name(path.name + ".npz")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        np.savez_compressed(path, **self.to_columns())
+        return path
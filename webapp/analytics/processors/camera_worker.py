@@ -0,0 +1,501 @@
+"""Camera pipelines in supervised worker processes.
+
+Each camera's decode, detection, tracking and flow run in a process of
+its own, so cameras scale across cores instead of sharing one
+interpreter. Processed frames and detection arrays come back through
+shared-memory rings (never pickled); only small per-frame metadata
+travels over a queue, and full frames are only copied out while a
+client streams them (otherwise every WORKER_FRAME_INTERVAL). The API process keeps a ``RemoteProcessor``
+mirror with the state its endpoints read.
+"""
+
+from typing import Any, Dict, List, Optional, Tuple
+import multiprocessing as mp
+import os
+import pickle
+import queue
+import time
+import cv2
+import numpy as np
+
+try:
+    import torch
+    TORCH_AVAILABLE = True
+except ImportError:
+    TORCH_AVAILABLE = False
+
+from models.detector import DetectionBatch, DETECTION_DTYPE
+from models.tracker import CrossingCounter
+from models.velocity import compact_motion_grid
+from processors.metrics import MetricsAggregator
+from processors.video_processor import VideoProcessor
+from processors.shm_ring import SharedArrayRing
+from config import (
+    DEFAULT_ZONE_AREA_SQM, WORKER_RING_SLOTS, WORKER_MAX_DETECTIONS, WORKER_THREADS,
+    WORKER_RESTART_DELAY, WORKER_MAX_RESTARTS, WORKER_STATUS_INTERVAL, WORKER_FRAME_INTERVAL,
+    get_video_path, get_zone_calibration
+)
+
+# Settings a client can change on a running pipeline, applied inside the worker
+WORKER_COMMANDS = {
+    "set_counting_line": lambda processor, value: processor.tracker.set_counting_line(value),
+    "set_zone_area": lambda processor, value: processor.metrics_aggregator.set_zone_area(value),
+}
+
+# Settings of the worker loop itself, with their defaults
+WORKER_OPTIONS = {
+    "stream_frames": False,  # Copy every processed frame to the frame ring
+}
+
+
+def run_camera_worker(
+    video_id: str,
+    frame_ring_name: str,
+    detection_ring_name: str,
+    frame_shape: Tuple[int, int, int],
+    first_seq: int,
+    messages: mp.Queue,
+    commands: mp.Queue,
+    stop: mp.Event
+):
+    """Worker process entry point: run one camera's pipeline until stopped.
+
+    Messages sent to the API process are ``(kind, payload)`` tuples:
+    ``("frame", metadata)`` after each frame's detections (and, when
+    streaming or due, the frame itself) are written to the rings,
+    ``("status", processor status)`` every WORKER_STATUS_INTERVAL seconds,
+    ``("error", text)`` if the video cannot be opened and ``("end", None)``
+    when a non-looping source runs out.
+
+    Args:
+        video_id: ID of the camera/video
+        frame_ring_name: Shared memory block of the frame ring
+        detection_ring_name: Shared memory block of the detection ring
+        frame_shape: (height, width, 3) of a ring frame slot
+        first_seq: Sequence number of the first frame (continues across restarts)
+        messages: Queue to the API process
+        commands: Queue of ``(command, value)`` from the API process
+        stop: Set by the API process to end the worker (the worker also
+            exits when the API process dies)
+    """
+    cv2.setNumThreads(WORKER_THREADS)
+    if TORCH_AVAILABLE:
+        torch.set_num_threads(WORKER_THREADS)
+
+    frame_ring = SharedArrayRing(frame_ring_name, frame_shape, np.uint8, WORKER_RING_SLOTS)
+    detection_ring = SharedArrayRing(detection_ring_name, (WORKER_MAX_DETECTIONS,), DETECTION_DTYPE, WORKER_RING_SLOTS)
+    processor = VideoProcessor(video_id)
+    try:
+        if not processor.open():
+            messages.put(("error", f"Failed to open video: {video_id}"))
+            return
+
+        processor.is_processing = True
+        processor.frame_count = 0
+        seq = first_seq
+        last_status = 0.0
+        last_frame_written = 0.0
+        options = dict(WORKER_OPTIONS)
+        parent = mp.parent_process()
+        while not stop.is_set() and parent.is_alive():
+            while True:
+                try:
+                    command, value = commands.get_nowait()
+                except queue.Empty:
+                    break
+                if command in WORKER_OPTIONS:
+                    options[command] = value
+                else:
+                    WORKER_COMMANDS[command](processor, value)
+
+            cycle_start = time.monotonic()
+            frame = processor.read_frame()
+            if frame is None:
+                messages.put(("end", None))
+                break
+
+            result = processor.process_frame(frame)
+            processor.record_latency(result)
+            detections = result.pop("detections")
+            del result["motion_grid"]  # Sent once as arrays, compacted by the API process
+
+            now = time.monotonic()
+            frame_written = options["stream_frames"] or now - last_frame_written >= WORKER_FRAME_INTERVAL
+            if frame_written:
+                if frame.shape != frame_shape:
+                    frame = cv2.resize(frame, (frame_shape[1], frame_shape[0]))
+                frame_ring.write(seq, frame)
+                last_frame_written = now
+            detection_ring.write(seq, detections.data[:WORKER_MAX_DETECTIONS])
+
+            velocity_history = processor.velocity_estimator.velocity_history
+            messages.put(("frame", {
+                "seq": seq,
+                "result": result,
+                "frame_written": frame_written,
+                "captured_at": processor.captured_at,
+                "detection_count": min(len(detections), WORKER_MAX_DETECTIONS),
+                "motion_grid": processor.velocity_estimator.motion_grid,
+                "velocity": velocity_history[-1] if velocity_history else 0.0,
+                "total_crossed": processor.tracker.total_crossed,
+                "active_tracks": processor.tracker.active_track_count,
+            }))
+            seq += 1
+
+            now = time.monotonic()
+            if now - last_status >= WORKER_STATUS_INTERVAL:
+                messages.put(("status", processor.get_status()))
+                last_status = now
+
+            # Control processing rate
+            stop.wait(processor.frame_delay(cycle_start))
+    finally:
+        processor.close()
+        frame_ring.close()
+        detection_ring.close()
+
+
+def probe_frame_shape(video_id: str) -> Tuple[int, int, int]:
+    """(height, width, 3) of a video, read from its header without decoding."""
+    cap = cv2.VideoCapture(str(get_video_path(video_id)))
+    try:
+        if not cap.isOpened():
+            raise RuntimeError(f"Failed to open video: {video_id}")
+        width = int(cap.get(cv2.CAP_PROP_FRAME_WIDTH))
+        height = int(cap.get(cv2.CAP_PROP_FRAME_HEIGHT))
+    finally:
+        cap.release()
+    if width <= 0 or height <= 0:
+        raise RuntimeError(f"Unknown frame size for video: {video_id}")
+    return height, width, 3
+
+
+class CameraWorker:
+    """Supervisor of one camera's worker process and owner of its rings.
+
+    The rings are allocated here and outlive the process, so a crashed
+    worker is replaced by a fresh one that attaches to the same rings and
+    continues the frame sequence. Restarts back off exponentially and
+    stop after WORKER_MAX_RESTARTS consecutive crashes; a frame from the
+    new worker resets the count. Settings sent with ``send`` are replayed
+    into every restarted worker.
+    """
+
+    def __init__(self, video_id: str):
+        """Initialize the supervisor (nothing is started yet).
+
+        Args:
+            video_id: ID of the camera/video
+        """
+        self.video_id = video_id
+        self.context = mp.get_context("spawn")  # Never fork a process holding model and loop threads
+        self.process: Optional[mp.Process] = None
+        self.messages: Optional[mp.Queue] = None
+        self.commands: Optional[mp.Queue] = None
+        self.stop_event = self.context.Event()  # Replaced after a crash: a worker killed mid-wait poisons it
+
+        self.frame_ring: Optional[SharedArrayRing] = None
+        self.detection_ring: Optional[SharedArrayRing] = None
+        self.settings: Dict[str, Any] = {}
+
+        # Counters
+        self.next_seq = 0
+        self.restarts = 0
+        self.consecutive_crashes = 0
+        self.lost_frames = 0
+        self.last_exitcode: Optional[int] = None
+        self.restart_at = 0.0
+        self.failed = False
+
+    def start(self):
+        """Allocate the rings and launch the first worker."""
+        frame_shape = probe_frame_shape(self.video_id)
+        prefix = f"crowd-{os.getpid()}-{id(self):x}"
+        self.frame_ring = SharedArrayRing(
+            f"{prefix}-frames", frame_shape, np.uint8, WORKER_RING_SLOTS, create=True
+        )
+        self.detection_ring = SharedArrayRing(
+            f"{prefix}-detections", (WORKER_MAX_DETECTIONS,), DETECTION_DTYPE, WORKER_RING_SLOTS, create=True
+        )
+        self._spawn()
+
+    def _spawn(self):
+        """Launch a worker with fresh queues (a crash can leave a queue unusable)."""
+        self.messages = self.context.Queue()
+        self.commands = self.context.Queue()
+        for command, value in self.settings.items():
+            self.commands.put((command, value))
+
+        self.process = self.context.Process(
+            target=run_camera_worker,
+            args=(
+                self.video_id,
+                self.frame_ring.name,
+                self.detection_ring.name,
+                self.frame_ring.slot_shape,
+                self.next_seq,
+                self.messages,
+                self.commands,
+                self.stop_event
+            ),
+            name=f"camera-{self.video_id}",
+            daemon=True
+        )
+        self.process.start()
+
+    def _schedule_restart(self):
+        """Retire a dead worker and pick when to replace it, or give up."""
+        self.last_exitcode = self.process.exitcode
+        self.process = None
+        self.stop_event = self.context.Event()
+        self.consecutive_crashes += 1
+        if self.consecutive_crashes > WORKER_MAX_RESTARTS:
+            self.failed = True
+            return
+        self.restart_at = time.monotonic() + WORKER_RESTART_DELAY * 2 ** (self.consecutive_crashes - 1)
+
+    def receive(self, timeout: float = 0.5) -> Optional[Tuple[str, Any]]:
+        """Wait for the next message, restarting the worker if it died.
+
+        Args:
+            timeout: Seconds to wait
+
+        Returns:
+            ``(kind, payload)``, or None if nothing arrived (check ``failed``)
+        """
+        if self.failed:
+            return None
+        if self.process is None:
+            # Backing off before a restart
+            if time.monotonic() < self.restart_at:
+                self.stop_event.wait(min(timeout, self.restart_at - time.monotonic()))
+                return None
+            self.restarts += 1
+            self._spawn()
+
+        try:
+            message = self.messages.get(timeout=timeout)
+        except queue.Empty:
+            message = None
+        except (EOFError, OSError, pickle.UnpicklingError):
+            message = None  # Torn write from a worker killed mid-message
+
+        if message is not None:
+            if message[0] == "frame":
+                self.consecutive_crashes = 0
+                self.next_seq = message[1]["seq"] + 1
+            return message
+
+        if not self.process.is_alive() and not self.stop_event.is_set():
+            self._schedule_restart()
+        return None
+
+    def send(self, command: str, value: Any):
+        """Change a setting in the running worker and any restarted one."""
+        if command not in WORKER_COMMANDS and command not in WORKER_OPTIONS:
+            raise ValueError(
+                f"Unknown worker command '{command}'. Available: {list(WORKER_COMMANDS) + list(WORKER_OPTIONS)}"
+            )
+        self.settings[command] = value
+        if self.commands is not None:
+            self.commands.put((command, value))
+
+    def read_frame(self, seq: int) -> Optional[np.ndarray]:
+        """Copy a processed frame out of the ring, or None if overwritten."""
+        return self.frame_ring.read(seq) if self.frame_ring is not None else None
+
+    def read_detections(self, seq: int, count: int) -> Optional[DetectionBatch]:
+        """Copy a frame's detections out of the ring, or None if overwritten."""
+        data = self.detection_ring.read(seq, count)
+        if data is None:
+            self.lost_frames += 1
+            return None
+        return DetectionBatch(data)
+
+    def stop(self, timeout: float = 5.0):
+        """Stop the worker and free the rings."""
+        self.stop_event.set()
+        if self.process is not None:
+            self.process.join(timeout)
+            if self.process.is_alive():
+                self.process.terminate()
+                self.process.join(timeout)
+        for ring in (self.frame_ring, self.detection_ring):
+            if ring is not None:
+                ring.close()
+                ring.unlink()
+        self.frame_ring = None
+        self.detection_ring = None
+
+    def get_status(self) -> Dict[str, Any]:
+        """Process and supervision counters."""
+        process = self.process
+        return {
+            "pid": process.pid if process is not None else None,
+            "alive": process is not None and process.is_alive(),
+            "restarts": self.restarts,
+            "last_exitcode": self.last_exitcode,
+            "failed": self.failed,
+            "lost_frames": self.lost_frames,
+        }
+
+
+class RemoteTracker:
+    """API-side view of a worker's tracker: crossing counts and settings."""
+
+    def __init__(self, worker: CameraWorker):
+        self.worker = worker
+        self.crossings = CrossingCounter()
+        self.active_track_count = 0
+        self._worker_total = 0  # Last total reported by the worker process
+
+    def observe(self, total_crossed: int, active_tracks: int):
+        """Mirror the worker's running crossing total and track count."""
+        if total_crossed < self._worker_total:
+            # A restarted worker counts from zero; the windowed counter keeps running
+            self._worker_total = 0
+        if total_crossed > self._worker_total:
+            self.crossings.add(total_crossed - self._worker_total)
+        self._worker_total = total_crossed
+        self.active_track_count = active_tracks
+
+    @property
+    def total_crossed(self) -> int:
+        """Crossings since the camera session started."""
+        return self.crossings.total
+
+    def get_flow_rate(self, time_window_seconds: float) -> float:
+        """Crossings per minute over the last time window."""
+        return self.crossings.rate_per_minute(time_window_seconds)
+
+    def set_counting_line(self, y_percentage: float):
+        """Move the worker's counting line (0-100)."""
+        self.worker.send("set_counting_line", y_percentage)
+
+
+class RemoteMetricsAggregator(MetricsAggregator):
+    """Trend history mirrored from a worker; zone changes are forwarded to it."""
+
+    def __init__(self, worker: CameraWorker, zone_area_sqm: float):
+        super().__init__(zone_area_sqm)
+        self.worker = worker
+
+    def observe(self, metrics: Dict[str, Any]):
+        """Record one frame of the worker's metrics."""
+        self.people_count = metrics["peopleCount"]
+        self.velocity = metrics["velocity"]
+        self.flow_rate = metrics["flowRate"]
+        self.peak_density = metrics["peakDensity"]
+        self.record_history(self.people_count, self.velocity, metrics["density"], time.time())
+
+    def set_zone_area(self, area_sqm: float):
+        super().set_zone_area(area_sqm)
+        self.worker.send("set_zone_area", area_sqm)
+
+
+class RemoteVelocity:
+    """API-side view of a worker's velocity estimator."""
+
+    def __init__(self, max_history: int = 10):
+        self.velocity_history: List[float] = []
+        self.max_history = max_history
+        self.motion_grid: Dict[str, np.ndarray] = {}
+
+    def observe(self, velocity: float, motion_grid: Dict[str, np.ndarray]):
+        self.velocity_history.append(velocity)
+        del self.velocity_history[:-self.max_history]
+        self.motion_grid = motion_grid
+
+
+class RemoteProcessor:
+    """Stand-in for a VideoProcessor running in a camera worker.
+
+    Exposes the attributes the REST and WebSocket handlers read from a
+    processor, rebuilt from each frame's metadata and ring slots.
+    """
+
+    def __init__(self, video_id: str, worker: CameraWorker):
+        """Initialize the mirror.
+
+        Args:
+            video_id: ID of the camera/video
+            worker: Supervisor of the camera's worker process
+        """
+        self.video_id = video_id
+        self.worker = worker
+        calibration = get_zone_calibration(video_id)
+        self.tracker = RemoteTracker(worker)
+        self.metrics_aggregator = RemoteMetricsAggregator(
+            worker, calibration.get("area_sqm", DEFAULT_ZONE_AREA_SQM)
+        )
+        self.velocity_estimator = RemoteVelocity()
+
+        self.is_processing = False
+        self.frame_count = 0
+        self.last_seq: Optional[int] = None
+        self.last_frame_seq: Optional[int] = None  # Latest frame copied to the ring
+        self.captured_at: Optional[float] = None
+        self.last_detections: DetectionBatch = DetectionBatch()
+        self.last_metrics: Dict[str, Any] = {}
+        self.worker_status: Dict[str, Any] = {}
+
+    @property
+    def last_frame(self) -> Optional[np.ndarray]:
+        """The latest frame in the ring, copied out on demand.
+
+        Unless ``stream_frames`` is on this may be up to
+        WORKER_FRAME_INTERVAL behind the latest result.
+        """
+        return self.worker.read_frame(self.last_frame_seq) if self.last_frame_seq is not None else None
+
+    def stream_frames(self, enabled: bool):
+        """Have the worker copy every processed frame, for clients that show video."""
+        self.worker.send("stream_frames", enabled)
+
+    def observe(self, payload: Dict[str, Any]) -> Optional[Dict[str, Any]]:
+        """Rebuild a frame result from a worker's ``frame`` message.
+
+        Args:
+            payload: Metadata sent by ``run_camera_worker``
+
+        Returns:
+            Result in the shape of ``VideoProcessor.process_frame``, or None
+            if the ring slot was overwritten before it could be read
+        """
+        detections = self.worker.read_detections(payload["seq"], payload["detection_count"])
+        if detections is None:
+            return None
+
+        result = payload["result"]
+        result["detections"] = detections
+        result["motion_grid"] = compact_motion_grid(payload["motion_grid"])
+        self.last_seq = payload["seq"]
+        if payload["frame_written"]:
+            self.last_frame_seq = payload["seq"]
+        self.captured_at = payload["captured_at"]
+        self.frame_count = result["frame_number"]
+        self.last_detections = detections
+        self.last_metrics = result["metrics"]
+        self.tracker.observe(payload["total_crossed"], payload["active_tracks"])
+        self.metrics_aggregator.observe(result["metrics"])
+        self.velocity_estimator.observe(payload["velocity"], payload["motion_grid"])
+        return result
+
+    def record_latency(self, result: Dict[str, Any]):
+        """Restamp a result with its latency up to publishing in the API process.
+
+        The worker's stamp (and its live-mode control) stops at the
+        hand-off; CLOCK_MONOTONIC is shared by all processes on the host.
+        """
+        if self.captured_at is not None:
+            result["latency_ms"] = round((time.monotonic() - self.captured_at) * 1000, 1)
+
+    def get_status(self) -> Dict[str, Any]:
+        """The worker's latest processor status plus supervision counters."""
+        return {
+            **self.worker_status,
+            "video_id": self.video_id,
+            "is_processing": self.is_processing,
+            "frame_count": self.frame_count,
+            "worker": self.worker.get_status()
+        }
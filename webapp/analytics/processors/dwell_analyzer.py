@@ -2,10 +2,12 @@
 
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
-from collections import defaultdict
 import time
 import numpy as np
 
+from models.detector import TrackedObjects, as_batch, format_track_id, normalized_positions, points_in_polygon
+from models.track_store import TrackTable
+
 
 @dataclass
 class DwellZone:
@@ -41,9 +43,8 @@ class DwellTimeAnalyzer:
 
     def __init__(self):
         self.zones: Dict[str, DwellZone] = {}
-        self.active_dwells: Dict[str, Dict[str, DwellRecord]] = defaultdict(dict)  # zone_id -> {track_id: record}
+        self.active_dwells: Dict[str, TrackTable] = {}  # zone_id -> entry time per track inside
         self.completed_dwells: List[DwellRecord] = []
-        self.track_positions: Dict[str, Tuple[float, float]] = {}
 
         # Initialize default temple zones
         self._init_default_zones()
@@ -77,7 +78,7 @@ class DwellTimeAnalyzer:
     def add_zone(self, zone: DwellZone):
         """Add a dwell time zone."""
         self.zones[zone.zone_id] = zone
-        self.active_dwells[zone.zone_id] = {}
+        self.active_dwells[zone.zone_id] = TrackTable(entry_time=(np.float64, ()))
 
     def remove_zone(self, zone_id: str):
         """Remove a zone."""
@@ -86,106 +87,45 @@ class DwellTimeAnalyzer:
             if zone_id in self.active_dwells:
                 del self.active_dwells[zone_id]
 
-    def _point_in_polygon(self, x: float, y: float, polygon: List[Tuple[float, float]]) -> bool:
-        """Check if point is inside polygon using ray casting."""
-        n = len(polygon)
-        inside = False
-
-        j = n - 1
-        for i in range(n):
-            xi, yi = polygon[i]
-            xj, yj = polygon[j]
-
-            if ((yi > y) != (yj > y)) and (x < (xj - xi) * (y - yi) / (yj - yi) + xi):
-                inside = not inside
-            j = i
-
-        return inside
-
-    def _get_zones_for_point(self, x: float, y: float) -> List[str]:
-        """Get all zones that contain the given point."""
-        zones = []
-        for zone_id, zone in self.zones.items():
-            if self._point_in_polygon(x, y, zone.polygon):
-                zones.append(zone_id)
-        return zones
-
-    def update(self, tracked_objects: List[Dict]) -> Dict:
+    def update(self, tracked_objects: TrackedObjects) -> Dict:
         """
         Update dwell time tracking with new positions.
 
         Args:
-            tracked_objects: List of tracked objects with 'id', 'x', 'y' fields
+            tracked_objects: DetectionBatch, or list of dicts with 'id', 'x', 'y' fields
 
         Returns:
             Dict with dwell time analysis results
         """
         current_time = time.time()
-        current_track_ids = set()
-        zone_updates = defaultdict(list)
-
-        for obj in tracked_objects:
-            track_id = obj.get('id', str(obj.get('track_id', '')))
-            x = obj.get('x', 0)
-            y = obj.get('y', 0)
-
-            # Normalize coordinates
-            if x > 1 or y > 1:
-                x = x / 100.0
-                y = y / 100.0
-
-            current_track_ids.add(track_id)
-            self.track_positions[track_id] = (x, y)
-
-            # Check which zones this track is in
-            current_zones = set(self._get_zones_for_point(x, y))
-
-            # For each zone, update dwell records
-            for zone_id in self.zones:
-                is_in_zone = zone_id in current_zones
-                has_active_dwell = track_id in self.active_dwells[zone_id]
-
-                if is_in_zone and not has_active_dwell:
-                    # Person entered zone
-                    record = DwellRecord(
-                        track_id=track_id,
+
+        # Untracked detections have no identity to follow
+        batch = as_batch(tracked_objects).tracked()
+        track_ids = batch.track_id.astype(np.int64)
+        points = np.stack(normalized_positions(batch), axis=1)
+
+        for zone_id, zone in self.zones.items():
+            active = self.active_dwells[zone_id]
+            inside_ids = np.unique(track_ids[points_in_polygon(points, np.asarray(zone.polygon, dtype=np.float64))])
+
+            # Tracks that left the zone or disappeared are considered exited
+            exited = ~np.isin(active.ids, inside_ids)
+            if exited.any():
+                for track_id, entry_time in zip(active.ids[exited].tolist(), active["entry_time"][exited].tolist()):
+                    self.completed_dwells.append(DwellRecord(
+                        track_id=format_track_id(track_id),
                         zone_id=zone_id,
-                        entry_time=current_time
-                    )
-                    self.active_dwells[zone_id][track_id] = record
-                    zone_updates[zone_id].append({
-                        "event": "entry",
-                        "track_id": track_id
-                    })
-
-                elif not is_in_zone and has_active_dwell:
-                    # Person exited zone
-                    record = self.active_dwells[zone_id][track_id]
-                    record.exit_time = current_time
-                    record.dwell_seconds = current_time - record.entry_time
-                    record.is_active = False
-                    self.completed_dwells.append(record)
-                    del self.active_dwells[zone_id][track_id]
-                    zone_updates[zone_id].append({
-                        "event": "exit",
-                        "track_id": track_id,
-                        "dwell_seconds": round(record.dwell_seconds, 1)
-                    })
-
-        # Handle tracks that disappeared (consider them as exited)
-        for zone_id in self.zones:
-            tracks_to_remove = []
-            for track_id, record in self.active_dwells[zone_id].items():
-                if track_id not in current_track_ids:
-                    # Track disappeared, mark as exited
-                    record.exit_time = current_time
-                    record.dwell_seconds = current_time - record.entry_time
-                    record.is_active = False
-                    self.completed_dwells.append(record)
-                    tracks_to_remove.append(track_id)
-
-            for track_id in tracks_to_remove:
-                del self.active_dwells[zone_id][track_id]
+                        entry_time=entry_time,
+                        exit_time=current_time,
+                        dwell_seconds=current_time - entry_time,
+                        is_active=False
+                    ))
+                active.drop(exited)
+
+            # Tracks that entered the zone
+            entered = inside_ids[active.find(inside_ids) < 0]
+            rows = active.upsert(entered)
+            active["entry_time"][rows] = current_time
 
         # Keep only recent completed dwells (last 1000)
         if len(self.completed_dwells) > 1000:
@@ -199,24 +139,26 @@ class DwellTimeAnalyzer:
         zone_stats = {}
 
         for zone_id, zone in self.zones.items():
-            active_records = self.active_dwells[zone_id]
+            active = self.active_dwells[zone_id]
             completed_zone = [r for r in self.completed_dwells if r.zone_id == zone_id]
 
             # Current occupancy
-            occupancy = len(active_records)
+            occupancy = len(active)
 
             # Active dwell times
-            active_dwell_times = []
-            anomalous_dwells = []
-            for record in active_records.values():
-                dwell = current_time - record.entry_time
-                active_dwell_times.append(dwell)
-                if dwell > zone.expected_dwell_seconds * 2:
-                    anomalous_dwells.append({
-                        "track_id": record.track_id,
-                        "dwell_seconds": round(dwell, 1),
-                        "expected_seconds": zone.expected_dwell_seconds
-                    })
+            active_dwell_times = current_time - active["entry_time"]
+            anomalous = np.flatnonzero(active_dwell_times > zone.expected_dwell_seconds * 2)
+            anomalous = anomalous[np.argsort(active["entry_time"][anomalous], kind="stable")]  # Longest first
+            anomalous_dwells = [
+                {
+                    "track_id": format_track_id(track_id),
+                    "dwell_seconds": round(dwell, 1),
+                    "expected_seconds": zone.expected_dwell_seconds
+                }
+                for track_id, dwell in zip(
+                    active.ids[anomalous[:5]].tolist(), active_dwell_times[anomalous[:5]].tolist()
+                )
+            ]
 
             # Calculate averages from completed dwells
             if completed_zone:
@@ -224,10 +166,12 @@ class DwellTimeAnalyzer:
                 avg_dwell = sum(r.dwell_seconds for r in recent_completed) / len(recent_completed)
                 min_dwell = min(r.dwell_seconds for r in recent_completed)
                 max_dwell = max(r.dwell_seconds for r in recent_completed)
+            elif occupancy:
+                avg_dwell = float(active_dwell_times.mean())
+                min_dwell = float(active_dwell_times.min())
+                max_dwell = float(active_dwell_times.max())
             else:
-                avg_dwell = sum(active_dwell_times) / len(active_dwell_times) if active_dwell_times else 0
-                min_dwell = min(active_dwell_times) if active_dwell_times else 0
-                max_dwell = max(active_dwell_times) if active_dwell_times else 0
+                avg_dwell = min_dwell = max_dwell = 0
 
             zone_stats[zone_id] = {
                 "zone_name": zone.name,
@@ -236,8 +180,8 @@ class DwellTimeAnalyzer:
                 "min_dwell_seconds": round(min_dwell, 1),
                 "max_dwell_seconds": round(max_dwell, 1),
                 "expected_dwell_seconds": zone.expected_dwell_seconds,
-                "anomalous_count": len(anomalous_dwells),
-                "anomalous_dwells": anomalous_dwells[:5],  # Top 5 anomalies
+                "anomalous_count": len(anomalous),
+                "anomalous_dwells": anomalous_dwells,  # Top 5 anomalies
                 "total_completed": len(completed_zone)
             }
 
@@ -256,28 +200,29 @@ class DwellTimeAnalyzer:
         current_time = time.time()
         cutoff_time = current_time - window_seconds
 
+        completed_zone = [r for r in self.completed_dwells if r.zone_id == zone_id]
+        entries = np.array([r.entry_time for r in completed_zone], dtype=np.float64)
+        exits = np.array(
+            [np.inf if r.exit_time is None else r.exit_time for r in completed_zone], dtype=np.float64
+        )
+        active_entries = self.active_dwells[zone_id]["entry_time"]
+
         # Sample at 10-second intervals
         samples = []
         sample_interval = 10.0
         t = cutoff_time
 
         while t <= current_time:
-            # Count how many dwells were active at time t
-            count = 0
-            for record in self.completed_dwells:
-                if record.zone_id == zone_id:
-                    if record.entry_time <= t and (record.exit_time is None or record.exit_time >= t):
-                        count += 1
-
-            # Also count currently active
-            for record in self.active_dwells[zone_id].values():
-                if record.entry_time <= t:
-                    count += 1
+            # Dwells active at time t, completed and current
+            count = (
+                np.count_nonzero((entries <= t) & (exits >= t)) +
+                np.count_nonzero(active_entries <= t)
+            )
 
             samples.append({
                 "timestamp": t,
                 "relative_seconds": round(t - cutoff_time, 0),
-                "occupancy": count
+                "occupancy": int(count)
             })
             t += sample_interval
 
@@ -289,19 +234,20 @@ class DwellTimeAnalyzer:
         anomalies = []
 
         for zone_id, zone in self.zones.items():
-            for record in self.active_dwells[zone_id].values():
-                dwell = current_time - record.entry_time
-                if dwell > zone.expected_dwell_seconds * 1.5:
-                    severity = "moderate" if dwell < zone.expected_dwell_seconds * 2 else "high"
-                    anomalies.append({
-                        "track_id": record.track_id,
-                        "zone_id": zone_id,
-                        "zone_name": zone.name,
-                        "dwell_seconds": round(dwell, 1),
-                        "expected_seconds": zone.expected_dwell_seconds,
-                        "excess_ratio": round(dwell / zone.expected_dwell_seconds, 2),
-                        "severity": severity
-                    })
+            active = self.active_dwells[zone_id]
+            dwells = current_time - active["entry_time"]
+            flagged = dwells > zone.expected_dwell_seconds * 1.5
+            for track_id, dwell in zip(active.ids[flagged].tolist(), dwells[flagged].tolist()):
+                severity = "moderate" if dwell < zone.expected_dwell_seconds * 2 else "high"
+                anomalies.append({
+                    "track_id": format_track_id(track_id),
+                    "zone_id": zone_id,
+                    "zone_name": zone.name,
+                    "dwell_seconds": round(dwell, 1),
+                    "expected_seconds": zone.expected_dwell_seconds,
+                    "excess_ratio": round(dwell / zone.expected_dwell_seconds, 2),
+                    "severity": severity
+                })
 
         return sorted(anomalies, key=lambda x: x["excess_ratio"], reverse=True)
 
@@ -315,4 +261,3 @@ class DwellTimeAnalyzer:
             for z in self.zones:
                 self.active_dwells[z].clear()
             self.completed_dwells.clear()
-            self.track_positions.clear()
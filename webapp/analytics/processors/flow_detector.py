@@ -2,19 +2,23 @@
 
 from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass
-from collections import defaultdict
 import numpy as np
 import time
 import math
 
+from models.detector import TrackedObjects, as_batch, format_track_id, normalized_positions
+from models.track_store import TrackTable
+from config import TRACK_HISTORY_TTL
+
 
 @dataclass
 class FlowVector:
     """Represents a movement flow vector."""
     x: float
     y: float
-    magnitude: float
+    magnitude: float  # Mean track displacement per update, in frame fractions
     angle: float  # In degrees, 0 = right, 90 = down
+    speed_mps: Optional[float] = None  # Ground speed from the motion grid, when available
 
 
 @dataclass
@@ -45,8 +49,9 @@ class FlowAnalyzer:
             angle_threshold: Minimum angle deviation (degrees) to consider counter-flow
         """
         self.angle_threshold = angle_threshold
-        self.track_positions: Dict[str, List[Tuple[float, float, float]]] = defaultdict(list)
-        self.flow_history: List[FlowVector] = []
+        # Last normalized position and time seen per track
+        self.tracks = TrackTable(position=(np.float64, (2,)), last_seen=(np.float64, ()))
+        self.flow_history = np.empty((0, 3))  # Recent movement vectors as rows of (unit x, unit y, magnitude)
         self.counter_flow_events: List[CounterFlowEvent] = []
         self.dominant_flow: Optional[FlowVector] = None
 
@@ -54,29 +59,38 @@ class FlowAnalyzer:
         self.direction_heatmap: Optional[np.ndarray] = None
         self.heatmap_size = (50, 50)  # Grid resolution
 
+        # Motion grid thresholds for counter-flow cells
+        self.grid_min_motion = 0.05  # Fraction of the cell that must be moving
+        self.grid_min_speed = 0.2  # m/s
+
     def _calculate_angle(self, dx: float, dy: float) -> float:
         """Calculate angle in degrees from movement vector."""
         angle = math.degrees(math.atan2(dy, dx))
         return angle % 360
 
-    def _angle_difference(self, angle1: float, angle2: float) -> float:
-        """Calculate the smallest difference between two angles."""
-        diff = abs(angle1 - angle2)
-        return min(diff, 360 - diff)
+    def _angle_difference(self, angle1: np.ndarray, angle2: float) -> np.ndarray:
+        """Calculate the smallest difference between angles (elementwise)."""
+        diff = np.abs(angle1 - angle2)
+        return np.minimum(diff, 360 - diff)
+
+    def _calculate_dominant_flow(self, recent_vectors: np.ndarray) -> Optional[FlowVector]:
+        """Calculate the dominant flow direction from recent movement vectors.
 
-    def _calculate_dominant_flow(self, recent_vectors: List[FlowVector]) -> Optional[FlowVector]:
-        """Calculate the dominant flow direction from recent movement vectors."""
-        if not recent_vectors:
+        Args:
+            recent_vectors: (N, 3) rows of (unit x, unit y, magnitude)
+        """
+        if len(recent_vectors) == 0:
             return None
 
         # Weight by magnitude (faster movements have more influence)
-        total_weight = sum(v.magnitude for v in recent_vectors)
+        weights = recent_vectors[:, 2]
+        total_weight = float(weights.sum())
         if total_weight == 0:
             return None
 
         # Convert to x, y components and average
-        avg_x = sum(v.x * v.magnitude for v in recent_vectors) / total_weight
-        avg_y = sum(v.y * v.magnitude for v in recent_vectors) / total_weight
+        avg_x = float(recent_vectors[:, 0] @ weights) / total_weight
+        avg_y = float(recent_vectors[:, 1] @ weights) / total_weight
 
         magnitude = math.sqrt(avg_x ** 2 + avg_y ** 2)
         if magnitude > 0:
@@ -89,94 +103,139 @@ class FlowAnalyzer:
             )
         return None
 
-    def update(self, tracked_objects: List[Dict]) -> Dict:
+    def _grid_dominant_flow(self, motion_grid: Dict[str, np.ndarray]) -> Optional[FlowVector]:
+        """Dominant flow direction and speed from a VelocityEstimator motion grid.
+
+        Each cell's direction is weighted by its mean speed times its
+        motion fraction. ``speed_mps`` is the mean moving speed scaled by
+        how well the cells agree (1 when all point the same way); the
+        magnitude is left at 0 for ``update`` to fill in from the tracks,
+        so it keeps its frame-fraction units.
+        """
+        weight = motion_grid["speed"] * motion_grid["motion"]
+        total_weight = float(weight.sum())
+        if total_weight <= 0:
+            return None
+
+        radians = np.radians(motion_grid["direction"])
+        avg_x = float((np.cos(radians) * weight).sum()) / total_weight
+        avg_y = float((np.sin(radians) * weight).sum()) / total_weight
+        magnitude = math.sqrt(avg_x ** 2 + avg_y ** 2)
+        if magnitude > 0:
+            return FlowVector(
+                x=avg_x / magnitude,
+                y=avg_y / magnitude,
+                magnitude=0.0,
+                angle=self._calculate_angle(avg_x, avg_y),
+                speed_mps=total_weight / max(float(motion_grid["motion"].sum()), 1e-6) * magnitude
+            )
+        return None
+
+    def _grid_counter_flow_cells(self, motion_grid: Dict[str, np.ndarray]) -> List[int]:
+        """Flat indices of moving grid cells heading against the dominant flow."""
+        if self.dominant_flow is None:
+            return []
+        moving = (motion_grid["motion"] > self.grid_min_motion) & (motion_grid["speed"] > self.grid_min_speed)
+        diff = np.abs(motion_grid["direction"] - self.dominant_flow.angle) % 360
+        deviation = np.minimum(diff, 360 - diff)
+        return np.flatnonzero(moving & (deviation > self.angle_threshold)).tolist()
+
+    def update(
+        self,
+        tracked_objects: TrackedObjects,
+        motion_grid: Optional[Dict[str, np.ndarray]] = None
+    ) -> Dict:
         """
         Update flow analysis with new tracked positions.
 
         Args:
-            tracked_objects: List of tracked objects with 'id', 'x', 'y' fields
+            tracked_objects: DetectionBatch, or list of dicts with 'id', 'x', 'y' fields
+            motion_grid: Optional VelocityEstimator.motion_grid. When given,
+                the dominant flow direction and ``speed_mps`` come from this
+                frame's grid (the magnitude still from the per-track vector
+                history), and counter-flow cells are reported
 
         Returns:
             Dict with flow analysis results
         """
         current_time = time.time()
-        current_vectors: List[FlowVector] = []
         new_counter_flow: List[CounterFlowEvent] = []
-
-        for obj in tracked_objects:
-            track_id = obj.get('id', str(obj.get('track_id', '')))
-            x = obj.get('x', 0)
-            y = obj.get('y', 0)
-
-            # Normalize coordinates
-            if x > 1 or y > 1:
-                x = x / 100.0
-                y = y / 100.0
-
-            prev_positions = self.track_positions[track_id]
-
-            if prev_positions:
-                prev_x, prev_y, prev_time = prev_positions[-1]
-                dt = current_time - prev_time
-
-                if dt > 0 and dt < 2.0:  # Ignore if too old
-                    dx = x - prev_x
-                    dy = y - prev_y
-                    magnitude = math.sqrt(dx ** 2 + dy ** 2)
-
-                    if magnitude > 0.005:  # Minimum movement threshold
-                        angle = self._calculate_angle(dx, dy)
-                        vector = FlowVector(
-                            x=dx / magnitude,
-                            y=dy / magnitude,
-                            magnitude=magnitude,
-                            angle=angle
-                        )
-                        current_vectors.append(vector)
-
-                        # Update direction heatmap
-                        self._update_heatmap(x, y, angle)
-
-                        # Check for counter-flow
-                        if self.dominant_flow:
-                            deviation = self._angle_difference(angle, self.dominant_flow.angle)
-
-                            if deviation > self.angle_threshold:
-                                severity = self._classify_severity(deviation, magnitude)
-                                event = CounterFlowEvent(
-                                    track_id=track_id,
-                                    timestamp=current_time,
-                                    position=(x, y),
-                                    movement_angle=angle,
-                                    dominant_flow_angle=self.dominant_flow.angle,
-                                    deviation_angle=deviation,
-                                    severity=severity
-                                )
-                                self.counter_flow_events.append(event)
-                                new_counter_flow.append(event)
-
-            # Store position
-            self.track_positions[track_id].append((x, y, current_time))
-
-            # Keep only recent positions
-            if len(self.track_positions[track_id]) > 20:
-                self.track_positions[track_id] = self.track_positions[track_id][-20:]
-
-        # Update flow history
-        self.flow_history.extend(current_vectors)
-
-        # Keep only last 100 vectors for dominant flow calculation
-        if len(self.flow_history) > 100:
-            self.flow_history = self.flow_history[-100:]
-
-        # Update dominant flow
-        self.dominant_flow = self._calculate_dominant_flow(self.flow_history[-50:])
+        counter_flow_cells: List[int] = []
+
+        if motion_grid is not None:
+            self.dominant_flow = self._grid_dominant_flow(motion_grid)
+            counter_flow_cells = self._grid_counter_flow_cells(motion_grid)
+
+        # Untracked detections have no identity to follow
+        batch = as_batch(tracked_objects).tracked()
+        track_ids = batch.track_id.astype(np.int64)
+        positions = np.stack(normalized_positions(batch), axis=1)
+
+        # Movement of tracks seen recently (ignore if too old)
+        rows = self.tracks.find(track_ids)
+        known = rows >= 0
+        dt = current_time - self.tracks["last_seen"][rows[known]]
+        delta = positions[known] - self.tracks["position"][rows[known]]
+        magnitude = np.hypot(delta[:, 0], delta[:, 1])
+        moving = (dt > 0) & (dt < 2.0) & (magnitude > 0.005)  # Minimum movement threshold
+
+        moved_ids = track_ids[known][moving]
+        moved_positions = positions[known][moving]
+        delta, magnitude = delta[moving], magnitude[moving]
+        angles = np.degrees(np.arctan2(delta[:, 1], delta[:, 0])) % 360
+        current_vectors = np.column_stack([delta / magnitude[:, None], magnitude])
+
+        # Update direction heatmap
+        if len(current_vectors):
+            self._update_heatmap(moved_positions, angles)
+
+        # Check for counter-flow
+        if self.dominant_flow:
+            deviations = self._angle_difference(angles, self.dominant_flow.angle)
+            flagged = deviations > self.angle_threshold
+            for track_id, (x, y), angle, deviation, step in zip(
+                moved_ids[flagged].tolist(),
+                moved_positions[flagged].tolist(),
+                angles[flagged].tolist(),
+                deviations[flagged].tolist(),
+                magnitude[flagged].tolist()
+            ):
+                event = CounterFlowEvent(
+                    track_id=format_track_id(track_id),
+                    timestamp=current_time,
+                    position=(x, y),
+                    movement_angle=angle,
+                    dominant_flow_angle=self.dominant_flow.angle,
+                    deviation_angle=deviation,
+                    severity=self._classify_severity(deviation, step)
+                )
+                self.counter_flow_events.append(event)
+                new_counter_flow.append(event)
+
+        # Store positions
+        rows = self.tracks.upsert(track_ids)
+        self.tracks["position"][rows] = positions
+        self.tracks["last_seen"][rows] = current_time
+
+        # Forget tracks that have ended
+        self.tracks.drop(current_time - self.tracks["last_seen"] > TRACK_HISTORY_TTL)
+
+        # Update flow history, keeping only the last 100 vectors for dominant flow calculation
+        self.flow_history = np.concatenate([self.flow_history, current_vectors])[-100:]
+
+        # Update dominant flow (the grid's direction keeps the track magnitude)
+        track_flow = self._calculate_dominant_flow(self.flow_history[-50:])
+        if motion_grid is None:
+            self.dominant_flow = track_flow
+        elif self.dominant_flow is not None:
+            self.dominant_flow.magnitude = track_flow.magnitude if track_flow else 0.0
 
         return {
             "dominant_flow": self._flow_to_dict(self.dominant_flow) if self.dominant_flow else None,
             "current_vectors_count": len(current_vectors),
-            "counter_flow_detected": len(new_counter_flow) > 0,
+            "counter_flow_detected": len(new_counter_flow) > 0 or len(counter_flow_cells) > 0,
             "counter_flow_events": [self._event_to_dict(e) for e in new_counter_flow],
+            "counter_flow_cells": counter_flow_cells,
             "total_counter_flow_count": len(self.counter_flow_events)
         }
 
@@ -188,26 +247,37 @@ class FlowAnalyzer:
             return "moderate"
         return "mild"
 
-    def _update_heatmap(self, x: float, y: float, angle: float):
-        """Update the direction heatmap."""
+    def _update_heatmap(self, positions: np.ndarray, angles: np.ndarray):
+        """Update the direction heatmap.
+
+        Args:
+            positions: (N, 2) normalized (x, y) of the moving tracks
+            angles: (N,) movement angles in degrees
+        """
         if self.direction_heatmap is None:
             # Initialize with 4 channels: count, avg_angle_sin, avg_angle_cos, magnitude
             self.direction_heatmap = np.zeros((self.heatmap_size[0], self.heatmap_size[1], 4))
 
-        # Map position to grid cell
-        grid_x = min(int(x * self.heatmap_size[1]), self.heatmap_size[1] - 1)
-        grid_y = min(int(y * self.heatmap_size[0]), self.heatmap_size[0] - 1)
-
-        # Update cell with running average
-        cell = self.direction_heatmap[grid_y, grid_x]
-        count = cell[0] + 1
-        angle_rad = math.radians(angle)
-
-        # Running average of sin/cos for angle (avoids wraparound issues)
-        cell[1] = (cell[1] * cell[0] + math.sin(angle_rad)) / count
-        cell[2] = (cell[2] * cell[0] + math.cos(angle_rad)) / count
-        cell[3] = (cell[3] * cell[0] + 1) / count  # Magnitude accumulator
-        cell[0] = count
+        # Map positions to grid cells
+        grid_x = np.minimum((positions[:, 0] * self.heatmap_size[1]).astype(np.intp), self.heatmap_size[1] - 1)
+        grid_y = np.minimum((positions[:, 1] * self.heatmap_size[0]).astype(np.intp), self.heatmap_size[0] - 1)
+
+        # Accumulate this frame's samples per cell
+        angle_rad = np.radians(angles)
+        added = np.zeros_like(self.direction_heatmap)
+        np.add.at(added, (grid_y, grid_x), np.column_stack([
+            np.ones(len(angles)), np.sin(angle_rad), np.cos(angle_rad), np.ones(len(angles))
+        ]))
+
+        # Fold into the running averages of sin/cos (avoids wraparound issues) and magnitude
+        heatmap = self.direction_heatmap
+        updated = added[..., 0] > 0
+        count = heatmap[..., 0][updated] + added[..., 0][updated]
+        for channel in (1, 2, 3):
+            heatmap[..., channel][updated] = (
+                heatmap[..., channel][updated] * heatmap[..., 0][updated] + added[..., channel][updated]
+            ) / count
+        heatmap[..., 0][updated] = count
 
     def _flow_to_dict(self, flow: FlowVector) -> Dict:
         """Convert FlowVector to dict."""
@@ -216,7 +286,8 @@ class FlowAnalyzer:
             "y": round(flow.y, 3),
             "magnitude": round(flow.magnitude, 4),
             "angle": round(flow.angle, 1),
-            "direction": self._angle_to_direction(flow.angle)
+            "direction": self._angle_to_direction(flow.angle),
+            "speed_mps": round(flow.speed_mps, 2) if flow.speed_mps is not None else None
         }
 
     def _angle_to_direction(self, angle: float) -> str:
@@ -292,8 +363,8 @@ class FlowAnalyzer:
 
     def reset(self):
         """Reset flow analysis state."""
-        self.track_positions.clear()
-        self.flow_history.clear()
+        self.tracks.clear()
+        self.flow_history = np.empty((0, 3))
         self.counter_flow_events.clear()
         self.dominant_flow = None
         self.direction_heatmap = None
@@ -0,0 +1,215 @@
+"""Background frame decoding with a bounded prefetch queue."""
+
+from typing import Dict, Any, Optional
+from dataclasses import dataclass
+import queue
+import threading
+import time
+import cv2
+import numpy as np
+
+from config import SEEK_SKIP_FRAMES, FRAME_PREFETCH, FRAME_QUEUE_SIZE, FRAME_QUEUE_POLICY
+
+QUEUE_POLICIES = ("block", "drop_oldest")
+
+
+@dataclass
+class SourceFrame:
+    """A decoded frame ready for processing."""
+    frame: np.ndarray
+    frame_number: int  # Source frames read so far, including skipped ones
+    rewound: bool  # First frame after looping back to the start
+    decoded_at: float  # time.monotonic() when the frame became available (see FrameSource._run)
+
+
+class FrameSource:
+    """Decodes the subsampled frames of a video, optionally ahead of time.
+
+    Only every ``frame_skip``-th frame is decoded; the ones in between are
+    skipped with ``grab()`` (or a seek for long skips). With prefetch on,
+    a background thread fills a bounded queue so the processing loop only
+    dequeues. When the queue is full the decoder either waits
+    (``block``, for offline analysis where no frame may be lost) or
+    discards the oldest queued frame (``drop_oldest``, for live views
+    that want the latest frame). In ``drop_oldest`` mode a file source is
+    decoded at its own frame rate, the way a live camera delivers frames.
+    """
+
+    def __init__(
+        self,
+        cap: cv2.VideoCapture,
+        frame_skip: int,
+        total_frames: int,
+        video_fps: float,
+        prefetch: bool = FRAME_PREFETCH,
+        size: int = FRAME_QUEUE_SIZE,
+        policy: str = FRAME_QUEUE_POLICY,
+        loop: bool = True
+    ):
+        """Initialize the frame source.
+
+        Args:
+            cap: Opened capture; the source owns reads from it from now on
+            frame_skip: Decode every n-th source frame
+            total_frames: Frame count of the video, for seeking
+            video_fps: Source frame rate, for live pacing
+            prefetch: Decode on a background thread
+            size: Maximum number of decoded frames waiting in the queue
+            policy: "block" or "drop_oldest" when the queue is full
+            loop: Seek back to the start at the end of the video
+        """
+        if policy not in QUEUE_POLICIES:
+            raise ValueError(f"Unknown frame queue policy '{policy}'. Available: {list(QUEUE_POLICIES)}")
+
+        self.cap = cap
+        self.frame_skip = frame_skip
+        self.total_frames = total_frames
+        self.video_fps = video_fps
+        self.prefetch = prefetch
+        self.policy = policy
+        self.loop = loop
+
+        self.frame_number = 0
+        self._rewound = False
+        self._queue: "queue.Queue[Optional[SourceFrame]]" = queue.Queue(maxsize=max(1, size))
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+        # Counters
+        self.decoded_count = 0
+        self.dropped_count = 0
+        self.decode_seconds = 0.0
+
+    def _decode_next(self) -> Optional[SourceFrame]:
+        """Skip to and decode the next subsampled frame.
+
+        Returns:
+            The frame, or None at the end of a non-looping video or if the
+            video has no readable frames
+        """
+        start = time.perf_counter()
+        for _ in range(2):  # At most one rewind per call
+            to_skip = self.frame_skip - 1 - self.frame_number % self.frame_skip
+            if to_skip >= SEEK_SKIP_FRAMES:
+                position = int(self.cap.get(cv2.CAP_PROP_POS_FRAMES))
+                if position + to_skip < self.total_frames:
+                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, position + to_skip)
+                    self.frame_number += to_skip
+                    to_skip = 0
+
+            for _ in range(to_skip):
+                if not self.cap.grab():
+                    break
+                self.frame_number += 1
+            else:
+                ret, frame = self.cap.read()
+                if ret:
+                    self.frame_number += 1
+                    rewound, self._rewound = self._rewound, False
+                    self.decoded_count += 1
+                    self.decode_seconds += time.perf_counter() - start
+                    return SourceFrame(frame, self.frame_number, rewound, time.monotonic())
+
+            if not self.loop:
+                return None
+            self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
+            self._rewound = True
+        return None
+
+    def _run(self):
+        """Decoder thread: keep the queue topped up until stopped."""
+        interval = self.frame_skip / self.video_fps if self.video_fps > 0 else 0.0
+        next_due = time.monotonic()
+        while not self._stop.is_set():
+            item = self._decode_next()
+
+            if self.policy == "drop_oldest":
+                # Release frames no faster than the source would produce them
+                next_due += interval
+                delay = next_due - time.monotonic()
+                if delay > 0:
+                    self._stop.wait(delay)
+                else:
+                    next_due = time.monotonic()
+                if item is not None:
+                    item.decoded_at = time.monotonic()  # Captured now, as far as a live view can tell
+                while True:
+                    try:
+                        self._queue.put_nowait(item)
+                        break
+                    except queue.Full:
+                        try:
+                            dropped = self._queue.get_nowait()
+                            self.dropped_count += 1
+                            if dropped is not None and dropped.rewound and item is not None:
+                                item.rewound = True  # Keep the loop signal
+                        except queue.Empty:
+                            pass
+            else:
+                while not self._stop.is_set():
+                    try:
+                        self._queue.put(item, timeout=0.1)
+                        break
+                    except queue.Full:
+                        continue
+
+            if item is None:
+                return
+
+    def start(self):
+        """Start the decoder thread."""
+        if self._thread is not None:
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, name="frame-decoder", daemon=True)
+        self._thread.start()
+
+    def read(self, timeout: Optional[float] = None) -> Optional[SourceFrame]:
+        """Get the next frame to process.
+
+        With prefetch this only dequeues (starting the decoder on the first
+        call); otherwise the frame is decoded inline.
+
+        Args:
+            timeout: Seconds to wait for a prefetched frame (None = forever)
+
+        Returns:
+            The next frame, or None at the end of the video or on timeout
+        """
+        if not self.prefetch:
+            return self._decode_next()
+
+        self.start()
+        if not self._thread.is_alive() and self._queue.empty():
+            return None  # Decoder already hit the end
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+    def stop(self):
+        """Stop the decoder thread and discard queued frames."""
+        self._stop.set()
+        if self._thread is not None:
+            while self._thread.is_alive():
+                # Unblock a decoder waiting on a full queue
+                try:
+                    self._queue.get_nowait()
+                except queue.Empty:
+                    pass
+                self._thread.join(timeout=0.1)
+            self._thread = None
+        while not self._queue.empty():
+            self._queue.get_nowait()
+
+    def get_status(self) -> Dict[str, Any]:
+        """Queue depth and decode counters."""
+        return {
+            "prefetch": self.prefetch,
+            "policy": self.policy,
+            "queue_depth": self._queue.qsize(),
+            "queue_size": self._queue.maxsize,
+            "decoded": self.decoded_count,
+            "dropped": self.dropped_count,
+            "decode_ms": round(self.decode_seconds / self.decoded_count * 1000, 2) if self.decoded_count else 0.0
+        }
@@ -4,6 +4,11 @@ from typing import Dict, List, Tuple, Optional
 from dataclasses import dataclass, field
 from collections import defaultdict
 import time
+import numpy as np
+
+from models.detector import TrackedObjects, as_batch, format_track_id, normalized_positions
+from models.track_store import TrackTable
+from config import TRACK_HISTORY_TTL
 
 
 @dataclass
@@ -45,11 +50,12 @@ class BiDirectionalGateCounter:
 
     def __init__(self):
         self.gates: Dict[str, VirtualGate] = {}
-        self.track_positions: Dict[str, List[Tuple[float, float, float]]] = defaultdict(list)  # track_id -> [(x, y, time), ...]
+        # Last normalized position and time seen per track
+        self.tracks = TrackTable(position=(np.float64, (2,)), last_seen=(np.float64, ()))
         self.crossings: List[GateCrossing] = []
         self.entry_count: Dict[str, int] = defaultdict(int)
         self.exit_count: Dict[str, int] = defaultdict(int)
-        self.crossed_tracks: Dict[str, set] = defaultdict(set)  # gate_id -> set of track_ids that crossed
+        self.crossed_tracks: Dict[str, np.ndarray] = {}  # gate_id -> sorted IDs of tracks that crossed
 
         # Initialize default gates for temple scenarios
         self._init_default_gates()
@@ -77,7 +83,7 @@ class BiDirectionalGateCounter:
         self.gates[gate.gate_id] = gate
         self.entry_count[gate.gate_id] = 0
         self.exit_count[gate.gate_id] = 0
-        self.crossed_tracks[gate.gate_id] = set()
+        self.crossed_tracks[gate.gate_id] = np.empty(0, dtype=np.int64)
 
     def remove_gate(self, gate_id: str):
         """Remove a virtual gate."""
@@ -87,44 +93,33 @@ class BiDirectionalGateCounter:
             del self.exit_count[gate_id]
             del self.crossed_tracks[gate_id]
 
-    def _cross_product_sign(self, p1: Tuple[float, float], p2: Tuple[float, float], p3: Tuple[float, float]) -> float:
-        """Calculate cross product to determine which side of a line a point is on."""
-        return (p2[0] - p1[0]) * (p3[1] - p1[1]) - (p2[1] - p1[1]) * (p3[0] - p1[0])
-
-    def _lines_intersect(self,
-                         l1_start: Tuple[float, float], l1_end: Tuple[float, float],
-                         l2_start: Tuple[float, float], l2_end: Tuple[float, float]) -> bool:
-        """Check if two line segments intersect."""
-        d1 = self._cross_product_sign(l2_start, l2_end, l1_start)
-        d2 = self._cross_product_sign(l2_start, l2_end, l1_end)
-        d3 = self._cross_product_sign(l1_start, l1_end, l2_start)
-        d4 = self._cross_product_sign(l1_start, l1_end, l2_end)
-
-        if ((d1 > 0 and d2 < 0) or (d1 < 0 and d2 > 0)) and \
-           ((d3 > 0 and d4 < 0) or (d3 < 0 and d4 > 0)):
-            return True
-        return False
-
-    def _get_crossing_direction(self,
-                                prev_pos: Tuple[float, float],
-                                curr_pos: Tuple[float, float],
-                                gate: VirtualGate) -> str:
-        """Determine if the crossing was an entry or exit."""
-        # Movement vector
-        move_x = curr_pos[0] - prev_pos[0]
-        move_y = curr_pos[1] - prev_pos[1]
-
-        # Dot product with entry direction
-        dot = move_x * gate.entry_direction[0] + move_y * gate.entry_direction[1]
-
-        return "entry" if dot > 0 else "exit"
-
-    def update(self, tracked_objects: List[Dict]) -> List[GateCrossing]:
+    def _cross_product_sign(self, p1: np.ndarray, p2: np.ndarray, p3: np.ndarray) -> np.ndarray:
+        """Cross product telling which side of the line p1-p2 each point p3 is on (rows of (x, y))."""
+        return (p2[..., 0] - p1[..., 0]) * (p3[..., 1] - p1[..., 1]) - (p2[..., 1] - p1[..., 1]) * (p3[..., 0] - p1[..., 0])
+
+    def _paths_cross(self, prev: np.ndarray, curr: np.ndarray, gate: VirtualGate) -> np.ndarray:
+        """Which (N, 2) movement segments prev -> curr strictly cross the gate line."""
+        start = np.array([gate.x1, gate.y1])
+        end = np.array([gate.x2, gate.y2])
+        d1 = self._cross_product_sign(start, end, prev)
+        d2 = self._cross_product_sign(start, end, curr)
+        d3 = self._cross_product_sign(prev, curr, start)
+        d4 = self._cross_product_sign(prev, curr, end)
+        return (
+            (((d1 > 0) & (d2 < 0)) | ((d1 < 0) & (d2 > 0))) &
+            (((d3 > 0) & (d4 < 0)) | ((d3 < 0) & (d4 > 0)))
+        )
+
+    def _is_entry(self, prev: np.ndarray, curr: np.ndarray, gate: VirtualGate) -> np.ndarray:
+        """Whether each movement points along the gate's entry direction."""
+        return (curr - prev) @ np.asarray(gate.entry_direction, dtype=np.float64) > 0
+
+    def update(self, tracked_objects: TrackedObjects) -> List[GateCrossing]:
         """
         Update gate crossings with new tracked positions.
 
         Args:
-            tracked_objects: List of tracked objects with 'id', 'x', 'y' fields
+            tracked_objects: DetectionBatch, or list of dicts with 'id', 'x', 'y' fields
 
         Returns:
             List of new gate crossings detected this frame
@@ -132,64 +127,60 @@ class BiDirectionalGateCounter:
         current_time = time.time()
         new_crossings = []
 
-        for obj in tracked_objects:
-            track_id = obj.get('id', str(obj.get('track_id', '')))
-            # Normalize position to 0-1 range (assuming x, y are percentages or need conversion)
-            x = obj.get('x', 0)
-            y = obj.get('y', 0)
-
-            # If coordinates are in percentage (0-100), normalize to 0-1
-            if x > 1 or y > 1:
-                x = x / 100.0
-                y = y / 100.0
-
-            # Get previous positions
-            prev_positions = self.track_positions[track_id]
-
-            if prev_positions:
-                prev_x, prev_y, _ = prev_positions[-1]
-
-                # Check crossing for each gate
-                for gate_id, gate in self.gates.items():
-                    # Skip if this track already crossed this gate
-                    if track_id in self.crossed_tracks[gate_id]:
-                        continue
-
-                    # Check if track path crosses the gate line
-                    if self._lines_intersect(
-                        (prev_x, prev_y), (x, y),
-                        (gate.x1, gate.y1), (gate.x2, gate.y2)
-                    ):
-                        direction = self._get_crossing_direction(
-                            (prev_x, prev_y), (x, y), gate
-                        )
-
-                        crossing = GateCrossing(
-                            track_id=track_id,
-                            direction=direction,
-                            timestamp=current_time,
-                            gate_id=gate_id,
-                            position=(x, y)
-                        )
-
-                        self.crossings.append(crossing)
-                        new_crossings.append(crossing)
-                        self.crossed_tracks[gate_id].add(track_id)
-
-                        if direction == "entry":
-                            self.entry_count[gate_id] += 1
-                        else:
-                            self.exit_count[gate_id] += 1
-
-            # Store current position
-            self.track_positions[track_id].append((x, y, current_time))
-
-            # Keep only last 30 positions per track
-            if len(self.track_positions[track_id]) > 30:
-                self.track_positions[track_id] = self.track_positions[track_id][-30:]
-
+        # Untracked detections have no identity to follow
+        batch = as_batch(tracked_objects).tracked()
+        ids = batch.track_id.astype(np.int64)
+        positions = np.stack(normalized_positions(batch), axis=1)
+
+        # Tracks seen before: their step since the last frame, against every gate
+        rows = self.tracks.find(ids)
+        known = rows >= 0
+        moved_ids = ids[known]
+        prev = self.tracks["position"][rows[known]]
+        curr = positions[known]
+
+        for gate_id, gate in self.gates.items():
+            # Tracks that already crossed this gate are skipped
+            crossed = self._paths_cross(prev, curr, gate) & ~np.isin(moved_ids, self.crossed_tracks[gate_id])
+            if not crossed.any():
+                continue
+            entries = self._is_entry(prev[crossed], curr[crossed], gate)
+
+            for track_id, (x, y), is_entry in zip(
+                moved_ids[crossed].tolist(), curr[crossed].tolist(), entries.tolist()
+            ):
+                crossing = GateCrossing(
+                    track_id=format_track_id(track_id),
+                    direction="entry" if is_entry else "exit",
+                    timestamp=current_time,
+                    gate_id=gate_id,
+                    position=(x, y)
+                )
+                self.crossings.append(crossing)
+                new_crossings.append(crossing)
+
+            self.crossed_tracks[gate_id] = np.union1d(self.crossed_tracks[gate_id], moved_ids[crossed])
+            self.entry_count[gate_id] += int(entries.sum())
+            self.exit_count[gate_id] += int((~entries).sum())
+
+        # Store current positions
+        rows = self.tracks.upsert(ids)
+        self.tracks["position"][rows] = positions
+        self.tracks["last_seen"][rows] = current_time
+
+        self._expire_tracks(current_time)
         return new_crossings
 
+    def _expire_tracks(self, current_time: float):
+        """Forget positions and crossing flags of tracks that have ended."""
+        stale = current_time - self.tracks["last_seen"] > TRACK_HISTORY_TTL
+        if not stale.any():
+            return
+        stale_ids = self.tracks.ids[stale]
+        self.tracks.drop(stale)
+        for gate_id, crossed in self.crossed_tracks.items():
+            self.crossed_tracks[gate_id] = np.setdiff1d(crossed, stale_ids)
+
     def get_gate_stats(self, gate_id: str = None) -> Dict:
         """Get statistics for a gate or all gates."""
         if gate_id:
@@ -256,12 +247,12 @@ class BiDirectionalGateCounter:
         if gate_id:
             self.entry_count[gate_id] = 0
             self.exit_count[gate_id] = 0
-            self.crossed_tracks[gate_id] = set()
+            self.crossed_tracks[gate_id] = np.empty(0, dtype=np.int64)
             self.crossings = [c for c in self.crossings if c.gate_id != gate_id]
         else:
             for gid in self.gates:
                 self.entry_count[gid] = 0
                 self.exit_count[gid] = 0
-                self.crossed_tracks[gid] = set()
+                self.crossed_tracks[gid] = np.empty(0, dtype=np.int64)
             self.crossings = []
-            self.track_positions.clear()
+            self.tracks.clear()
@@ -0,0 +1,70 @@
+"""Adaptive keyframe scheduling for the detector."""
+
+from typing import Dict, Any
+
+from config import KEYFRAME_MAX_INTERVAL, KEYFRAME_VELOCITY_REF, KEYFRAME_DENSITY_REF
+
+
+class KeyframeScheduler:
+    """Decides which processed frames get a full detector pass.
+
+    The interval K shrinks as the scene gets faster or denser:
+    ``K = max_interval / (1 + velocity / velocity_ref + density / density_ref)``,
+    so calm scenes run YOLO rarely while busy ones approach every frame.
+    """
+
+    def __init__(
+        self,
+        max_interval: int = KEYFRAME_MAX_INTERVAL,
+        velocity_ref: float = KEYFRAME_VELOCITY_REF,
+        density_ref: float = KEYFRAME_DENSITY_REF
+    ):
+        """Initialize the scheduler.
+
+        Args:
+            max_interval: Largest K, used on a static, empty scene
+            velocity_ref: Crowd speed (m/s) that halves K
+            density_ref: Crowd density (people/m²) that halves K
+        """
+        self.max_interval = max(1, max_interval)
+        self.velocity_ref = velocity_ref
+        self.density_ref = density_ref
+        self.interval = self.max_interval
+        self.frames_since_keyframe = self.max_interval  # First frame is a keyframe
+
+        # Statistics
+        self.frame_count = 0
+        self.keyframe_count = 0
+
+    def is_keyframe(self) -> bool:
+        """Advance one processed frame and report whether it is a keyframe."""
+        self.frame_count += 1
+        if self.frames_since_keyframe >= self.interval - 1:
+            self.frames_since_keyframe = 0
+            self.keyframe_count += 1
+            return True
+        self.frames_since_keyframe += 1
+        return False
+
+    def update(self, velocity: float, density: float):
+        """Adapt K to the current scene motion and density.
+
+        Args:
+            velocity: Crowd velocity in m/s
+            density: Crowd density in people/m²
+        """
+        load = 1.0 + max(velocity, 0.0) / self.velocity_ref + max(density, 0.0) / self.density_ref
+        self.interval = max(1, min(self.max_interval, int(round(self.max_interval / load))))
+
+    def force_keyframe(self):
+        """Make the next frame a keyframe (e.g. after a seek or loop)."""
+        self.frames_since_keyframe = self.interval
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get scheduling statistics."""
+        return {
+            "interval": self.interval,
+            "frames": self.frame_count,
+            "keyframes": self.keyframe_count,
+            "keyframe_ratio": round(self.keyframe_count / self.frame_count, 3) if self.frame_count else 0.0
+        }
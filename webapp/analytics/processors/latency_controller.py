@@ -0,0 +1,133 @@
+"""Capture-to-publish latency control for live camera views."""
+
+from typing import Dict, Any, List, Optional, Tuple
+from collections import deque
+import numpy as np
+
+from config import (
+    LIVE_LATENCY_TARGET_MS, LIVE_LATENCY_WINDOW, LIVE_RECOVER_RATIO, LIVE_MAX_RATE_DIVISOR
+)
+
+
+class LatencyController:
+    """Holds a live pipeline to a capture-to-publish latency target.
+
+    Quality levels run from the full setup to the cheapest one: first
+    down the detector model ladder, then halving the processing rate
+    until ``max_rate_divisor`` (frames that arrive in between are never
+    picked up; the loop always takes the newest). After each window of
+    frames the p90 latency is checked: above the target the pipeline
+    steps down a level, below ``recover_ratio`` of it a level back up.
+    The window restarts after every change so a new level is judged on
+    its own frames.
+    """
+
+    def __init__(
+        self,
+        target_ms: float = LIVE_LATENCY_TARGET_MS,
+        window: int = LIVE_LATENCY_WINDOW,
+        recover_ratio: float = LIVE_RECOVER_RATIO,
+        max_rate_divisor: int = LIVE_MAX_RATE_DIVISOR,
+        model_ladder: Optional[List[str]] = None
+    ):
+        """Initialize the controller.
+
+        Args:
+            target_ms: Latency target for the p90 of a window, in ms
+            window: Frames per evaluation
+            recover_ratio: Fraction of the target below which quality steps up
+            max_rate_divisor: Slowest processing rate, as a divisor of PROCESS_FPS
+            model_ladder: Detector weights from largest to smallest (empty or
+                None keeps the detector's model)
+        """
+        self.target_ms = target_ms
+        self.window = max(1, window)
+        self.recover_ratio = recover_ratio
+
+        models = list(model_ladder) if model_ladder else [None]
+        divisors = [1]
+        while divisors[-1] * 2 <= max_rate_divisor:
+            divisors.append(divisors[-1] * 2)
+        # (model, rate divisor) from best to cheapest
+        self.levels: List[Tuple[Optional[str], int]] = (
+            [(model, 1) for model in models] + [(models[-1], divisor) for divisor in divisors[1:]]
+        )
+        self.level = 0
+
+        self._latencies: deque = deque(maxlen=self.window)
+        self.last_latency_ms = 0.0
+
+        # Statistics
+        self.frame_count = 0
+        self.breach_count = 0
+        self.level_changes = 0
+
+    @property
+    def model_path(self) -> Optional[str]:
+        """Detector weights for the current level (None = unchanged)."""
+        return self.levels[self.level][0]
+
+    @property
+    def rate_divisor(self) -> int:
+        """Processing rate divisor for the current level."""
+        return self.levels[self.level][1]
+
+    def observe(self, latency_ms: float) -> bool:
+        """Record a published frame's latency and adapt the level.
+
+        Args:
+            latency_ms: Capture-to-publish latency of the frame
+
+        Returns:
+            True if the level changed (the caller applies ``model_path``)
+        """
+        self.frame_count += 1
+        self.last_latency_ms = latency_ms
+        if latency_ms > self.target_ms:
+            self.breach_count += 1
+
+        self._latencies.append(latency_ms)
+        if len(self._latencies) < self.window:
+            return False
+
+        p90 = float(np.percentile(self._latencies, 90))
+        if p90 > self.target_ms and self.level < len(self.levels) - 1:
+            self.level += 1
+        elif p90 < self.target_ms * self.recover_ratio and self.level > 0:
+            self.level -= 1
+        else:
+            self._latencies.popleft()  # Slide the window
+            return False
+
+        self._latencies.clear()
+        self.level_changes += 1
+        return True
+
+    def delay(self, elapsed: float, interval: float) -> float:
+        """Seconds to wait before taking the next frame.
+
+        Args:
+            elapsed: Seconds already spent on this frame (reading through publishing)
+            interval: Nominal seconds between processed frames
+
+        Returns:
+            Remaining time of this level's frame interval (0 when behind)
+        """
+        return max(0.0, interval * self.rate_divisor - elapsed)
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get the current level and latency statistics."""
+        recent = list(self._latencies)
+        return {
+            "target_ms": self.target_ms,
+            "level": self.level,
+            "levels": len(self.levels),
+            "model": self.model_path,
+            "rate_divisor": self.rate_divisor,
+            "last_ms": round(self.last_latency_ms, 1),
+            "p50_ms": round(float(np.percentile(recent, 50)), 1) if recent else None,
+            "p90_ms": round(float(np.percentile(recent, 90)), 1) if recent else None,
+            "frames": self.frame_count,
+            "breaches": self.breach_count,
+            "level_changes": self.level_changes
+        }
@@ -1,10 +1,13 @@
 """Metrics aggregation and calculation."""
 
-from typing import Dict, Any, List
+from typing import Dict, Any, List, Optional
 from collections import deque
 import time
+import numpy as np
+import cv2
 
-from config import DENSITY_THRESHOLDS, VELOCITY_THRESHOLDS, DEFAULT_ZONE_AREA_SQM
+from models.ground_plane import GroundPlane
+from config import DENSITY_THRESHOLDS, VELOCITY_THRESHOLDS, DEFAULT_ZONE_AREA_SQM, LOCAL_DENSITY_CELLS
 
 
 class MetricsAggregator:
@@ -22,6 +25,11 @@ class MetricsAggregator:
         self.people_count = 0
         self.velocity = 0.0
         self.flow_rate = 0.0
+        self.peak_density = 0.0
+
+        # Perspective-aware local density
+        self.ground_plane: Optional[GroundPlane] = None
+        self._window_area_sqm: Optional[np.ndarray] = None
 
         # Historical data for trends (last 5 minutes at 1 sample/second)
         self.count_history: deque = deque(maxlen=300)
@@ -40,7 +48,9 @@ class MetricsAggregator:
         self,
         people_count: int,
         velocity: float,
-        flow_rate: float
+        flow_rate: float,
+        positions_px: Optional[np.ndarray] = None,
+        now: Optional[float] = None
     ):
         """Update metrics with new measurements.
 
@@ -48,8 +58,11 @@ class MetricsAggregator:
             people_count: Number of people detected
             velocity: Average walking velocity in m/s
             flow_rate: Flow rate in people per minute
+            positions_px: Optional (N, 2) ground-contact points of the
+                people in full-resolution pixels, for local density
+            now: Sample time in seconds (None = wall clock)
         """
-        current_time = time.time()
+        current_time = time.time() if now is None else now
 
         # Add to smoothing buffers
         self._count_buffer.append(people_count)
@@ -62,22 +75,37 @@ class MetricsAggregator:
 
         # Calculate density
         density = self.calculate_density()
+        if positions_px is not None:
+            self.peak_density = self.calculate_peak_density(positions_px)
+
+        self.record_history(self.people_count, self.velocity, density, current_time)
+
+    def record_history(self, people_count: int, velocity: float, density: float, timestamp: float):
+        """Append one sample to the trend history.
 
-        # Add to history
+        Also used to mirror the history of an aggregator that runs in a
+        camera worker process.
+
+        Args:
+            people_count: Smoothed people count
+            velocity: Smoothed velocity in m/s
+            density: Density in people/m²
+            timestamp: Sample time (time.time())
+        """
         self.count_history.append({
-            "time": current_time,
-            "value": self.people_count
+            "time": timestamp,
+            "value": people_count
         })
         self.velocity_history.append({
-            "time": current_time,
-            "value": self.velocity
+            "time": timestamp,
+            "value": velocity
         })
         self.density_history.append({
-            "time": current_time,
+            "time": timestamp,
             "value": density
         })
 
-        self.last_update_time = current_time
+        self.last_update_time = timestamp
 
     def calculate_density(self) -> float:
         """Calculate crowd density in people per square meter.
@@ -89,6 +117,49 @@ class MetricsAggregator:
             return 0.0
         return self.people_count / self.zone_area_sqm
 
+    def set_ground_plane(self, ground_plane: Optional[GroundPlane]):
+        """Enable perspective-aware local density.
+
+        Args:
+            ground_plane: Camera ground plane, or None to disable
+        """
+        self.ground_plane = ground_plane
+        self._window_area_sqm = None
+        if ground_plane is not None:
+            # Ground area of the window around each lattice cell, summed once
+            self._window_area_sqm = cv2.boxFilter(
+                ground_plane.cell_area_sqm, -1, (LOCAL_DENSITY_CELLS, LOCAL_DENSITY_CELLS),
+                normalize=False, borderType=cv2.BORDER_CONSTANT
+            )
+
+    def calculate_peak_density(self, positions_px: np.ndarray) -> float:
+        """Highest local density, in people per square meter of ground.
+
+        People are binned into the ground plane's lattice and counted in
+        a window of LOCAL_DENSITY_CELLS x LOCAL_DENSITY_CELLS cells, which
+        is divided by that window's true ground area. Far-field cells
+        cover more ground, so they are no longer under-reported.
+
+        Args:
+            positions_px: (N, 2) ground-contact points in full-resolution pixels
+
+        Returns:
+            Peak local density (people/m²), 0 without a ground plane
+        """
+        if self.ground_plane is None or len(positions_px) == 0:
+            return 0.0
+
+        shape = self.ground_plane.cell_area_sqm.shape
+        counts = np.bincount(
+            self.ground_plane.cell_index(positions_px), minlength=shape[0] * shape[1]
+        ).reshape(shape).astype(np.float32)
+        window_counts = cv2.boxFilter(
+            counts, -1, (LOCAL_DENSITY_CELLS, LOCAL_DENSITY_CELLS),
+            normalize=False, borderType=cv2.BORDER_CONSTANT
+        )
+        occupied = counts > 0
+        return float((window_counts[occupied] / self._window_area_sqm[occupied]).max())
+
     def get_congestion_status(self) -> str:
         """Determine congestion status based on density and velocity.
 
@@ -110,11 +181,13 @@ class MetricsAggregator:
         else:
             return "free"
 
-    def get_count_trend(self, window_seconds: float = 300.0) -> float:
+    def get_count_trend(self, window_seconds: float = 300.0, now: Optional[float] = None) -> float:
         """Calculate count trend over a time window.
 
         Args:
             window_seconds: Time window for trend calculation
+            now: Current time on the clock the history was recorded with
+                (None = wall clock)
 
         Returns:
             Percentage change in count
@@ -122,7 +195,7 @@ class MetricsAggregator:
         if len(self.count_history) < 2:
             return 0.0
 
-        current_time = time.time()
+        current_time = time.time() if now is None else now
         window_start = current_time - window_seconds
 
         # Get old and new counts
@@ -140,19 +213,23 @@ class MetricsAggregator:
 
         return ((new_avg - old_avg) / old_avg) * 100
 
-    def get_metrics(self) -> Dict[str, Any]:
+    def get_metrics(self, now: Optional[float] = None) -> Dict[str, Any]:
         """Get all current metrics.
 
+        Args:
+            now: Current time for the count trend (None = wall clock)
+
         Returns:
             Dictionary with all metrics
         """
         density = self.calculate_density()
         congestion_status = self.get_congestion_status()
-        count_trend = self.get_count_trend()
+        count_trend = self.get_count_trend(now=now)
 
         return {
             "peopleCount": self.people_count,
             "density": round(density, 2),
+            "peakDensity": round(self.peak_density, 2),
             "congestionStatus": congestion_status,
             "velocity": round(self.velocity, 2),
             "flowRate": int(self.flow_rate),
@@ -207,6 +284,7 @@ class MetricsAggregator:
         self.people_count = 0
         self.velocity = 0.0
         self.flow_rate = 0.0
+        self.peak_density = 0.0
         self.count_history.clear()
         self.velocity_history.clear()
         self.density_history.clear()
@@ -0,0 +1,106 @@
+"""Motion gate that skips detection on static scenes."""
+
+from typing import Dict, Any, Optional
+import numpy as np
+import cv2
+
+from config import (
+    MOTION_GATE_WIDTH, MOTION_PIXEL_THRESHOLD, MOTION_MIN_CHANGED_FRACTION, MOTION_MAX_SKIP
+)
+
+
+class MotionGate:
+    """Cheap frame-difference test deciding whether detection must run.
+
+    Each frame is compared, at thumbnail resolution, with the frame the
+    detector last ran on. Detection runs when enough pixels changed since
+    then, or when ``max_skip`` frames in a row have been skipped so slow
+    drifts and new arrivals are still picked up.
+    """
+
+    def __init__(
+        self,
+        width: int = MOTION_GATE_WIDTH,
+        pixel_threshold: int = MOTION_PIXEL_THRESHOLD,
+        min_changed_fraction: float = MOTION_MIN_CHANGED_FRACTION,
+        max_skip: int = MOTION_MAX_SKIP
+    ):
+        """Initialize the motion gate.
+
+        Args:
+            width: Thumbnail width used for differencing
+            pixel_threshold: Grey-level difference counted as a changed pixel
+            min_changed_fraction: Fraction of changed pixels that triggers detection
+            max_skip: Maximum consecutive frames to skip
+        """
+        self.width = width
+        self.pixel_threshold = pixel_threshold
+        self.min_changed_fraction = min_changed_fraction
+        self.max_skip = max_skip
+
+        self.reference: Optional[np.ndarray] = None
+        self.frames_since_detection = 0
+        self.last_changed_fraction = 0.0
+
+        # Statistics
+        self.frame_count = 0
+        self.skipped_count = 0
+
+    def _thumbnail(self, frame: np.ndarray) -> np.ndarray:
+        """Downscale and blur a frame to a small grey thumbnail."""
+        h, w = frame.shape[:2]
+        size = (self.width, max(1, int(h * self.width / w)))
+        gray = cv2.cvtColor(cv2.resize(frame, size, interpolation=cv2.INTER_AREA), cv2.COLOR_BGR2GRAY)
+        return cv2.GaussianBlur(gray, (5, 5), 0)
+
+    def should_detect(self, frame: np.ndarray) -> bool:
+        """Decide whether the detector must run on this frame.
+
+        Args:
+            frame: BGR image as numpy array
+
+        Returns:
+            True if detection should run, False to reuse the last detections
+        """
+        self.frame_count += 1
+        thumb = self._thumbnail(frame)
+
+        if self.reference is None or self.reference.shape != thumb.shape:
+            self._mark_detected(thumb)
+            return True
+
+        diff = cv2.absdiff(thumb, self.reference)
+        self.last_changed_fraction = np.count_nonzero(diff > self.pixel_threshold) / diff.size
+
+        if (self.last_changed_fraction >= self.min_changed_fraction or
+                self.frames_since_detection >= self.max_skip):
+            self._mark_detected(thumb)
+            return True
+
+        self.frames_since_detection += 1
+        self.skipped_count += 1
+        return False
+
+    def _mark_detected(self, thumb: np.ndarray):
+        """Make this frame the new reference."""
+        self.reference = thumb
+        self.frames_since_detection = 0
+
+    @property
+    def skip_ratio(self) -> float:
+        """Fraction of frames on which detection was skipped."""
+        return self.skipped_count / self.frame_count if self.frame_count else 0.0
+
+    def get_status(self) -> Dict[str, Any]:
+        """Get gate statistics."""
+        return {
+            "frames": self.frame_count,
+            "skipped": self.skipped_count,
+            "skip_ratio": round(self.skip_ratio, 3),
+            "last_changed_fraction": round(self.last_changed_fraction, 4)
+        }
+
+    def reset(self):
+        """Reset the gate so the next frame always runs detection."""
+        self.reference = None
+        self.frames_since_detection = 0
@@ -4,6 +4,9 @@ from typing import Dict, Any, List, Optional, Tuple
 from collections import deque
 import time
 import math
+import numpy as np
+
+from models.detector import TrackedObjects, as_batch
 
 
 class QueueAnalyzer:
@@ -31,13 +34,14 @@ class QueueAnalyzer:
 
     def analyze(
         self,
-        detections: List[Dict[str, Any]],
+        detections: TrackedObjects,
         velocity: float = 0.8
     ) -> Dict[str, Any]:
         """Analyze queue from detections.
 
         Args:
-            detections: List of detection dictionaries with x, y, width, height
+            detections: DetectionBatch, or list of detection dictionaries
+                with x, y, width, height
             velocity: Current average velocity in m/s
 
         Returns:
@@ -80,34 +84,25 @@ class QueueAnalyzer:
             "status": self._get_queue_status(wait_time_minutes)
         }
 
-    def _count_in_zone(self, detections: List[Dict[str, Any]]) -> int:
+    def _count_in_zone(self, detections: TrackedObjects) -> int:
         """Count detections within the queue zone.
 
         Args:
-            detections: List of detection dictionaries
+            detections: DetectionBatch or list of detection dictionaries
 
         Returns:
             Number of detections in queue zone
         """
         x1, y1, x2, y2 = self.queue_zone
-        count = 0
-
-        for det in detections:
-            # Get center of detection
-            cx = det.get("x", 0) + det.get("width", 0) / 2
-            cy = det.get("y", 0) + det.get("height", 0) / 2
-
-            # Check if in zone
-            if x1 <= cx <= x2 and y1 <= cy <= y2:
-                count += 1
+        centers = as_batch(detections).centers()
+        cx, cy = centers[:, 0], centers[:, 1]
+        return int(((x1 <= cx) & (cx <= x2) & (y1 <= cy) & (cy <= y2)).sum())
 
-        return count
-
-    def _estimate_sections(self, detections: List[Dict[str, Any]]) -> int:
+    def _estimate_sections(self, detections: TrackedObjects) -> int:
         """Estimate number of queue sections based on detection clustering.
 
         Args:
-            detections: List of detection dictionaries
+            detections: DetectionBatch or list of detection dictionaries
 
         Returns:
             Estimated number of queue sections
@@ -119,13 +114,9 @@ class QueueAnalyzer:
         sections = 4  # Divide into 4 horizontal sections
         section_width = 100 / sections
 
-        occupied = set()
-        for det in detections:
-            cx = det.get("x", 0) + det.get("width", 0) / 2
-            section_idx = min(int(cx / section_width), sections - 1)
-            occupied.add(section_idx)
-
-        return len(occupied)
+        cx = as_batch(detections).centers()[:, 0]
+        section_idx = np.minimum((cx / section_width).astype(int), sections - 1)
+        return len(np.unique(section_idx))
 
     def _calculate_trend(self) -> str:
         """Calculate queue trend over recent history.
@@ -0,0 +1,97 @@
+"""Fixed-slot ring buffers of numpy arrays in shared memory."""
+
+from typing import Optional, Tuple
+from multiprocessing import shared_memory
+import numpy as np
+
+EMPTY_SLOT = -1  # Sequence stamp of a slot being written or never written
+
+
+class SharedArrayRing:
+    """A ring of same-shape arrays shared between processes without pickling.
+
+    The block starts with one int64 sequence stamp per slot, followed by
+    the slots themselves. A writer copies item ``seq`` into slot
+    ``seq % slots`` and stamps it; a reader copies the slot out and
+    checks the stamp before and after, so an item overwritten while it
+    was being read is reported as lost instead of returned torn. There is
+    one writer per ring; readers only ever copy.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        slot_shape: Tuple[int, ...],
+        dtype: np.dtype,
+        slots: int,
+        create: bool = False
+    ):
+        """Create or attach to a ring.
+
+        Args:
+            name: Shared memory block name
+            slot_shape: Shape of the array held in each slot
+            dtype: Array dtype (plain or structured)
+            slots: Number of slots
+            create: Allocate the block (the owner) instead of attaching
+        """
+        self.name = name
+        self.slot_shape = tuple(slot_shape)
+        self.dtype = np.dtype(dtype)
+        self.slots = slots
+
+        header_bytes = slots * np.dtype(np.int64).itemsize
+        slot_bytes = int(np.prod(self.slot_shape)) * self.dtype.itemsize
+        self.shm = shared_memory.SharedMemory(
+            name=name, create=create, size=header_bytes + slot_bytes * slots if create else 0
+        )
+        self._stamps = np.ndarray((slots,), dtype=np.int64, buffer=self.shm.buf)
+        self._data = np.ndarray(
+            (slots,) + self.slot_shape, dtype=self.dtype, buffer=self.shm.buf, offset=header_bytes
+        )
+        if create:
+            self._stamps[:] = EMPTY_SLOT
+
+    def write(self, seq: int, array: np.ndarray):
+        """Store item ``seq``; a shorter leading dimension fills part of the slot.
+
+        Args:
+            seq: Monotonic item number (>= 0)
+            array: Array of the slot shape, or fewer rows of it
+        """
+        slot = seq % self.slots
+        self._stamps[slot] = EMPTY_SLOT
+        self._data[slot, :len(array)] = array
+        self._stamps[slot] = seq
+
+    def read(self, seq: int, count: Optional[int] = None) -> Optional[np.ndarray]:
+        """Copy item ``seq`` out of the ring.
+
+        Args:
+            seq: Item number to read
+            count: Leading rows to copy (None = the whole slot)
+
+        Returns:
+            A private copy, or None if the item was already overwritten
+        """
+        slot = seq % self.slots
+        if self._stamps[slot] != seq:
+            return None
+        data = self._data[slot] if count is None else self._data[slot, :count]
+        copy = data.copy()
+        if self._stamps[slot] != seq:
+            return None
+        return copy
+
+    def close(self):
+        """Detach from the block (views into it become invalid)."""
+        self._stamps = None
+        self._data = None
+        self.shm.close()
+
+    def unlink(self):
+        """Free the block; only the owner calls this, after every close."""
+        try:
+            self.shm.unlink()
+        except FileNotFoundError:
+            pass
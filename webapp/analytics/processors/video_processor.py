@@ -1,16 +1,29 @@
 """Main video processing pipeline."""
 
-from typing import Dict, Any, Optional, Generator, List
+from typing import Dict, Any, Optional, Generator, List, Tuple
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 import time
 import cv2
 import numpy as np
 
-from models.detector import PeopleDetector, Detection
+from models.detector import PeopleDetector, DetectionBatch
 from models.tracker import PeopleTracker
 from models.velocity import VelocityEstimator
+from models.box_propagator import BoxPropagator
+from models.flow_engines import create_flow_engine
+from models.ground_plane import GroundPlane
 from processors.metrics import MetricsAggregator
-from config import PROCESS_FPS, get_video_path
+from processors.motion_gate import MotionGate
+from processors.keyframe_scheduler import KeyframeScheduler
+from processors.frame_source import FrameSource
+from processors.latency_controller import LatencyController
+from config import (
+    PROCESS_FPS, MOTION_GATE_ENABLED, KEYFRAME_DETECTION, VELOCITY_MODE, PARALLEL_STAGES,
+    LIVE_MODE, LIVE_MODEL_LADDER, DETECTOR_BACKEND,
+    PIXELS_PER_METER, DEFAULT_ZONE_AREA_SQM,
+    get_video_path, get_zone_calibration
+)
 
 
 class VideoProcessor:
@@ -24,29 +37,83 @@ class VideoProcessor:
         """
         self.video_id = video_id
         self.video_path = get_video_path(video_id)
+        self.calibration = get_zone_calibration(video_id)
 
         # Initialize models
-        self.detector = PeopleDetector()
+        self.detector = PeopleDetector(
+            tiling=self.calibration.get("tiling"),
+            polygon=self.calibration.get("polygon"),
+            roi_boxes=self.calibration.get("roi_boxes")
+        )
         self.tracker = PeopleTracker()
-        self.velocity_estimator = VelocityEstimator()
-        self.metrics_aggregator = MetricsAggregator()
+        self.velocity_estimator = VelocityEstimator(
+            pixels_per_meter=self.calibration.get("pixels_per_meter", PIXELS_PER_METER),
+            mode=self.calibration.get("velocity_mode", VELOCITY_MODE),
+            flow_engine=create_flow_engine(**self.calibration.get("flow", {}))
+        )
+        self.metrics_aggregator = MetricsAggregator(
+            zone_area_sqm=self.calibration.get("area_sqm", DEFAULT_ZONE_AREA_SQM)
+        )
+        self.ground_plane: Optional[GroundPlane] = None  # Built on the first frame, once its size is known
+
+        # Skip detection on static scenes (per-camera override in calibration)
+        gate_settings = dict(self.calibration.get("motion_gate", {}))
+        if gate_settings.pop("enabled", MOTION_GATE_ENABLED):
+            self.motion_gate: Optional[MotionGate] = MotionGate(**gate_settings)
+        else:
+            self.motion_gate = None
+
+        # Run YOLO every K frames and propagate boxes in between
+        keyframe_settings = dict(self.calibration.get("keyframes", {}))
+        if keyframe_settings.pop("enabled", KEYFRAME_DETECTION):
+            self.keyframes: Optional[KeyframeScheduler] = KeyframeScheduler(**keyframe_settings)
+            self.box_propagator: Optional[BoxPropagator] = BoxPropagator()
+        else:
+            self.keyframes = None
+            self.box_propagator = None
+
+        # Detection and optical flow are independent until metrics; run
+        # flow on a per-camera stage thread while detection runs inline
+        self.parallel_stages = self.calibration.get("parallel_stages", PARALLEL_STAGES)
+        self.stage_executor: Optional[ThreadPoolExecutor] = None
+        self.stage_seconds = {"detect": 0.0, "flow": 0.0, "frame": 0.0}
+        self.stage_frames = 0
+
+        # Decode settings (per-camera override in calibration)
+        self.frame_queue_settings = dict(self.calibration.get("frame_queue", {}))
+
+        # Live mode: always take the newest frame and hold latency to a target
+        live_settings = dict(self.calibration.get("live", {}))
+        if live_settings.pop("enabled", LIVE_MODE):
+            live_settings.setdefault("model_ladder", LIVE_MODEL_LADDER.get(DETECTOR_BACKEND))
+            self.latency_controller: Optional[LatencyController] = LatencyController(**live_settings)
+            self.frame_queue_settings.update(policy="drop_oldest", size=1)
+        else:
+            self.latency_controller = None
 
         # Video capture
         self.cap: Optional[cv2.VideoCapture] = None
+        self.frame_source: Optional[FrameSource] = None
         self.video_fps: float = 30.0
         self.frame_skip: int = 1
         self.frame_count: int = 0
         self.total_frames: int = 0
+        self.captured_at: Optional[float] = None  # time.monotonic() when the current frame was decoded
+        self.flow_fps: float = PROCESS_FPS  # Rate the current frame pair was sampled at
 
         # Processing state
         self.is_processing = False
         self.last_frame: Optional[np.ndarray] = None
-        self.last_detections: List[Detection] = []
+        self.last_detections: DetectionBatch = DetectionBatch()
         self.last_metrics: Dict[str, Any] = {}
 
-    def open(self) -> bool:
+    def open(self, offline: bool = False) -> bool:
         """Open the video file.
 
+        Args:
+            offline: Decode every subsampled frame once, in order: no
+                looping, no dropping (batch analysis)
+
         Returns:
             True if video opened successfully
         """
@@ -64,76 +131,300 @@ class VideoProcessor:
         # Calculate frame skip to achieve target PROCESS_FPS
         self.frame_skip = max(1, int(self.video_fps / PROCESS_FPS))
 
+        settings = dict(self.frame_queue_settings)
+        if offline:
+            settings.update(policy="block", loop=False)
+        self.frame_source = FrameSource(
+            self.cap, self.frame_skip, self.total_frames, self.video_fps, **settings
+        )
+
         return True
 
     def close(self):
         """Close the video file."""
+        if self.frame_source is not None:
+            self.frame_source.stop()
         if self.cap is not None:
             self.cap.release()
             self.cap = None
+        if self.stage_executor is not None:
+            self.stage_executor.shutdown(wait=True)
+            self.stage_executor = None
         self.is_processing = False
 
-    def process_frame(self, frame: np.ndarray) -> Dict[str, Any]:
+    def rewind(self):
+        """Reset per-pass state when the video loops back to the first frame."""
+        self.tracker.reset_tracks()
+        if self.keyframes is not None:
+            # The loop is a scene cut; boxes cannot be propagated across it
+            self.keyframes.force_keyframe()
+
+    def read_frame(self) -> Optional[np.ndarray]:
+        """Get the next frame to process from the frame source.
+
+        Only processed frames are decoded (see FrameSource); with prefetch
+        this just dequeues a frame the decoder thread already prepared.
+        Loops back to the start at the end of the video.
+
+        Returns:
+            BGR frame, or None if the video has no readable frames
+        """
+        item = self.frame_source.read()
+        if item is None:
+            return None
+
+        # Frames dropped in live mode widen the gap that flow spans
+        gap = item.frame_number - self.frame_count
+        self.flow_fps = PROCESS_FPS * self.frame_skip / gap if gap > 0 and not item.rewound else PROCESS_FPS
+
+        self.frame_count = item.frame_number
+        self.captured_at = item.decoded_at
+        if item.rewound:
+            self.rewind()
+        return item.frame
+
+    def process_frame(
+        self,
+        frame: np.ndarray,
+        detections: Optional[DetectionBatch] = None,
+        now: Optional[float] = None
+    ) -> Dict[str, Any]:
         """Process a single frame.
 
         Args:
             frame: BGR image as numpy array
+            detections: This frame's detections if already computed (batched
+                offline analysis); the detector, motion gate and keyframe
+                schedule are then bypassed
+            now: Frame time in seconds for the flow rate and metrics
+                history (None = wall clock; offline analysis passes the
+                video time)
 
         Returns:
             Dictionary with detections and metrics
         """
-        # Run detection
-        detections = self.detector.detect(frame)
-        self.last_detections = detections
-
-        # Get raw detections for tracker
-        raw_dets = self.detector.get_raw_detections()
+        frame_start = time.perf_counter()
+        height, width = frame.shape[:2]
+        if self.ground_plane is None or self.ground_plane.frame_size != (width, height):
+            self._set_ground_plane((width, height))
+
+        # Sparse flow anchors on the previous frame's boxes, so it can start
+        # before this frame's detections exist
+        flow_future = None
+        if self.parallel_stages:
+            if self.stage_executor is None:
+                self.stage_executor = ThreadPoolExecutor(
+                    max_workers=1, thread_name_prefix=f"flow-{self.video_id}"
+                )
+            flow_future = self.stage_executor.submit(self._estimate_velocity, frame)
+
+        detect_start = time.perf_counter()
+        precomputed = detections is not None
+        keyframe = precomputed or self.keyframes is None or self.keyframes.is_keyframe()
+        run_detection = precomputed or (
+            keyframe and (self.motion_gate is None or self.motion_gate.should_detect(frame))
+        )
 
-        # Update tracker
-        tracked_objects = []
-        if raw_dets is not None:
-            tracked_objects = self.tracker.update(
-                raw_dets["boxes"],
-                raw_dets["confidences"],
-                raw_dets["frame_size"]
+        if precomputed:
+            detections.track_id[:] = self.tracker.update(
+                detections.xyxy_pixels((width, height)),
+                detections.confidence / 100.0,
+                (width, height),
+                now=now
             )
+        elif run_detection:
+            # Run detection
+            detections = self.detector.detect(frame)
+
+            # Update tracker, on empty frames too so lost tracks age out.
+            # Each detection carries the ID of the track it was matched to
+            raw_dets = self.detector.get_raw_detections()
+            if raw_dets is not None:
+                detections.track_id[:] = self.tracker.update(
+                    raw_dets["boxes"],
+                    raw_dets["confidences"],
+                    raw_dets["frame_size"],
+                    now=now
+                )
+            else:
+                self.tracker.update(
+                    np.empty((0, 4), dtype=np.float32),
+                    np.empty(0, dtype=np.float32),
+                    (width, height),
+                    now=now
+                )
+        elif not keyframe:
+            # Between keyframes: move the last boxes with sparse optical flow
+            detections = self._propagate_detections(frame)
+        else:
+            # Static scene: reuse the last detections, moved forward by the
+            # tracker's motion prediction
+            detections = self._predict_detections()
+
+        if self.box_propagator is not None and keyframe:
+            self.box_propagator.observe(frame)
 
-            # Update detection IDs from tracker
-            for i, det in enumerate(detections):
-                if i < len(tracked_objects):
-                    det.track_id = f"T{tracked_objects[i].track_id:03d}"
+        self.last_detections = detections
+        self.stage_seconds["detect"] += time.perf_counter() - detect_start
 
-        # Estimate velocity
-        velocity, flow = self.velocity_estimator.estimate(
-            frame,
-            fps=PROCESS_FPS
-        )
+        # Join the flow stage, then hand it this frame's boxes for the next one
+        if flow_future is not None:
+            velocity = flow_future.result()
+            self.velocity_estimator.observe_boxes(detections.xywh(), detections.track_id)
+        else:
+            velocity = self._estimate_velocity(frame, detections)
 
-        # Get flow direction
-        direction = self.velocity_estimator.get_motion_direction(flow)
+        # Get flow direction (computed in the same pass as the velocity)
+        direction = self.velocity_estimator.direction
 
         # Update metrics aggregator
         self.metrics_aggregator.update(
             people_count=len(detections),
             velocity=velocity,
-            flow_rate=self.tracker.get_flow_rate()
+            flow_rate=self.tracker.get_flow_rate(now=now),
+            positions_px=detections.feet_pixels((width, height)),
+            now=now
         )
 
         # Get aggregated metrics
-        metrics = self.metrics_aggregator.get_metrics()
+        metrics = self.metrics_aggregator.get_metrics(now=now)
         metrics["direction"] = direction
         self.last_metrics = metrics
 
+        if self.keyframes is not None:
+            self.keyframes.update(metrics["velocity"], metrics["density"])
+
         # Store last frame
         self.last_frame = frame
+        self.stage_seconds["frame"] += time.perf_counter() - frame_start
+        self.stage_frames += 1
 
         return {
             "timestamp": time.strftime("%Y-%m-%dT%H:%M:%SZ", time.gmtime()),
             "frame_number": self.frame_count,
+            "detection_skipped": not run_detection,
             "metrics": metrics,
-            "detections": [d.to_dict() for d in detections]
+            "motion_grid": self.velocity_estimator.get_motion_grid(),
+            "detections": detections  # Serialized at the API edge
+        }
+
+    def _estimate_velocity(self, frame: np.ndarray, detections: Optional[DetectionBatch] = None) -> float:
+        """Run the optical flow stage and time it.
+
+        Args:
+            frame: BGR image as numpy array
+            detections: This frame's detections, or None to defer the boxes
+                (flow running concurrently with detection)
+
+        Returns:
+            Smoothed crowd velocity in m/s
+        """
+        start = time.perf_counter()
+        if detections is None:
+            velocity, _ = self.velocity_estimator.estimate(frame, fps=self.flow_fps, defer_boxes=True)
+        else:
+            velocity, _ = self.velocity_estimator.estimate(
+                frame,
+                fps=self.flow_fps,
+                boxes_pct=detections.xywh(),
+                track_ids=detections.track_id
+            )
+        self.stage_seconds["flow"] += time.perf_counter() - start
+        return velocity
+
+    def record_latency(self, result: Dict[str, Any]):
+        """Stamp a result with its capture-to-publish latency.
+
+        Call just before publishing the result. In live mode the latency
+        also feeds the controller, which may switch the detector weights.
+
+        Args:
+            result: Output of ``process_frame`` for the frame last read
+        """
+        if self.captured_at is None:
+            return
+        latency_ms = (time.monotonic() - self.captured_at) * 1000
+        result["latency_ms"] = round(latency_ms, 1)
+        if self.latency_controller is not None and self.latency_controller.observe(latency_ms):
+            self.detector.set_model(self.latency_controller.model_path)
+
+    def frame_delay(self, cycle_start: float) -> float:
+        """Seconds to wait before reading the next frame.
+
+        Outside live mode this is the fixed ``1 / PROCESS_FPS``. In live
+        mode the time already spent on the frame is deducted, so slow
+        inference does not add a sleep on top, and the controller's rate
+        divisor is applied.
+
+        Args:
+            cycle_start: time.monotonic() before the frame was read
+        """
+        if self.latency_controller is None:
+            return 1.0 / PROCESS_FPS
+        return self.latency_controller.delay(time.monotonic() - cycle_start, 1.0 / PROCESS_FPS)
+
+    def get_stage_timings(self) -> Dict[str, Any]:
+        """Average wall time per processed frame of each stage, in ms."""
+        frames = max(self.stage_frames, 1)
+        return {
+            "parallel": self.parallel_stages,
+            "frames": self.stage_frames,
+            **{
+                f"{stage}_ms": round(seconds / frames * 1000, 2)
+                for stage, seconds in self.stage_seconds.items()
+            }
         }
 
+    def _set_ground_plane(self, frame_size: Tuple[int, int]):
+        """Build the camera's metres-per-pixel map for this frame size."""
+        self.ground_plane = GroundPlane.from_calibration(self.calibration, frame_size)
+        self.velocity_estimator.set_ground_plane(self.ground_plane)
+        self.metrics_aggregator.set_ground_plane(self.ground_plane)
+
+    def _propagate_detections(self, frame: np.ndarray) -> DetectionBatch:
+        """Move the last detections into this frame with sparse optical flow.
+
+        The moved boxes are also fed to the tracker so trajectories, line
+        crossings and downstream analyzers advance at the full frame rate.
+        """
+        height, width = frame.shape[:2]
+        if len(self.last_detections) == 0:
+            self.box_propagator.observe(frame)
+            self.tracker.update(
+                np.empty((0, 4), dtype=np.float32),
+                np.empty(0, dtype=np.float32),
+                (width, height)
+            )
+            return DetectionBatch()
+
+        moved, _ = self.box_propagator.propagate(frame, self.last_detections.xywh())
+        detections = self.last_detections.with_boxes(moved)
+
+        track_ids = self.tracker.update(
+            detections.xyxy_pixels((width, height)),
+            detections.confidence / 100.0,
+            (width, height)
+        )
+
+        # Keep the carried-over ID where the tracker lost the propagated box
+        matched = track_ids >= 0
+        detections.track_id[matched] = track_ids[matched]
+        return detections
+
+    def _predict_detections(self) -> DetectionBatch:
+        """Advance the last detections by one frame of predicted track motion."""
+        offsets = self.tracker.predict_offsets()
+        if not offsets:
+            return self.last_detections.with_boxes(self.last_detections.xywh())
+
+        shift = np.array(
+            [offsets.get(t, (0.0, 0.0)) for t in self.last_detections.track_id.tolist()],
+            dtype=np.float32
+        ).reshape(-1, 2)
+        xywh = self.last_detections.xywh()
+        xywh[:, :2] += shift
+        return self.last_detections.with_boxes(xywh)
+
     def process_stream(self) -> Generator[Dict[str, Any], None, None]:
         """Process video as a stream, yielding results for each frame.
 
@@ -148,26 +439,20 @@ class VideoProcessor:
 
         try:
             while self.is_processing:
-                ret, frame = self.cap.read()
-
-                if not ret:
-                    # Loop video
-                    self.cap.set(cv2.CAP_PROP_POS_FRAMES, 0)
-                    self.tracker.reset_flow_count()
-                    continue
-
-                self.frame_count += 1
+                cycle_start = time.monotonic()
 
-                # Skip frames for efficiency
-                if self.frame_count % self.frame_skip != 0:
-                    continue
+                # Only the frames that get processed are decoded
+                frame = self.read_frame()
+                if frame is None:
+                    break
 
                 # Process frame
                 result = self.process_frame(frame)
+                self.record_latency(result)
                 yield result
 
                 # Control processing rate
-                time.sleep(1.0 / PROCESS_FPS)
+                time.sleep(self.frame_delay(cycle_start))
 
         finally:
             self.close()
@@ -216,6 +501,13 @@ class VideoProcessor:
             "total_frames": self.total_frames,
             "video_fps": self.video_fps,
             "process_fps": PROCESS_FPS,
+            "decode": self.frame_source.get_status() if self.frame_source else None,
+            "motion_gate": self.motion_gate.get_status() if self.motion_gate else None,
+            "keyframes": self.keyframes.get_status() if self.keyframes else None,
+            "live": self.latency_controller.get_status() if self.latency_controller else None,
+            "velocity": self.velocity_estimator.get_status(),
+            "stages": self.get_stage_timings(),
+            "ground_plane": self.ground_plane.to_dict() if self.ground_plane else None,
             "models": {
                 "detector": self.detector.model_info,
                 "tracker": self.tracker.model_info,
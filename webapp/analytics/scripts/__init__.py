@@ -0,0 +1 @@
+"""Command-line tools for video analytics."""
@@ -0,0 +1,51 @@
+"""Analyze an archived recording end to end, as fast as possible.
+
+Runs detection (batched), tracking, optical flow and metrics over every
+processed frame of a video with no real-time pacing and writes per-frame
+counts and metrics, every detection and a track table to a compressed
+columnar .npz (see BatchAnalyzer). Prints the frames/second achieved.
+
+Usage:
+    python scripts/analyze_recording.py tirupati_queue
+    python scripts/analyze_recording.py gate --video /recordings/day1.mp4 --output day1.npz
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+# Add the analytics directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+from processors.batch_analyzer import BatchAnalyzer
+from config import BATCH_ANALYSIS_SIZE, BATCH_OUTPUT_DIR
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Analyze a recording offline into a columnar .npz")
+    parser.add_argument("video_id", help="Camera/video ID (selects calibration and the default file)")
+    parser.add_argument("--video", type=Path, help="Recording to analyze instead of the ID's file")
+    parser.add_argument("--output", type=Path, help="Output .npz (default: data/batch/<id>-<time>.npz)")
+    parser.add_argument("--batch-size", type=int, default=BATCH_ANALYSIS_SIZE, help="Frames per detector forward pass")
+    parser.add_argument("--max-frames", type=int, help="Stop after this many processed frames")
+    args = parser.parse_args()
+
+    def report(done: int, expected: int):
+        print(f"\r{done}/{expected} frames", end="", flush=True)
+
+    analyzer = BatchAnalyzer(args.video_id, args.video, args.batch_size, progress=report)
+    summary = analyzer.run(args.max_frames)
+    print()
+
+    output = args.output or BATCH_OUTPUT_DIR / f"{args.video_id}-{time.strftime('%Y%m%d-%H%M%S')}.npz"
+    path = analyzer.save(output)
+    print(
+        f"{summary['frames']} frames in {summary['elapsed_s']:.1f} s: "
+        f"{summary['fps']:.1f} FPS ({summary['realtime_factor']:.1f}x real time)"
+    )
+    print(f"Wrote {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,145 @@
+"""Accuracy-vs-latency report for every available detector backend.
+
+Runs each backend on frames sampled from the bundled clips and compares
+its boxes against the ultralytics (PyTorch FP32) reference. Agreement is
+reported as recall/precision at IoU 0.5 and mean absolute count error,
+latency as single-frame and batched per-frame milliseconds.
+
+The backends have not been measured yet: no results are checked in, and
+nothing in config.py assumes one backend is faster or as accurate as
+another. Run this on the deployment CPU before switching
+DETECTOR_BACKEND or DETECTOR_INT8, and commit the generated report.
+
+Usage:
+    python scripts/benchmark_detectors.py --output DETECTOR_BACKENDS.md
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add the analytics directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import numpy as np
+
+from models.backends import DetectorBackend, FrameDetections, create_backend
+from models.detector import box_iou
+from scripts.export_detector import sample_calibration_frames
+from config import YOLO_MODEL, ONNX_MODEL, ONNX_INT8_MODEL
+
+CANDIDATES: List[Tuple[str, str, str]] = [
+    # (label, backend, model path)
+    ("ultralytics-fp32", "ultralytics", YOLO_MODEL),
+    ("onnxruntime-fp32", "onnxruntime", str(ONNX_MODEL)),
+    ("onnxruntime-int8", "onnxruntime", str(ONNX_INT8_MODEL)),
+    ("openvino-fp32", "openvino", str(ONNX_MODEL)),
+    ("openvino-int8", "openvino", str(ONNX_INT8_MODEL)),
+]
+
+
+def match_count(pred: np.ndarray, ref: np.ndarray, iou_threshold: float = 0.5) -> int:
+    """Greedy one-to-one matches between predicted and reference boxes."""
+    iou = box_iou(pred, ref)
+    matched = 0
+    while iou.size and iou.max() >= iou_threshold:
+        i, j = np.unravel_index(np.argmax(iou), iou.shape)
+        matched += 1
+        iou[i, :] = 0
+        iou[:, j] = 0
+    return matched
+
+
+def time_backend(
+    backend: DetectorBackend,
+    frames: List[np.ndarray],
+    batch_size: int
+) -> Tuple[List[FrameDetections], float, float]:
+    """Run a backend over frames one at a time and in batches.
+
+    Returns:
+        Tuple of (per-frame detections, single-frame ms, batched ms per frame)
+    """
+    outputs = []
+    start = time.perf_counter()
+    for frame in frames:
+        outputs.extend(backend.predict([frame]))
+    single_ms = (time.perf_counter() - start) / len(frames) * 1000
+
+    start = time.perf_counter()
+    for i in range(0, len(frames), batch_size):
+        backend.predict(frames[i:i + batch_size])
+    batched_ms = (time.perf_counter() - start) / len(frames) * 1000
+
+    return outputs, single_ms, batched_ms
+
+
+def agreement(outputs: List[FrameDetections], reference: List[FrameDetections]) -> Dict[str, float]:
+    """Recall, precision and count error of outputs against the reference."""
+    matched = predicted = expected = 0
+    count_errors = []
+    for (boxes, _), (ref_boxes, _) in zip(outputs, reference):
+        matched += match_count(boxes, ref_boxes)
+        predicted += len(boxes)
+        expected += len(ref_boxes)
+        count_errors.append(abs(len(boxes) - len(ref_boxes)))
+    return {
+        "recall": matched / expected if expected else 1.0,
+        "precision": matched / predicted if predicted else 1.0,
+        "count_mae": float(np.mean(count_errors)) if count_errors else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark detector backends on the demo clips")
+    parser.add_argument("--frames-per-clip", type=int, default=8, help="Frames sampled per clip")
+    parser.add_argument("--batch-size", type=int, default=8, help="Batch size for the batched timing")
+    parser.add_argument("--output", type=Path, help="Write the Markdown report to this file")
+    args = parser.parse_args()
+
+    frames = sample_calibration_frames(frames_per_clip=args.frames_per_clip)
+    print(f"Benchmarking on {len(frames)} frames")
+
+    rows = []
+    reference = None
+    for label, backend_name, model_path in CANDIDATES:
+        try:
+            backend = create_backend(backend_name, model_path)
+            backend.warmup()
+        except (ImportError, FileNotFoundError) as e:
+            print(f"Skipping {label}: {e}")
+            continue
+
+        outputs, single_ms, batched_ms = time_backend(backend, frames, args.batch_size)
+        if reference is None:
+            reference = outputs
+        scores = agreement(outputs, reference)
+        rows.append((label, single_ms, batched_ms, scores))
+        print(f"{label}: {single_ms:.1f} ms/frame, recall {scores['recall']:.3f}")
+
+    lines = [
+        "# Detector Backend Report",
+        "",
+        f"Frames: {len(frames)} ({args.frames_per_clip} per clip), "
+        f"batch size {args.batch_size}. Reference: {rows[0][0] if rows else 'n/a'}.",
+        "",
+        "| Backend | ms/frame (single) | ms/frame (batched) | Recall@0.5 | Precision@0.5 | Count MAE |",
+        "|---------|-------------------|--------------------|------------|---------------|-----------|",
+    ]
+    for label, single_ms, batched_ms, scores in rows:
+        lines.append(
+            f"| {label} | {single_ms:.1f} | {batched_ms:.1f} | {scores['recall']:.3f} | "
+            f"{scores['precision']:.3f} | {scores['count_mae']:.2f} |"
+        )
+    report = "\n".join(lines) + "\n"
+
+    print()
+    print(report)
+    if args.output:
+        args.output.write_text(report)
+
+
+if __name__ == "__main__":
+    main()
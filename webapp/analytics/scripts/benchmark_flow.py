@@ -0,0 +1,160 @@
+"""Speed and agreement report for every dense flow engine and preset.
+
+Runs each engine on consecutive processed-frame pairs from the bundled
+clips and compares it with the current Farneback output. Agreement is
+reported as mean endpoint error (EPE, downscaled pixels per frame) and
+the relative error of the moving-pixel mean magnitude that
+VelocityEstimator turns into crowd velocity; speed as milliseconds per
+frame pair and the resulting maximum dense-flow FPS.
+
+Usage:
+    python scripts/benchmark_flow.py --output FLOW_ENGINES.md
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+from typing import Dict, List, Tuple
+
+# Add the analytics directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from models.flow_engines import FlowEngine, create_flow_engine
+from config import OPTICAL_FLOW_SCALE, PROCESS_FPS, VIDEO_DIR
+
+CANDIDATES: List[Tuple[str, str]] = [
+    # (engine, preset)
+    ("farneback", None),
+    ("dis", "ultrafast"),
+    ("dis", "fast"),
+    ("dis", "medium"),
+]
+
+
+def sample_frame_pairs(
+    clips_dir: Path = VIDEO_DIR / "clips",
+    pairs_per_clip: int = 10,
+    scale: float = OPTICAL_FLOW_SCALE
+) -> List[Tuple[np.ndarray, np.ndarray]]:
+    """Sample downscaled grey frame pairs one processed frame apart.
+
+    Args:
+        clips_dir: Directory containing the demo clips
+        pairs_per_clip: Number of pairs to take from each clip
+        scale: Downscale factor applied before flow, as in VelocityEstimator
+
+    Returns:
+        List of (previous, current) grey frames
+    """
+    pairs = []
+    for clip in sorted(clips_dir.glob("*.mp4")):
+        cap = cv2.VideoCapture(str(clip))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        step = max(1, int(round((cap.get(cv2.CAP_PROP_FPS) or 30.0) / PROCESS_FPS)))
+        for index in np.linspace(0, max(total - 1 - step, 0), pairs_per_clip).astype(int):
+            grays = []
+            for position in (index, index + step):
+                cap.set(cv2.CAP_PROP_POS_FRAMES, int(position))
+                ret, frame = cap.read()
+                if not ret:
+                    break
+                gray = cv2.cvtColor(frame, cv2.COLOR_BGR2GRAY)
+                h, w = gray.shape
+                grays.append(cv2.resize(gray, (int(w * scale), int(h * scale))))
+            if len(grays) == 2:
+                pairs.append((grays[0], grays[1]))
+        cap.release()
+    return pairs
+
+
+def moving_magnitude(flow: np.ndarray, motion_threshold: float = 0.5) -> float:
+    """Mean magnitude of moving pixels, the quantity behind crowd velocity."""
+    magnitude = np.hypot(flow[..., 0], flow[..., 1])
+    moving = magnitude > motion_threshold
+    return float(magnitude[moving].mean()) if moving.any() else 0.0
+
+
+def run_engine(
+    engine: FlowEngine,
+    pairs: List[Tuple[np.ndarray, np.ndarray]]
+) -> Tuple[List[np.ndarray], float]:
+    """Compute flow for every pair.
+
+    Returns:
+        Tuple of (flow fields, ms per pair)
+    """
+    engine.compute(*pairs[0])  # Warm up
+    flows = []
+    start = time.perf_counter()
+    for prev_gray, gray in pairs:
+        flows.append(engine.compute(prev_gray, gray))
+    return flows, (time.perf_counter() - start) / len(pairs) * 1000
+
+
+def agreement(flows: List[np.ndarray], reference: List[np.ndarray]) -> Dict[str, float]:
+    """Endpoint and velocity-magnitude error against the reference."""
+    epe = [float(np.hypot(*(f - r).transpose(2, 0, 1)).mean()) for f, r in zip(flows, reference)]
+    magnitude_errors = []
+    for flow, ref in zip(flows, reference):
+        ref_mag = moving_magnitude(ref)
+        if ref_mag > 0:
+            magnitude_errors.append(abs(moving_magnitude(flow) - ref_mag) / ref_mag)
+    return {
+        "epe": float(np.mean(epe)),
+        "velocity_error": float(np.mean(magnitude_errors)) if magnitude_errors else 0.0,
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark dense flow engines on the demo clips")
+    parser.add_argument("--pairs-per-clip", type=int, default=10, help="Frame pairs sampled per clip")
+    parser.add_argument("--output", type=Path, help="Write the Markdown report to this file")
+    args = parser.parse_args()
+
+    pairs = sample_frame_pairs(pairs_per_clip=args.pairs_per_clip)
+    if not pairs:
+        print("No clips found")
+        return
+    h, w = pairs[0][0].shape
+    print(f"Benchmarking on {len(pairs)} frame pairs at {w}x{h}")
+
+    rows = []
+    reference = None
+    for engine_name, preset in CANDIDATES:
+        engine = create_flow_engine(engine_name, preset)
+        flows, ms = run_engine(engine, pairs)
+        if reference is None:
+            reference = flows
+        scores = agreement(flows, reference)
+        rows.append((engine.label, ms, scores))
+        print(f"{engine.label}: {ms:.1f} ms/pair, EPE {scores['epe']:.3f}")
+
+    lines = [
+        "# Dense Flow Engine Report",
+        "",
+        f"Frame pairs: {len(pairs)} ({args.pairs_per_clip} per clip) at {w}x{h} "
+        f"(scale {OPTICAL_FLOW_SCALE}), one processed frame apart at {PROCESS_FPS} FPS. "
+        f"Reference: {rows[0][0]}.",
+        "",
+        "| Engine | ms/frame | Max FPS | EPE (px) | Velocity error |",
+        "|--------|----------|---------|----------|----------------|",
+    ]
+    for label, ms, scores in rows:
+        lines.append(
+            f"| {label} | {ms:.1f} | {1000 / ms:.0f} | {scores['epe']:.3f} | "
+            f"{scores['velocity_error'] * 100:.1f}% |"
+        )
+    report = "\n".join(lines) + "\n"
+
+    print()
+    print(report)
+    if args.output:
+        args.output.write_text(report)
+
+
+if __name__ == "__main__":
+    main()
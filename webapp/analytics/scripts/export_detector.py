@@ -0,0 +1,160 @@
+"""Export the YOLO detector to ONNX and optionally quantize it to INT8.
+
+The INT8 graph is calibrated on frames sampled from the bundled demo
+clips, so activation ranges match temple footage rather than COCO.
+
+Usage:
+    python scripts/export_detector.py            # FP32 ONNX only
+    python scripts/export_detector.py --int8     # FP32 + INT8 ONNX
+"""
+
+import argparse
+import shutil
+import sys
+from pathlib import Path
+from typing import List, Optional
+
+# Add the analytics directory to Python path
+sys.path.insert(0, str(Path(__file__).parent.parent))
+
+import cv2
+import numpy as np
+
+from models.backends import preprocess_batch
+from config import (
+    YOLO_MODEL, DETECTOR_IMGSZ, MODELS_DIR, ONNX_MODEL, ONNX_INT8_MODEL, VIDEO_DIR
+)
+
+
+def sample_calibration_frames(
+    clips_dir: Path = VIDEO_DIR / "clips",
+    frames_per_clip: int = 16
+) -> List[np.ndarray]:
+    """Sample evenly spaced frames from every clip for INT8 calibration.
+
+    Args:
+        clips_dir: Directory containing the demo clips
+        frames_per_clip: Number of frames to take from each clip
+
+    Returns:
+        List of BGR frames
+    """
+    frames = []
+    for clip in sorted(clips_dir.glob("*.mp4")):
+        cap = cv2.VideoCapture(str(clip))
+        total = int(cap.get(cv2.CAP_PROP_FRAME_COUNT))
+        for index in np.linspace(0, max(total - 1, 0), frames_per_clip).astype(int):
+            cap.set(cv2.CAP_PROP_POS_FRAMES, int(index))
+            ret, frame = cap.read()
+            if ret:
+                frames.append(frame)
+        cap.release()
+    return frames
+
+
+def export_onnx(model_path: str = YOLO_MODEL, imgsz: int = DETECTOR_IMGSZ) -> Path:
+    """Export YOLO weights to an ONNX graph with dynamic batch and input size.
+
+    The dynamic height and width let ROI crops run at a smaller input
+    size than full frames.
+
+    Returns:
+        Path to the exported ONNX model
+    """
+    from ultralytics import YOLO
+
+    exported = YOLO(model_path).export(
+        format="onnx",
+        imgsz=imgsz,
+        dynamic=True,
+        simplify=True
+    )
+
+    MODELS_DIR.mkdir(parents=True, exist_ok=True)
+    shutil.move(str(exported), ONNX_MODEL)
+    return ONNX_MODEL
+
+
+def quantize_int8(
+    fp32_path: Path = ONNX_MODEL,
+    int8_path: Path = ONNX_INT8_MODEL,
+    frames: Optional[List[np.ndarray]] = None,
+    imgsz: int = DETECTOR_IMGSZ
+) -> Path:
+    """Statically quantize an ONNX graph to INT8 (QDQ format).
+
+    Args:
+        fp32_path: FP32 ONNX model to quantize
+        int8_path: Output path for the INT8 model
+        frames: Calibration frames (defaults to frames sampled from the clips)
+        imgsz: Model input size
+
+    Returns:
+        Path to the quantized model
+    """
+    from onnxruntime.quantization import (
+        CalibrationDataReader, CalibrationMethod, QuantFormat, QuantType, quantize_static
+    )
+    from onnxruntime.quantization.shape_inference import quant_pre_process
+    import onnxruntime as ort
+
+    if frames is None:
+        frames = sample_calibration_frames()
+    if not frames:
+        raise RuntimeError("No calibration frames found")
+
+    input_name = ort.InferenceSession(
+        str(fp32_path), providers=["CPUExecutionProvider"]
+    ).get_inputs()[0].name
+
+    class ClipCalibrationReader(CalibrationDataReader):
+        """Feeds letterboxed clip frames one at a time."""
+
+        def __init__(self):
+            self._frames = iter(frames)
+
+        def get_next(self):
+            frame = next(self._frames, None)
+            if frame is None:
+                return None
+            batch, _ = preprocess_batch([frame], imgsz)
+            return {input_name: batch}
+
+    prepared_path = fp32_path.with_name(fp32_path.stem + "_prep.onnx")
+    quant_pre_process(str(fp32_path), str(prepared_path))
+
+    quantize_static(
+        str(prepared_path),
+        str(int8_path),
+        ClipCalibrationReader(),
+        quant_format=QuantFormat.QDQ,
+        activation_type=QuantType.QUInt8,
+        weight_type=QuantType.QInt8,
+        per_channel=True,
+        op_types_to_quantize=["Conv"],  # Keep the detection head in FP32
+        calibrate_method=CalibrationMethod.MinMax
+    )
+    prepared_path.unlink(missing_ok=True)
+    return int8_path
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export the people detector for CPU backends")
+    parser.add_argument("--model", default=YOLO_MODEL, help="YOLO weights to export")
+    parser.add_argument("--imgsz", type=int, default=DETECTOR_IMGSZ, help="Model input size")
+    parser.add_argument("--int8", action="store_true", help="Also produce an INT8 quantized graph")
+    parser.add_argument("--frames-per-clip", type=int, default=16, help="INT8 calibration frames per clip")
+    args = parser.parse_args()
+
+    onnx_path = export_onnx(args.model, args.imgsz)
+    print(f"FP32 ONNX: {onnx_path}")
+
+    if args.int8:
+        frames = sample_calibration_frames(frames_per_clip=args.frames_per_clip)
+        print(f"Calibrating INT8 on {len(frames)} clip frames")
+        int8_path = quantize_int8(onnx_path, frames=frames, imgsz=args.imgsz)
+        print(f"INT8 ONNX: {int8_path}")
+
+
+if __name__ == "__main__":
+    main()
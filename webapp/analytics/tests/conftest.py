@@ -0,0 +1,6 @@
+"""Pytest setup: make the analytics modules importable as top-level packages."""
+
+import sys
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
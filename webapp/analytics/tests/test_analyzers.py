@@ -0,0 +1,77 @@
+"""Tests for the per-track analyzers on detection batches."""
+
+import numpy as np
+import pytest
+
+import processors.dwell_analyzer as dwell_analyzer
+import processors.flow_detector as flow_detector
+import processors.gate_counter as gate_counter
+from models.detector import DETECTION_DTYPE, DetectionBatch, NO_TRACK
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    """Controllable time.time() for the analyzers."""
+    now = [1000.0]
+    for module in (gate_counter, dwell_analyzer, flow_detector):
+        monkeypatch.setattr(module.time, "time", lambda: now[0])
+    return now
+
+
+def batch(*tracks):
+    """DetectionBatch from (track_id, x, y) in percentages."""
+    data = np.zeros(len(tracks), dtype=DETECTION_DTYPE)
+    for row, (track_id, x, y) in enumerate(tracks):
+        data[row] = (x, y, 4, 10, 90, track_id)
+    return DetectionBatch(data)
+
+
+def test_gate_crossings_counted_once_per_track(clock):
+    counter = gate_counter.BiDirectionalGateCounter()
+    crossings = []
+    # Track 1 walks down through both gates, track 2 walks up through the main one
+    for y1, y2 in ((30, 70), (50, 50), (70, 30), (50, 50), (70, 30)):
+        clock[0] += 0.5
+        crossings += counter.update(batch((1, 50, y1), (2, 50, y2), (NO_TRACK, 50, y1)))
+
+    stats = counter.get_gate_stats()
+    assert stats["inner_gate"]["entry_count"] == 1
+    assert stats["main_entrance"]["entry_count"] == 1
+    assert stats["main_entrance"]["exit_count"] == 1
+    assert sorted((c.track_id, c.gate_id, c.direction) for c in crossings) == [
+        ("T001", "inner_gate", "entry"),
+        ("T001", "main_entrance", "entry"),
+        ("T002", "inner_gate", "exit"),
+        ("T002", "main_entrance", "exit"),
+    ]
+
+
+def test_dwell_recorded_on_exit_and_disappearance(clock):
+    analyzer = dwell_analyzer.DwellTimeAnalyzer()
+    analyzer.update(batch((1, 50, 30), (2, 50, 35)))  # Both in the darshan zone
+    clock[0] += 12
+    summary = analyzer.update(batch((1, 50, 30), (2, 95, 5)))  # Track 2 leaves
+    assert summary["zones"]["darshan_zone"]["occupancy"] == 1
+
+    clock[0] += 8
+    summary = analyzer.update(batch())  # Track 1 disappears
+    zone = summary["zones"]["darshan_zone"]
+    assert zone["occupancy"] == 0
+    assert zone["total_completed"] == 2
+    assert zone["min_dwell_seconds"] == 12.0
+    assert zone["max_dwell_seconds"] == 20.0
+    assert {r.track_id for r in analyzer.completed_dwells} == {"T001", "T002"}
+
+
+def test_counter_flow_against_the_crowd(clock):
+    analyzer = flow_detector.FlowAnalyzer()
+    crowd = [(track_id, 10.0, 10.0 * track_id) for track_id in range(1, 7)]
+    result = None
+    for step in range(4):
+        clock[0] += 0.5
+        moving = [(t, x + 3 * step, y) for t, x, y in crowd]
+        result = analyzer.update(batch(*moving, (99, 80 - 3 * step, 50)))
+
+    assert result["dominant_flow"]["direction"] == "right"
+    assert result["counter_flow_detected"]
+    assert {e["track_id"] for e in result["counter_flow_events"]} == {"T099"}
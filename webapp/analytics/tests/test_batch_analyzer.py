@@ -0,0 +1,90 @@
+"""Tests for offline analysis results."""
+
+from types import SimpleNamespace
+
+import numpy as np
+import pytest
+
+from models.detector import DETECTION_DTYPE, NO_TRACK
+from models.tracker import CrossingCounter
+from processors.batch_analyzer import BatchAnalyzer, flow_rate_per_minute, load_batch_results
+
+
+class TestFlowRatePerMinute:
+    def test_trailing_window(self):
+        times = np.arange(0, 121, 10, dtype=np.float32)
+        crossed = np.arange(len(times)) * 2  # 2 crossings every 10 s
+        rates = flow_rate_per_minute(times, crossed, window_seconds=60, min_seconds=0)
+        assert rates[0] == 0
+        assert rates[-1] == pytest.approx(12)  # 12 crossings in the last minute
+        assert rates[3] == pytest.approx(6 * 60 / 30)  # 6 crossings in the first 30 s
+
+    def test_no_rate_before_min_seconds(self):
+        times = np.array([0, 1, 2, 9, 10, 20], dtype=np.float32)
+        crossed = np.array([0, 1, 2, 2, 2, 3])
+        rates = flow_rate_per_minute(times, crossed, window_seconds=60, min_seconds=10)
+        assert rates[:4].tolist() == [0, 0, 0, 0]
+        assert rates[4] == pytest.approx(2 * 60 / 10)
+        assert rates[5] == pytest.approx(3 * 60 / 20)
+
+    def test_matches_crossing_counter(self):
+        counter = CrossingCounter(history_seconds=600, min_seconds=10)
+        times = np.arange(0.5, 200, 1.0)
+        crossed = np.cumsum(np.arange(1, len(times) + 1) % 7 == 0)  # None on the first frame
+        live = []
+        for t, total in zip(times, crossed):
+            counter.add(int(total) - counter.total, now=1000 + t)
+            live.append(counter.rate_per_minute(60, now=1000 + t))
+
+        offline = flow_rate_per_minute(times - times[0], crossed, window_seconds=60, min_seconds=10)
+        np.testing.assert_allclose(offline, live, rtol=1e-5)
+
+    def test_empty(self):
+        assert flow_rate_per_minute(np.empty(0), np.empty(0)).shape == (0,)
+
+
+def test_npz_round_trip(tmp_path):
+    analyzer = BatchAnalyzer.__new__(BatchAnalyzer)
+    analyzer.video_id = "tirupati_queue"
+    analyzer.elapsed_seconds = 2.0
+    analyzer.processor = SimpleNamespace(video_fps=10.0, video_path="videos/tirupati.mp4", frame_skip=2)
+    analyzer._frames = {
+        "number": [1, 3, 5],
+        "people_count": [2, 0, 1],
+        "density": [0.5, 0.0, 0.25],
+        "peak_density": [1.0, 0.0, 0.5],
+        "velocity": [0.3, 0.0, 0.1],
+        "direction": ["north", "stationary", "east"],
+        "congestion": ["low", "low", "moderate"],
+        "crossed": [0, 0, 1],
+    }
+    first = np.zeros(2, dtype=DETECTION_DTYPE)
+    first["x"] = [10, 20]
+    first["track_id"] = [4, NO_TRACK]
+    last = np.zeros(1, dtype=DETECTION_DTYPE)
+    last["x"] = [30]
+    last["track_id"] = [4]
+    analyzer._detections = [first, np.zeros(0, dtype=DETECTION_DTYPE), last]
+
+    path = analyzer.save(tmp_path / "run")
+    assert path.name == "run.npz"
+    tables = load_batch_results(path)
+
+    assert set(tables) == {"meta", "frames", "detections", "tracks"}
+    assert str(tables["meta"]["video_id"]) == "tirupati_queue"
+    assert tables["frames"]["number"].tolist() == [1, 3, 5]
+    np.testing.assert_allclose(tables["frames"]["time_s"], [0.0, 0.2, 0.4])
+    assert tables["frames"]["direction"].tolist() == ["north", "stationary", "east"]
+    assert tables["frames"]["crossed"].tolist() == [0, 0, 1]
+
+    detections = tables["detections"]
+    offsets = detections["offsets"]
+    assert offsets.tolist() == [0, 2, 2, 3]
+    assert detections["x"][offsets[2]:offsets[3]].tolist() == [30]
+    assert detections["track_id"].tolist() == [4, NO_TRACK, 4]
+
+    tracks = tables["tracks"]
+    assert tracks["id"].tolist() == [4]
+    assert tracks["first_frame"].tolist() == [1]
+    assert tracks["last_frame"].tolist() == [5]
+    assert tracks["detections"].tolist() == [2]
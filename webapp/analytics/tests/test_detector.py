@@ -0,0 +1,157 @@
+"""Tests for detection containers and the NumPy helpers of the detector."""
+
+import numpy as np
+import pytest
+
+from models.detector import (
+    DetectionBatch, NO_TRACK, PeopleDetector, as_batch, box_iou, merge_boxes,
+    normalized_positions, parse_track_id, points_in_polygon
+)
+
+
+def tiled_detector(grid, overlap=0.2, roi_boxes=None):
+    """A PeopleDetector with tiling set up and no model loaded."""
+    detector = PeopleDetector.__new__(PeopleDetector)
+    detector.roi_boxes = roi_boxes
+    detector.set_tiling(grid, overlap)
+    return detector
+
+
+class TestMergeBoxes:
+    def test_partial_box_from_another_tile_is_dropped(self):
+        boxes = np.array([[100, 100, 140, 220], [100, 100, 140, 160]], dtype=np.float32)
+        kept, confidences = merge_boxes(boxes, np.array([0.9, 0.8]), groups=np.array([0, 1]))
+        assert kept.tolist() == [[100, 100, 140, 220]]
+        assert confidences.tolist() == [0.9]
+
+    def test_boxes_from_the_same_tile_are_kept(self):
+        boxes = np.array([[100, 100, 140, 220], [100, 100, 140, 160]], dtype=np.float32)
+        kept, _ = merge_boxes(boxes, np.array([0.9, 0.8]), groups=np.array([2, 2]))
+        assert len(kept) == 2
+
+    def test_highest_confidence_survives(self):
+        boxes = np.array([[0, 0, 10, 10], [1, 1, 11, 11], [50, 50, 60, 60]], dtype=np.float32)
+        kept, confidences = merge_boxes(boxes, np.array([0.5, 0.9, 0.7]))
+        assert kept.tolist() == [[1, 1, 11, 11], [50, 50, 60, 60]]
+        assert confidences.tolist() == [0.9, 0.7]
+
+    def test_small_inputs_pass_through(self):
+        boxes = np.array([[0, 0, 10, 10]], dtype=np.float32)
+        kept, confidences = merge_boxes(boxes, np.array([0.5]))
+        assert kept is boxes and confidences.tolist() == [0.5]
+
+
+class TestTiling:
+    def test_spans_cover_the_axis_with_overlap(self):
+        spans = tiled_detector((3, 2), overlap=0.2)._tile_spans(1000, 3)
+        assert spans[0][0] == 0 and spans[-1][1] == 1000
+        widths = [end - start for start, end in spans]
+        assert max(widths) - min(widths) <= 1
+        for (_, end), (start, _) in zip(spans, spans[1:]):
+            assert end - start == pytest.approx(0.2 * widths[0], abs=1)
+
+    def test_single_tile_is_the_whole_axis(self):
+        assert tiled_detector((1, 1))._tile_spans(480, 1) == [(0, 480)]
+
+    def test_regions_tile_each_roi(self):
+        detector = tiled_detector((2, 2), overlap=0.0, roi_boxes=[(50, 0, 100, 100)])
+        assert detector._regions(200, 100) == [
+            (100, 0, 150, 50), (150, 0, 200, 50), (100, 50, 150, 100), (150, 50, 200, 100)
+        ]
+
+    def test_roi_crops_keep_the_frame_scale(self):
+        detector = tiled_detector(None)
+        # Half the frame's longer side -> half the input size
+        assert detector._region_imgsz((320, 144, 960, 576), 1280, 720) == 320
+        # Rounded up to the model stride
+        assert detector._region_imgsz((0, 0, 300, 200), 1280, 720) == 160
+        assert detector._region_imgsz((0, 0, 1280, 400), 1280, 720) is None
+
+        detector.set_tiling((2, 2))
+        assert detector._region_imgsz((320, 144, 960, 576), 1280, 720) is None
+
+    def test_predict_many_batches_by_input_size(self):
+        class RecordingModel:
+            def __init__(self):
+                self.calls = []
+
+            def predict(self, frames, imgsz=None):
+                self.calls.append((len(frames), imgsz))
+                return [(np.array([[0, 0, 10, 10]], dtype=np.float32), np.array([0.9])) for _ in frames]
+
+        detector = tiled_detector(None, roi_boxes=[(25, 20, 75, 80), (0, 0, 10, 10)])
+        detector.model = RecordingModel()
+        detector.server = None
+        detector.roi_polygon = None
+        frame = np.zeros((720, 1280, 3), dtype=np.uint8)
+
+        boxes, _ = detector._predict_many([frame, frame])[1]
+        assert sorted(detector.model.calls) == [(2, 64), (2, 320)]
+        assert boxes.tolist() == [[320, 144, 330, 154], [0, 0, 10, 10]]
+
+    def test_set_tiling_clamps(self):
+        detector = tiled_detector((0, 3), overlap=0.9)
+        assert detector.tile_grid == (1, 3)
+        assert detector.tile_overlap == 0.5
+        detector.set_tiling(None)
+        assert detector.tile_grid is None
+        assert detector._regions(320, 240) == [(0, 0, 320, 240)]
+
+
+class TestPointsInPolygon:
+    def test_square(self):
+        square = np.array([[0, 0], [10, 0], [10, 10], [0, 10]], dtype=np.float64)
+        points = np.array([[5, 5], [15, 5], [-1, 5], [5, 11], [9.9, 0.1]])
+        assert points_in_polygon(points, square).tolist() == [True, False, False, False, True]
+
+    def test_concave(self):
+        # U shape open at the top between x = 4 and x = 6
+        shape = np.array([[0, 0], [10, 0], [10, 10], [6, 10], [6, 4], [4, 4], [4, 10], [0, 10]], dtype=np.float64)
+        points = np.array([[5, 8], [5, 2], [2, 8], [8, 8]])
+        assert points_in_polygon(points, shape).tolist() == [False, True, True, True]
+
+    def test_no_points(self):
+        square = np.array([[0, 0], [1, 0], [1, 1]], dtype=np.float64)
+        assert points_in_polygon(np.empty((0, 2)), square).shape == (0,)
+
+
+class TestDetectionBatch:
+    def test_from_xyxy_uses_percentages(self):
+        batch = DetectionBatch.from_xyxy(
+            np.array([[64, 48, 128, 144]], dtype=np.float32), np.array([0.5]), (640, 480)
+        )
+        np.testing.assert_allclose(batch.xywh(), [[10, 10, 10, 20]])
+        np.testing.assert_allclose(batch.xyxy_pixels((640, 480)), [[64, 48, 128, 144]])
+        assert batch.confidence.tolist() == [50.0]
+        assert batch.track_id.tolist() == [NO_TRACK]
+
+    def test_dict_round_trip(self):
+        objects = [
+            {"x": 10.0, "y": 20.0, "width": 5.0, "height": 12.5, "confidence": 90.0, "id": "T007"},
+            {"x": 50.0, "y": 60.0, "width": 4.0, "height": 10.0, "confidence": 55.5},
+        ]
+        batch = DetectionBatch.from_dicts(objects)
+        assert batch.track_id.tolist() == [7, NO_TRACK]
+        assert batch.to_dicts() == objects
+        assert as_batch(objects).to_dicts() == objects
+        assert as_batch(batch) is batch
+        assert len(batch.tracked()) == 1
+
+    def test_parse_track_id(self):
+        assert parse_track_id("T012") == 12
+        assert parse_track_id(5) == 5
+        assert parse_track_id(None) == NO_TRACK
+        assert parse_track_id("") == NO_TRACK
+
+    def test_normalized_positions(self):
+        batch = DetectionBatch.from_dicts([{"x": 50, "y": 25}, {"x": 0.5, "y": 0.25}])
+        x, y = normalized_positions(batch)
+        np.testing.assert_allclose(x, [0.5, 0.5])
+        np.testing.assert_allclose(y, [0.25, 0.25])
+
+
+def test_box_iou():
+    a = np.array([[0, 0, 10, 10]], dtype=np.float32)
+    b = np.array([[0, 0, 10, 10], [5, 0, 15, 10], [20, 20, 30, 30]], dtype=np.float32)
+    np.testing.assert_allclose(box_iou(a, b), [[1.0, 1 / 3, 0.0]], atol=1e-6)
+    assert box_iou(a, np.empty((0, 4), dtype=np.float32)).shape == (1, 0)
@@ -0,0 +1,72 @@
+"""Tests for the NumPy-only fallback tracker."""
+
+import numpy as np
+import pytest
+
+import models.iou_tracker as iou_tracker
+from models.iou_tracker import IoUTracker
+
+
+def boxes(*xyxy):
+    return np.array(xyxy, dtype=np.float32).reshape(-1, 4)
+
+
+def confidences(n, value=0.9):
+    return np.full(n, value, dtype=np.float32)
+
+
+@pytest.fixture(params=[True, False], ids=["lap", "greedy"])
+def tracker(request, monkeypatch):
+    if request.param and not iou_tracker.LAP_AVAILABLE:
+        pytest.skip("lapx not installed")
+    monkeypatch.setattr(iou_tracker, "LAP_AVAILABLE", request.param)
+    return IoUTracker(max_age=2)
+
+
+def test_matches_follow_overlap_not_order(tracker):
+    _, first_ids, first_index = tracker.update(boxes([0, 0, 20, 40], [100, 0, 120, 40]), confidences(2))
+    assert first_index.tolist() == [0, 1]
+
+    _, ids, index = tracker.update(boxes([102, 1, 122, 41], [1, 0, 21, 40]), confidences(2))
+    by_detection = dict(zip(index.tolist(), ids.tolist()))
+    assert by_detection == {0: first_ids[1], 1: first_ids[0]}
+
+
+def test_fast_mover_matched_by_centre_distance(tracker):
+    _, first_ids, _ = tracker.update(boxes([0, 0, 20, 40]), confidences(1))
+    # No overlap with the old box, but within one diagonal
+    _, ids, _ = tracker.update(boxes([22, 0, 42, 40]), confidences(1))
+    assert ids.tolist() == first_ids.tolist()
+
+
+def test_velocity_prediction_keeps_identity(tracker):
+    ids = None
+    for step in range(5):
+        x = step * 15.0
+        _, ids_now, _ = tracker.update(boxes([x, 0, x + 20, 40]), confidences(1))
+        assert ids is None or ids_now.tolist() == ids.tolist()
+        ids = ids_now
+
+
+def test_low_confidence_detections_do_not_start_tracks(tracker):
+    _, ids, _ = tracker.update(boxes([0, 0, 20, 40]), confidences(1, value=0.05))
+    assert len(ids) == 0 and len(tracker.ids) == 0
+
+
+def test_lost_tracks_coast_then_expire(tracker):
+    tracker.update(boxes([0, 0, 20, 40]), confidences(1))
+    empty = boxes()
+    for _ in range(2):
+        _, ids, _ = tracker.update(empty, confidences(0))
+        assert len(ids) == 0
+        assert len(tracker.ids) == 1
+
+    tracker.update(empty, confidences(0))
+    assert len(tracker.ids) == 0
+
+
+def test_far_detection_starts_a_new_track(tracker):
+    _, first_ids, _ = tracker.update(boxes([0, 0, 20, 40]), confidences(1))
+    _, ids, _ = tracker.update(boxes([300, 300, 320, 340]), confidences(1))
+    assert ids.tolist() != first_ids.tolist()
+    assert len(tracker.ids) == 2
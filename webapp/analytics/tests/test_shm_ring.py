@@ -0,0 +1,69 @@
+"""Tests for the shared-memory array ring."""
+
+import uuid
+
+import numpy as np
+import pytest
+
+from models.detector import DETECTION_DTYPE
+from processors.shm_ring import SharedArrayRing
+
+
+@pytest.fixture
+def make_ring():
+    rings = []
+
+    def make(slot_shape, dtype, slots=3):
+        ring = SharedArrayRing(f"test-{uuid.uuid4().hex[:12]}", slot_shape, dtype, slots, create=True)
+        rings.append(ring)
+        return ring
+
+    yield make
+    for ring in rings:
+        ring.close()
+        ring.unlink()
+
+
+def test_write_then_read_copies(make_ring):
+    ring = make_ring((2, 3), np.uint8)
+    frame = np.arange(6, dtype=np.uint8).reshape(2, 3)
+    ring.write(0, frame)
+
+    copy = ring.read(0)
+    np.testing.assert_array_equal(copy, frame)
+    ring.write(3, np.zeros((2, 3), dtype=np.uint8))  # Same slot
+    np.testing.assert_array_equal(copy, frame)
+
+
+def test_overwritten_and_unwritten_items_are_lost(make_ring):
+    ring = make_ring((4,), np.float32, slots=2)
+    assert ring.read(0) is None
+    for seq in range(3):
+        ring.write(seq, np.full(4, seq, dtype=np.float32))
+
+    assert ring.read(0) is None
+    assert ring.read(1).tolist() == [1, 1, 1, 1]
+    assert ring.read(2).tolist() == [2, 2, 2, 2]
+
+
+def test_partial_structured_rows(make_ring):
+    ring = make_ring((8,), DETECTION_DTYPE)
+    rows = np.zeros(3, dtype=DETECTION_DTYPE)
+    rows["x"] = [1, 2, 3]
+    rows["track_id"] = [4, -1, 6]
+    ring.write(5, rows)
+
+    read = ring.read(5, count=3)
+    assert read.dtype == DETECTION_DTYPE
+    assert read["x"].tolist() == [1, 2, 3]
+    assert read["track_id"].tolist() == [4, -1, 6]
+
+
+def test_attached_reader_sees_writes(make_ring):
+    owner = make_ring((2,), np.int64)
+    reader = SharedArrayRing(owner.name, (2,), np.int64, owner.slots)
+    try:
+        owner.write(1, np.array([7, 8]))
+        assert reader.read(1).tolist() == [7, 8]
+    finally:
+        reader.close()
@@ -0,0 +1,93 @@
+"""Tests for the columnar track storage."""
+
+import numpy as np
+
+from models.track_store import TrackStore, TrackTable
+
+
+def pct_boxes(*xyxy):
+    return np.array(xyxy, dtype=np.float32).reshape(-1, 4)
+
+
+def no_detections(n):
+    return np.full(n, -1, dtype=np.int64)
+
+
+class TestTrackStore:
+    def test_update_returns_moves_of_known_tracks(self):
+        store = TrackStore(capacity=4, max_age=2)
+        ids, old, new = store.update(np.array([7, 9]), pct_boxes([0, 0, 10, 10], [50, 50, 60, 60]), no_detections(2))
+        assert len(ids) == 0 and len(store) == 2
+
+        ids, old, new = store.update(np.array([9]), pct_boxes([52, 50, 62, 60]), no_detections(1))
+        assert ids.tolist() == [9]
+        np.testing.assert_allclose(old, [[55, 55]])
+        np.testing.assert_allclose(new, [[57, 55]])
+
+    def test_unseen_tracks_expire_after_max_age(self):
+        store = TrackStore(capacity=4, max_age=2)
+        store.update(np.array([1, 2]), pct_boxes([0, 0, 10, 10], [20, 20, 30, 30]), no_detections(2))
+        for _ in range(2):
+            store.update(np.array([2]), pct_boxes([20, 20, 30, 30]), no_detections(1))
+        assert len(store) == 2
+
+        store.update(np.array([2]), pct_boxes([20, 20, 30, 30]), no_detections(1))
+        assert store.expired_ids.tolist() == [1]
+        assert len(store) == 1
+        assert store.slots_for(np.array([1, 2])).tolist()[0] == -1
+
+    def test_grows_past_capacity_and_reuses_slots(self):
+        store = TrackStore(capacity=2, max_age=0)
+        ids = np.arange(5)
+        store.update(ids, np.tile(pct_boxes([0, 0, 10, 10]), (5, 1)), no_detections(5))
+        assert len(store) == 5 and store.capacity >= 5
+        assert (store.slots_for(ids) >= 0).all()
+
+        capacity = store.capacity
+        store.update(np.empty(0, dtype=np.int64), pct_boxes(), no_detections(0))
+        assert len(store) == 0
+        store.update(np.arange(10, 15), np.tile(pct_boxes([0, 0, 10, 10]), (5, 1)), no_detections(5))
+        assert store.capacity == capacity
+
+    def test_last_displacements_wrap_the_trajectory_ring(self):
+        store = TrackStore(capacity=2, trajectory_length=3)
+        for x in range(6):
+            store.update(np.array([4]), pct_boxes([x, 0, x + 10, 10]), no_detections(1))
+        ids, displacement = store.last_displacements()
+        assert ids.tolist() == [4]
+        np.testing.assert_allclose(displacement, [[1, 0]])
+
+    def test_detection_index_is_kept_per_slot(self):
+        store = TrackStore(capacity=4)
+        store.update(np.array([3, 5]), pct_boxes([0, 0, 1, 1], [2, 2, 3, 3]), np.array([1, -1]))
+        assert store.detection_index[store.slots_for(np.array([3, 5]))].tolist() == [1, -1]
+
+
+class TestTrackTable:
+    def test_upsert_keeps_ids_sorted_and_rows_aligned(self):
+        table = TrackTable(position=(np.float64, (2,)), seen=(np.float64, ()))
+        rows = table.upsert(np.array([30, 10]))
+        table["position"][rows] = [[3, 3], [1, 1]]
+        rows = table.upsert(np.array([20, 10]))
+        table["position"][rows[0]] = [2, 2]
+
+        assert table.ids.tolist() == [10, 20, 30]
+        assert table["position"].tolist() == [[1, 1], [2, 2], [3, 3]]
+        assert table["seen"].tolist() == [0, 0, 0]
+
+    def test_find_reports_missing_ids(self):
+        table = TrackTable(value=(np.int32, ()))
+        assert table.find(np.array([1])).tolist() == [-1]
+        table.upsert(np.array([5, 8]))
+        assert table.find(np.array([8, 6, 5, 99])).tolist() == [1, -1, 0, -1]
+
+    def test_drop_and_clear(self):
+        table = TrackTable(value=(np.int32, ()))
+        rows = table.upsert(np.array([1, 2, 3]))
+        table["value"][rows] = [10, 20, 30]
+        table.drop(table["value"] == 20)
+        assert table.ids.tolist() == [1, 3]
+        assert table["value"].tolist() == [10, 30]
+
+        table.clear()
+        assert len(table) == 0 and table["value"].shape == (0,)
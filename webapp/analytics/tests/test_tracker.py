@@ -0,0 +1,153 @@
+"""Tests for the flow-rate counter and the people tracker."""
+
+import numpy as np
+import pytest
+
+import models.tracker as tracker_module
+from models.tracker import CrossingCounter, PeopleTracker
+from processors.camera_worker import RemoteTracker
+from config import MAX_TRACK_AGE
+
+FRAME_SIZE = (640, 480)
+
+
+def boxes(*xyxy):
+    return np.array(xyxy, dtype=np.float32).reshape(-1, 4)
+
+
+def confidences(n):
+    return np.full(n, 0.9, dtype=np.float32)
+
+
+class TestCrossingCounter:
+    def test_windowed_count(self):
+        counter = CrossingCounter(history_seconds=120, min_seconds=0)
+        counter.add(now=1000.0)
+        counter.add(2, now=1010.5)
+        counter.add(now=1030.0)
+
+        assert counter.total == 4
+        # All four in the last 60 s, observed for 50 s
+        assert counter.rate_per_minute(60, now=1050.0) == pytest.approx(4 * 60 / 50)
+        # Only the crossing at 1030 is inside the last 45 s
+        assert counter.rate_per_minute(45, now=1070.0) == pytest.approx(1 * 60 / 45)
+
+    def test_old_crossings_leave_the_window(self):
+        counter = CrossingCounter(history_seconds=60, min_seconds=0)
+        counter.add(5, now=1000.0)
+        assert counter.rate_per_minute(30, now=1100.0) == 0.0
+        assert counter.total == 5
+
+    def test_gap_longer_than_history(self):
+        counter = CrossingCounter(history_seconds=10, min_seconds=0)
+        counter.add(3, now=1000.0)
+        counter.add(now=5000.0)
+        assert counter.rate_per_minute(10, now=5005.0) == pytest.approx(1 * 60 / 10)
+
+    def test_no_rate_before_min_seconds(self):
+        counter = CrossingCounter(history_seconds=600, min_seconds=10)
+        counter.add(now=1000.0)
+        counter.add(now=1000.5)
+
+        # Two crossings half a second apart are not 240 per minute
+        assert counter.rate_per_minute(60, now=1000.5) == 0.0
+        assert counter.rate_per_minute(60, now=1009.0) == 0.0
+
+    def test_startup_rate_uses_elapsed_time(self):
+        counter = CrossingCounter(history_seconds=600, min_seconds=10)
+        counter.add(now=1000.0)
+        counter.add(now=1005.0)
+
+        # 2 crossings in the 20 s observed so far, not in a full minute
+        assert counter.rate_per_minute(60, now=1020.0) == pytest.approx(2 * 60 / 20)
+
+    def test_zero_min_seconds_at_first_event(self):
+        counter = CrossingCounter(history_seconds=60, min_seconds=0)
+        counter.add(now=1000.0)
+        assert counter.rate_per_minute(60, now=1000.0) == 0.0
+
+    def test_reset(self):
+        counter = CrossingCounter(history_seconds=60, min_seconds=0)
+        counter.add(4, now=1000.0)
+        counter.reset()
+        assert counter.total == 0
+        assert counter.rate_per_minute(60, now=1030.0) == 0.0
+
+
+class TestPeopleTracker:
+    def test_ids_follow_detections(self):
+        tracker = PeopleTracker()
+        first = tracker.update(boxes([100, 100, 140, 200], [400, 100, 440, 200]), confidences(2), FRAME_SIZE)
+        second = tracker.update(boxes([405, 102, 445, 202], [103, 101, 143, 201]), confidences(2), FRAME_SIZE)
+
+        assert (first >= 0).all()
+        assert first[0] != first[1]
+        assert second.tolist() == [first[1], first[0]]
+        assert tracker.active_track_count == 2
+
+    def test_empty_frames_age_out_tracks(self):
+        tracker = PeopleTracker()
+        for _ in range(3):
+            tracker.update(boxes([100, 100, 140, 200]), confidences(1), FRAME_SIZE)
+        assert tracker.active_track_count == 1
+
+        empty = np.empty((0, 4), dtype=np.float32)
+        for _ in range(MAX_TRACK_AGE + 1):
+            ids = tracker.update(empty, np.empty(0, dtype=np.float32), FRAME_SIZE)
+            assert len(ids) == 0
+
+        assert tracker.active_track_count == 0
+
+    def test_line_crossing_counted_once(self):
+        tracker = PeopleTracker()
+        tracker.set_counting_line(50)
+        # Box centre walks down across y = 50% (240 px) and back up
+        for y in (180, 200, 220, 240, 260, 280, 260, 240, 220):
+            tracker.update(boxes([300, y - 40, 340, y + 40]), confidences(1), FRAME_SIZE)
+
+        assert tracker.total_crossed == 1
+
+    def test_flow_rate_on_a_given_clock(self):
+        tracker = PeopleTracker()
+        tracker.set_counting_line(50)
+        # Video time, as in offline analysis: one frame every 2 s
+        for frame, y in enumerate((180, 200, 220, 240, 260, 280)):
+            tracker.update(boxes([300, y - 40, 340, y + 40]), confidences(1), FRAME_SIZE, now=2.0 * frame)
+
+        assert tracker.total_crossed == 1
+        assert tracker.get_flow_rate(60, now=6.0) == 0.0  # Before FLOW_RATE_MIN_SECONDS of video
+        assert tracker.get_flow_rate(60, now=26.0) == pytest.approx(60 / 20)
+
+    def test_loop_reset_keeps_the_flow_rate(self, monkeypatch):
+        now = [1000.0]
+        monkeypatch.setattr(tracker_module.time, "time", lambda: now[0])
+        tracker = PeopleTracker()
+        tracker.set_counting_line(50)
+        for y in (180, 200, 220, 240, 260, 280):
+            now[0] += 1
+            before = tracker.update(boxes([300, y - 40, 340, y + 40]), confidences(1), FRAME_SIZE)
+        assert tracker.total_crossed == 1
+
+        # The source loops back to its first frame
+        tracker.reset_tracks()
+        now[0] += 10
+        after = tracker.update(boxes([300, 140, 340, 220]), confidences(1), FRAME_SIZE)
+
+        assert tracker.total_crossed == 1
+        assert tracker.get_flow_rate(60) > 0
+        assert tracker.active_track_count == 1
+        assert after[0] > before[0]  # IDs are not reused across the cut
+
+
+def test_remote_tracker_survives_a_worker_restart(monkeypatch):
+    now = [1000.0]
+    monkeypatch.setattr(tracker_module.time, "time", lambda: now[0])
+    remote = RemoteTracker(worker=None)
+    remote.observe(3, 2)
+    now[0] += 20
+    remote.observe(5, 2)
+    now[0] += 1
+    remote.observe(1, 1)  # The restarted worker counts from zero
+
+    assert remote.total_crossed == 6
+    assert remote.get_flow_rate(60) == pytest.approx(6 * 60 / 21)
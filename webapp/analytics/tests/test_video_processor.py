@@ -0,0 +1,55 @@
+"""Tests for per-frame tracker bookkeeping in the video processor."""
+
+import numpy as np
+import pytest
+
+import processors.video_processor as video_processor
+from models.detector import DetectionBatch
+from config import MAX_TRACK_AGE
+
+FRAME = np.zeros((240, 320, 3), dtype=np.uint8)
+
+
+class ScriptedDetector:
+    """Detector returning queued pixel boxes, then nothing."""
+
+    def __init__(self, **kwargs):
+        self.script = []
+        self._raw = None
+
+    def detect(self, frame):
+        height, width = frame.shape[:2]
+        boxes = self.script.pop(0) if self.script else np.empty((0, 4), dtype=np.float32)
+        confidences = np.full(len(boxes), 0.9, dtype=np.float32)
+        # Like PeopleDetector, no raw detections when nobody was found
+        self._raw = {"boxes": boxes, "confidences": confidences, "frame_size": (width, height)} if len(boxes) else None
+        return DetectionBatch.from_xyxy(boxes, confidences, (width, height))
+
+    def get_raw_detections(self):
+        return self._raw
+
+
+@pytest.fixture
+def processor(monkeypatch):
+    monkeypatch.setattr(video_processor, "PeopleDetector", ScriptedDetector)
+    processor = video_processor.VideoProcessor("tirupati_queue")
+    processor.motion_gate = None  # Detect on every frame
+    processor.keyframes = None
+    processor.box_propagator = None
+    yield processor
+    processor.close()
+
+
+def test_tracks_expire_when_the_scene_clears(processor):
+    person = np.array([[100, 60, 130, 150]], dtype=np.float32)
+    processor.detector.script = [person] * 3
+    for _ in range(3):
+        result = processor.process_frame(FRAME)
+    assert result["detections"].track_id[0] >= 0
+    assert processor.tracker.active_track_count == 1
+
+    for _ in range(MAX_TRACK_AGE + 1):
+        result = processor.process_frame(FRAME)
+        assert len(result["detections"]) == 0
+
+    assert processor.tracker.active_track_count == 0